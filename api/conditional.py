@@ -0,0 +1,97 @@
+"""
+Feltételes GET – ETag / Last-Modified az adatverzióból.
+A Parquet adat csak ETL futáskor változik, így a válasz azonosítója előre, lekérdezés nélkül ismert:
+(katalógus ujjlenyomat + útvonal + rendezett query paraméterek + Accept + gzip). Egyező If-None-Match
+(vagy If-Modified-Since) esetén 304 megy vissza, az endpoint (és a DuckDB) meg sem hívódik.
+"""
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import HTTP_CACHE_MAX_AGE
+from .database import catalog_tag
+from .etag import etag_matches, make_etag
+
+# Csak az adatból számolt (adatverzión kívül állapotmentes) válaszok kapnak validátort
+CACHEABLE_PREFIXES = ("/api/stocks", "/api/symbols", "/api/date-range", "/api/analytics")
+CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+
+def _not_modified_since(if_modified_since: str, last_modified: float) -> bool:
+    try:
+        return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware a CACHEABLE_PREFIXES GET kéréseire: 200-as válaszokra ETag, Last-Modified,
+    Cache-Control és Vary: Accept, Accept-Encoding; egyező validátorú kérésre 304 törzs nélkül.
+    Az If-None-Match elsőbbséget élvez az If-Modified-Since-szel szemben.
+    A GZip middleware-en kívül fut: a gzipet elfogadó kérések ETag-je eltér (a tömörített törzs más bájtsor).
+    Az ujjlenyomat olvasása nem foglal sávot – a kérés csak a saját (light/bulk) sávjába lép be.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(CACHEABLE_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        tag = await run_in_threadpool(catalog_tag)  # egy stat (ETL után katalógus frissítés)
+        if tag is None:
+            await self.app(scope, receive, send)
+            return
+
+        fingerprint, last_modified = tag
+        request_headers = Headers(scope=scope)
+        # Ugyanaz a feltétel, mint a GZipMiddleware-ben
+        encoding = "gzip" if "gzip" in request_headers.get("accept-encoding", "") else ""
+        etag = make_etag(
+            fingerprint, scope["path"], scope["query_string"], request_headers.get("accept"), encoding
+        )
+        validators = {
+            "etag": etag,
+            "last-modified": formatdate(last_modified, usegmt=True),
+            "cache-control": CACHE_CONTROL,
+            "vary": "Accept, Accept-Encoding",
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        if (if_none_match and etag_matches(if_none_match, etag)) or (
+            not if_none_match
+            and if_modified_since
+            and _not_modified_since(if_modified_since, last_modified)
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k.encode(), v.encode()) for k, v in validators.items()],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in validators.items():
+                    if name != "vary":
+                        headers[name] = value
+                vary = [v.strip() for v in headers.get("vary", "").split(",") if v.strip()]
+                vary += [v for v in ("Accept", "Accept-Encoding") if v not in vary]
+                headers["vary"] = ", ".join(vary)
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -1,5 +1,34 @@
 """API konfiguráció – útvonalak, állandók."""
+import os
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-PARQUET_PATH = PROJECT_ROOT / "data" / "parquet"
+PARQUET_PATH = Path(os.environ.get("PARQUET_PATH", PROJECT_ROOT / "data" / "parquet"))
+# Előaggregált gyertyák (ETL): tier → mappa a perces store mellett (data/parquet_1h, data/parquet_1d)
+ROLLUP_PATHS = {
+    tier: PARQUET_PATH.parent / f"{PARQUET_PATH.name}_{tier}" for tier in ("1h", "1d")
+}
+# Az ETL export végén íródik – szimbólumonkénti metaadatok és adatverzió
+MANIFEST_PATH = PARQUET_PATH / "_manifest.json"
+
+# DuckDB – megosztott, folyamat-szintű adatbázis beállításai
+DUCKDB_THREADS = int(os.environ.get("DUCKDB_THREADS", os.cpu_count() or 4))
+DUCKDB_MEMORY_LIMIT = os.environ.get("DUCKDB_MEMORY_LIMIT", "2GB")
+
+# Streaming válasz (layout=ndjson) – ennyi sor kerül egy batch-be
+STREAM_BATCH_ROWS = int(os.environ.get("STREAM_BATCH_ROWS", 50_000))
+
+# Lekérdezés végrehajtás – két sáv saját thread poollal és beengedés-szabályozással
+# light: metaadat, manifest válaszok, kis lekérdezések; bulk: nagy / streamelt scannek
+LIGHT_WORKERS = int(os.environ.get("API_LIGHT_WORKERS", 8))
+LIGHT_MAX_QUEUE = int(os.environ.get("API_LIGHT_MAX_QUEUE", 100))
+LIGHT_QUEUE_TIMEOUT = float(os.environ.get("API_LIGHT_QUEUE_TIMEOUT", 5))
+BULK_WORKERS = int(os.environ.get("API_BULK_WORKERS", 2))  # egyidejű nehéz lekérdezések
+BULK_MAX_QUEUE = int(os.environ.get("API_BULK_MAX_QUEUE", 8))
+BULK_QUEUE_TIMEOUT = float(os.environ.get("API_BULK_QUEUE_TIMEOUT", 10))
+# Ennyi sorig (JSON, nem stream) a /api/stocks kérés a light sávba kerül
+LIGHT_MAX_ROWS = int(os.environ.get("API_LIGHT_MAX_ROWS", 10_000))
+
+# HTTP cache (ETag / Last-Modified az adatverzióból) – ennyi másodpercig friss a válasz a böngészőben/CDN-ben
+# újraellenőrzés nélkül; 0: minden használat előtt feltételes kérés (304, ha az adat nem változott)
+HTTP_CACHE_MAX_AGE = int(os.environ.get("API_HTTP_CACHE_MAX_AGE", 0))
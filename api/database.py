@@ -1,20 +1,264 @@
 """DuckDB adatelérés – Parquet lekérdezések."""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date
+from pathlib import Path
+
 import duckdb
 from fastapi import HTTPException
 
-from .config import PARQUET_PATH
+from .config import DUCKDB_MEMORY_LIMIT, DUCKDB_THREADS, MANIFEST_PATH, PARQUET_PATH, ROLLUP_PATHS
+
+# Az összes szimbólum adata egyetlen view-n keresztül (hive partíció: symbol=X)
+OHLCV_VIEW = "ohlcv"
+# Rollup tierek view-jai (csak ha a tier minden szimbólumot lefed)
+ROLLUP_VIEWS = {tier: f"ohlcv_{tier}" for tier in ROLLUP_PATHS}
+
+_db: duckdb.DuckDBPyConnection | None = None
+_db_lock = threading.RLock()
+
+_SYMBOL_RE = re.compile(r"/symbol=([^/]+)/")
+
+_catalog_files: list[str] = []
+_catalog_version: int | None = None
+_catalog_tag: tuple[str, float] | None = None  # (ujjlenyomat, legutóbbi módosítás) – HTTP validátorokhoz
+_manifest: dict | None = None
+_rollups: set[str] = set()
+_monthly: bool = False  # symbol=X/year=YYYY/month=MM/ elrendezés
+
+
+def init_db() -> duckdb.DuckDBPyConnection:
+    """
+    Folyamat-szintű DuckDB adatbázis megnyitása (FastAPI startupkor).
+    A Parquet metaadat cache a kapcsolat élettartamáig megmarad.
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = duckdb.connect(
+                ":memory:",
+                config={"threads": DUCKDB_THREADS, "memory_limit": DUCKDB_MEMORY_LIMIT},
+            )
+            _db.execute("SET parquet_metadata_cache = true")
+            refresh_catalog()
+        return _db
+
+
+def close_db() -> None:
+    """Megosztott DuckDB adatbázis lezárása (FastAPI shutdownkor)."""
+    global _db, _catalog_version, _catalog_tag, _manifest
+    with _db_lock:
+        if _db is not None:
+            _db.close()
+            _db = None
+            _catalog_files.clear()
+            _catalog_version = None
+            _catalog_tag = None
+            _manifest = None
+            _rollups.clear()
+
+
+def _data_version() -> int:
+    """Parquet adatverzió – az ETL által írt manifest mtime-ja (0, ha nincs)."""
+    try:
+        return MANIFEST_PATH.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _load_manifest(files: list[str]) -> dict | None:
+    """
+    Manifest betöltése és ellenőrzése a regisztrált fájlokkal szemben.
+    Csak akkor használható, ha pontosan ugyanazokat a szimbólumokat írja le,
+    és a partíciók mérete egyezik – különben None (lekérdezés fallback).
+    Közben cserélt (eltűnt) fájl is None: a következő adatverzió újra betölti.
+    """
+    try:
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    sizes: dict[str, int] = {}
+    for f in files:
+        m = _SYMBOL_RE.search(f)
+        if not m:
+            return None
+        try:
+            size = Path(f).stat().st_size
+        except OSError:
+            return None
+        sizes[m.group(1)] = sizes.get(m.group(1), 0) + size
+
+    symbols = manifest.get("symbols", {})
+    if set(symbols) != set(sizes):
+        return None
+    if any(entry.get("file_size") != sizes[sym] for sym, entry in symbols.items()):
+        return None
+    return manifest
+
+
+def _list_parquet_files(base: Path = PARQUET_PATH) -> list[str]:
+    """Az összes Parquet fájl (rendezve, '/' elválasztóval)."""
+    if not base.exists():
+        return []
+    return sorted(str(p).replace("\\", "/") for p in base.rglob("*.parquet"))
+
+
+def _fingerprint(files: list[str], version: int) -> tuple[str, float]:
+    """
+    A regisztrált adat ujjlenyomata (útvonal, méret, mtime fájlonként + az adatverzió)
+    és a legutóbbi módosítás ideje (unix mp). Returns: (hex ujjlenyomat, mtime)
+    """
+    digest = hashlib.blake2b(str(version).encode(), digest_size=16)
+    latest = version / 1e9
+    for f in files:
+        try:
+            st = os.stat(f)
+        except OSError:  # az ETL épp cseréli – a következő frissítés úgyis új ujjlenyomatot ad
+            digest.update(f"{f}\0-\n".encode())
+            continue
+        digest.update(f"{f}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        latest = max(latest, st.st_mtime)
+    return digest.hexdigest(), latest
+
+
+def _symbols_of(files: list[str]) -> set[str]:
+    """A fájlútvonalakban szereplő symbol=X partíciók."""
+    return {m.group(1) for f in files if (m := _SYMBOL_RE.search(f))}
+
 
+def _register_view(
+    db: duckdb.DuckDBPyConnection, name: str, files: list[str], monthly: bool = False
+) -> None:
+    """
+    View rögzített fájllistára (hive partíció); üres lista esetén a view törlése.
+    monthly: a year/month partíció oszlopok is látszanak (fájl-szintű szűréshez).
+    """
+    if not files:
+        db.execute(f"DROP VIEW IF EXISTS {name}")
+        return
+    file_list = ", ".join("'" + f.replace("'", "''") + "'" for f in files)
+    hive_cols = ", year, month" if monthly else ""
+    hive_types = ", hive_types = {'year': 'INTEGER', 'month': 'INTEGER'}" if monthly else ""
+    db.execute(
+        f"""
+        CREATE OR REPLACE VIEW {name} AS
+        SELECT date, open, high, low, close, volume, symbol{hive_cols}
+        FROM read_parquet([{file_list}], hive_partitioning = true{hive_types})
+        """
+    )
 
-def get_conn():
-    """DuckDB kapcsolat – Parquet lekérdezéshez."""
-    return duckdb.connect(":memory:")
+
+def refresh_catalog() -> int:
+    """
+    Az ohlcv (és a rollup) view-k (újra)regisztrálása az aktuális Parquet fájllistával.
+    A fájllista rögzített, így lekérdezéskor nincs glob; a symbol
+    hive partíció alapján a DuckDB csak az érintett fájlokat nyitja meg.
+    Returns: regisztrált fájlok száma
+    """
+    global _catalog_version, _catalog_tag, _manifest, _monthly
+    with _db_lock:
+        db = _db if _db is not None else init_db()
+        version = _data_version()
+        files = _list_parquet_files()
+        _monthly = bool(files) and all("/year=" in f for f in files)
+        _register_view(db, OHLCV_VIEW, files, _monthly)
+
+        # Rollup tier csak akkor használható, ha ugyanazokat a szimbólumokat fedi le
+        _rollups.clear()
+        symbols = _symbols_of(files)
+        registered = list(files)
+        for tier, path in ROLLUP_PATHS.items():
+            tier_files = _list_parquet_files(path)
+            usable = bool(files) and _symbols_of(tier_files) == symbols
+            _register_view(db, ROLLUP_VIEWS[tier], tier_files if usable else [])
+            if usable:
+                _rollups.add(tier)
+                registered += tier_files
+
+        # Az új verzió csak a manifest és az ujjlenyomat elkészülte után kerül érvénybe –
+        # hiba esetén a következő kérés újra megpróbálja
+        manifest = _load_manifest(files) if files else None
+        tag = _fingerprint(registered, version) if files else None
+        _catalog_files[:] = files
+        _manifest = manifest
+        _catalog_tag = tag
+        _catalog_version = version
+        return len(files)
+
+
+def ensure_catalog() -> None:
+    """Újraregisztrál, ha az ETL azóta új adatverziót írt, vagy még nincs adat."""
+    if _db is None or not _catalog_files or _catalog_version != _data_version():
+        with _db_lock:
+            if _db is None:
+                init_db()
+            elif not _catalog_files or _catalog_version != _data_version():
+                refresh_catalog()
+
+
+def get_conn() -> duckdb.DuckDBPyConnection:
+    """
+    DuckDB cursor a megosztott adatbázison – kérésenként egy.
+    A cursor lezárása (close) nem zárja le az adatbázist.
+    """
+    ensure_catalog()
+    return _db.cursor()
+
+
+def partition_filter(start: date | None, end: date | None) -> tuple[list[str], list]:
+    """
+    Hive partíció feltételek az ohlcv view-hoz (csak havi elrendezésnél):
+    a start/end hónapján kívüli year=/month= mappák fájljait a DuckDB meg sem nyitja.
+    Returns: (WHERE részek, paraméterek)
+    """
+    if not _monthly:
+        return [], []
+    parts: list[str] = []
+    params: list = []
+    if start:
+        parts.append("(year > ? OR (year = ? AND month >= ?))")
+        params += [start.year, start.year, start.month]
+    if end:
+        parts.append("(year < ? OR (year = ? AND month <= ?))")
+        params += [end.year, end.year, end.month]
+    return parts, params
+
+
+def available_rollups() -> set[str]:
+    """Használható rollup tierek (pl. {"1h", "1d"}) az aktuális adatverzióhoz."""
+    ensure_catalog()
+    return set(_rollups)
+
+
+def data_version() -> int:
+    """Az aktuálisan regisztrált adatverzió (a manifest mtime-ja ns-ban, 0 ha nincs) – cache kulcsokhoz."""
+    ensure_catalog()
+    return _catalog_version or 0
+
+
+def catalog_tag() -> tuple[str, float] | None:
+    """
+    Az aktuális adatverzió ujjlenyomata és módosítási ideje (ETag / Last-Modified alap);
+    None, ha nincs adat. Csak ETL futás (vagy katalógus frissítés) után változik.
+    """
+    ensure_catalog()
+    return _catalog_tag
+
+
+def get_manifest() -> dict | None:
+    """Érvényes manifest az aktuális adatverzióhoz (None, ha nincs vagy elavult)."""
+    ensure_catalog()
+    return _manifest
 
 
 def parquet_exists() -> bool:
-    """Parquet mappa létezik és tartalmaz fájlokat."""
-    if not PARQUET_PATH.exists():
-        return False
-    return any(PARQUET_PATH.rglob("*.parquet"))
+    """Van regisztrált Parquet adat a katalógusban."""
+    ensure_catalog()
+    return bool(_catalog_files)
 
 
 def require_parquet():
@@ -24,15 +268,3 @@ def require_parquet():
             503,
             "Parquet adatok még nem elérhetők. Futtasd: python etl/export_to_parquet.py",
         )
-
-
-def get_parquet_glob() -> str:
-    """Parquet fájlok glob útvonala (minden szimbólum)."""
-    return str(PARQUET_PATH / "**" / "*.parquet").replace("\\", "/")
-
-
-def get_parquet_glob_for_symbol(symbol: str) -> str | None:
-    """Parquet glob csak egy szimbólumhoz – gyorsabb, kevesebb I/O."""
-    p = PARQUET_PATH / f"symbol={symbol.upper().strip()}" / "*.parquet"
-    path_str = str(p).replace("\\", "/")
-    return path_str if p.parent.exists() else None
@@ -0,0 +1,22 @@
+"""ETag segédfüggvények – függőség nélkül, a frontend proxy is ezeket használja (egyező W/ és * kezelés)."""
+import hashlib
+from urllib.parse import parse_qsl
+
+
+def make_etag(
+    fingerprint: str, path: str, query_string: bytes, accept: str | None, encoding: str = ""
+) -> str:
+    """
+    Erős ETag: adatverzió + kérés (a paraméterek sorrendje nem számít).
+    encoding: a válasz tartalomkódolása (pl. "gzip") – eltérő bájtok, eltérő ETag.
+    """
+    query = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{fingerprint}\n{path}\n{query!r}\n{accept or ''}\n{encoding}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match összevetés (gyenge összehasonlítás, "*" és lista is)."""
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in (c.removeprefix("W/") for c in candidates)
@@ -0,0 +1,211 @@
+"""
+Lekérdezés végrehajtás sávokban – saját thread pool és beengedés-szabályozás sávonként.
+light: metaadat endpointok, manifestből adott válaszok, kis lekérdezések;
+bulk:  nagy / streamelt DuckDB scannek.
+A sávok nem osztoznak szálakon (a streamelt válaszok darabjai is a sáv executorán készülnek), így a nagy
+lekérések mellett a kis kérések késleltetése nem nő.
+Telített sávnál a kérés legfeljebb queue_timeout-ig vár; teli sornál vagy lejáratkor 503 + Retry-After.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+
+from .config import (
+    BULK_MAX_QUEUE,
+    BULK_QUEUE_TIMEOUT,
+    BULK_WORKERS,
+    LIGHT_MAX_QUEUE,
+    LIGHT_QUEUE_TIMEOUT,
+    LIGHT_WORKERS,
+)
+
+
+_worker = threading.local()  # a sáv executorának szálain: _worker.lane
+_END = object()
+
+
+class Lane:
+    """
+    Végrehajtási sáv: legfeljebb workers egyidejű feladat a saját executorán, legfeljebb max_queue várakozó.
+    StreamingResponse eredménynél a hely a stream végéig foglalt marad.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _overloaded(self) -> HTTPException:
+        retry_after = max(1, round(self.queue_timeout))
+        return HTTPException(
+            503,
+            f"A szerver túlterhelt ({self.name} sáv), próbáld újra később.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def _admit(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise self._overloaded()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise self._overloaded()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def _release(self) -> None:
+        self.running -= 1
+        self.completed += 1
+        if self._slots is not None:  # shutdown() után befejeződő feladat
+            self._slots.release()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers,
+                thread_name_prefix=f"api-{self.name}",
+                initializer=setattr,
+                initargs=(_worker, "lane", self),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        fn(*args, **kwargs) a sáv executorán, beengedés után. Streamelt válasznál a hely a stream végéig él.
+        Ha a várakozó kérést törlik (kliens bontás, timeout), a hely csak fn befejeződésekor szabadul fel –
+        a már futó feladat addig is foglalja a szálat.
+        """
+        await self._admit()
+        try:
+            future = self._get_executor().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            loop = asyncio.get_running_loop()
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+            raise
+        except BaseException:
+            self._release()
+            raise
+        if isinstance(result, StreamingResponse):
+            result.body_iterator = self._hold(result.body_iterator)
+        else:
+            self._release()
+        return result
+
+    def _hold(self, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Stream továbbítása; a sáv helye a stream végén (vagy kliens bontáskor) szabadul fel.
+        Ha a stream el sem indul (a kliens az első bájt előtt bont), a generátor felszabadításakor.
+        """
+        loop = asyncio.get_running_loop()
+        released: list[bool] = []
+
+        def release() -> None:
+            if not released:
+                released.append(True)
+                loop.call_soon_threadsafe(self._release)
+
+        async def stream() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                release()
+
+        held = stream()
+        weakref.finalize(held, release).atexit = False
+        return held
+
+    def iterate(self, iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Szinkron chunk generátor léptetése a sáv executorán (nem a Starlette közös thread poolján).
+        Bontáskor a generátor lezárása (pl. a DuckDB cursor) is ott fut, a folyamatban lévő lépés után.
+        """
+        executor = self._get_executor()
+        lock = threading.Lock()
+
+        def step() -> Any:
+            with lock:
+                return next(iterator, _END)
+
+        def close() -> None:
+            with lock:
+                getattr(iterator, "close", lambda: None)()
+
+        async def chunks() -> AsyncIterator[bytes]:
+            loop = asyncio.get_running_loop()
+            try:
+                while (chunk := await loop.run_in_executor(executor, step)) is not _END:
+                    yield chunk
+            finally:
+                try:
+                    executor.submit(close)
+                except RuntimeError:  # leállított executor
+                    close()
+
+        return chunks()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+LIGHT = Lane("light", LIGHT_WORKERS, LIGHT_MAX_QUEUE, LIGHT_QUEUE_TIMEOUT)
+BULK = Lane("bulk", BULK_WORKERS, BULK_MAX_QUEUE, BULK_QUEUE_TIMEOUT)
+
+
+def iterate_in_lane(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    StreamingResponse törzs: a hívó sáv executorán léptetve (a sáv szálán létrehozva);
+    sávon kívül a Starlette thread poolján.
+    """
+    lane = getattr(_worker, "lane", None)
+    return lane.iterate(iterator) if lane is not None else iterate_in_threadpool(iterator)
+
+
+def lane_stats() -> dict:
+    """Sávonkénti terhelés (health endpointhoz)."""
+    return {lane.name: lane.stats() for lane in (LIGHT, BULK)}
+
+
+def shutdown_lanes() -> None:
+    for lane in (LIGHT, BULK):
+        lane.shutdown()
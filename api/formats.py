@@ -0,0 +1,202 @@
+"""Válaszformátumok – soronkénti Python objektumok nélküli szerializálás."""
+import io
+from collections.abc import Iterator
+
+import duckdb
+import numpy as np
+import orjson
+import pyarrow as pa
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+from .executor import iterate_in_lane
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+
+# format paraméter → MIME típus (Accept fejléc alapú választáshoz is)
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+}
+
+
+def _json_column(col: np.ndarray):
+    """NumPy oszlop orjson-kompatibilis alakban (NULL-os maszkolt tömb → lista None-nal)."""
+    if isinstance(col, np.ma.MaskedArray):
+        return [None if m else v for v, m in zip(col.data.tolist(), np.ma.getmaskarray(col))]
+    return col
+
+
+def columnar_json_response(symbol: str, columns: dict[str, np.ndarray], **extra) -> Response:
+    """
+    Oszlopos JSON: {"symbol", "columns": {"date": [...], "open": [...], ...}, "count", **extra}.
+    A DuckDB fetchnumpy() tömbjeit az orjson közvetlenül szerializálja.
+    """
+    count = len(next(iter(columns.values()))) if columns else 0
+    body = orjson.dumps(
+        {
+            "symbol": symbol,
+            "columns": {name: _json_column(col) for name, col in columns.items()},
+            "count": count,
+            **extra,
+        },
+        option=_ORJSON_OPTS,
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def grouped_json_response(groups: dict[str, dict[str, np.ndarray]], **extra) -> Response:
+    """
+    Több szimbólum oszlopos JSON-ja, szimbólumonként csoportosítva:
+    {"symbols": [...], "data": {SYM: {"columns": {...}, "count"}}, **extra}.
+    """
+    data = {
+        symbol: {
+            "columns": {name: _json_column(col) for name, col in columns.items()},
+            "count": len(columns["date"]),
+        }
+        for symbol, columns in groups.items()
+    }
+    body = orjson.dumps({"symbols": list(groups), "data": data, **extra}, option=_ORJSON_OPTS)
+    return Response(content=body, media_type="application/json")
+
+
+def wide_json_response(symbols: list[str], field: str, columns: dict[str, np.ndarray]) -> Response:
+    """
+    Időbélyeg szerint igazított tábla: {"symbols", "field", "columns": {"date": [...], SYM: [...]}, "count"}.
+    A szimbólum oszlopokban a hiányzó perc null.
+    """
+    body = orjson.dumps(
+        {
+            "symbols": symbols,
+            "field": field,
+            "columns": {name: _json_column(col) for name, col in columns.items()},
+            "count": len(columns["date"]),
+        },
+        option=_ORJSON_OPTS,
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def model_json_response(model: type[BaseModel], data: dict) -> Response:
+    """
+    JSON válasz a response modell szerint, a hívó szálán szerializálva – async endpointnál
+    a FastAPI a response_model validálást az event loopon végezné (nagy válasznál blokkolna).
+    """
+    return Response(model.model_validate(data).model_dump_json(), media_type="application/json")
+
+
+def arrow_batches(
+    conn: duckdb.DuckDBPyConnection, query: str, params: list, batch_rows: int
+) -> pa.RecordBatchReader:
+    """Lekérdezés eredménye Arrow record batch-ekként (nem materializálja az egészet)."""
+    result = conn.execute(query, params)
+    if hasattr(result, "to_arrow_reader"):
+        return result.to_arrow_reader(batch_rows)
+    return result.fetch_record_batch(batch_rows)
+
+
+def _ndjson_chunks(conn: duckdb.DuckDBPyConnection, reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """Batch-enként egy NDJSON blokk; a végén a cursor lezárása."""
+    import polars as pl
+
+    try:
+        for batch in reader:
+            df = pl.from_arrow(batch).with_columns(
+                pl.col("date").dt.to_string("%Y-%m-%dT%H:%M:%S")
+            )
+            yield df.write_ndjson().encode()
+    finally:
+        conn.close()
+
+
+def ndjson_stream_response(
+    conn: duckdb.DuckDBPyConnection, query: str, params: list, batch_rows: int
+) -> StreamingResponse:
+    """
+    NDJSON stream – soronként egy OHLCV objektum, batch-enként küldve.
+    Az első bájt az első batch után megy ki; a memória a batch mérettel arányos.
+    """
+    reader = arrow_batches(conn, query, params, batch_rows)
+    return StreamingResponse(iterate_in_lane(_ndjson_chunks(conn, reader)), media_type="application/x-ndjson")
+
+
+def negotiate_format(fmt: str | None, accept: str | None) -> str:
+    """Kimeneti formátum: explicit format paraméter, különben az Accept fejléc első ismert típusa."""
+    if fmt:
+        return fmt
+    by_media = {media: name for name, media in MEDIA_TYPES.items()}
+    for part in (accept or "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in by_media:
+            return by_media[media]
+    return "json"
+
+
+def _arrow_ipc_chunks(conn: duckdb.DuckDBPyConnection, reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """Arrow IPC stream: séma, majd batch-enként egy üzenet."""
+    sink = io.BytesIO()
+    try:
+        with pa.ipc.new_stream(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                yield _drain(sink)
+        yield _drain(sink)
+    finally:
+        conn.close()
+
+
+def _csv_chunks(conn: duckdb.DuckDBPyConnection, reader: pa.RecordBatchReader) -> Iterator[bytes]:
+    """CSV stream: fejléc az első blokkban, utána batch-enként a sorok."""
+    import pyarrow.csv as pacsv
+
+    sink = io.BytesIO()
+    try:
+        with pacsv.CSVWriter(sink, reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                yield _drain(sink)
+        yield _drain(sink)
+    finally:
+        conn.close()
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    """A puffer eddigi tartalma, majd ürítés."""
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def binary_response(
+    conn: duckdb.DuckDBPyConnection,
+    query: str,
+    params: list,
+    fmt: str,
+    filename: str,
+    batch_rows: int,
+) -> Response:
+    """
+    Arrow IPC / CSV (stream) vagy Parquet (egyben – a footer miatt) válasz,
+    közvetlenül a DuckDB Arrow eredményéből, Python sorobjektumok nélkül.
+    """
+    reader = arrow_batches(conn, query, params, batch_rows)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        sink = io.BytesIO()
+        try:
+            with pq.ParquetWriter(sink, reader.schema, compression="zstd") as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+        finally:
+            conn.close()
+        return Response(sink.getvalue(), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    chunks = _arrow_ipc_chunks(conn, reader) if fmt == "arrow" else _csv_chunks(conn, reader)
+    return StreamingResponse(iterate_in_lane(chunks), media_type=MEDIA_TYPES[fmt], headers=headers)
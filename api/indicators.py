@@ -0,0 +1,160 @@
+"""
+Technikai indikátorok – NumPy, soronkénti Python ciklus nélkül.
+Nevek: sma<N>, ema<N>, rsi<N>, bbands<N> (Bollinger, ±2 szórás), vwap (napon belüli, naponta újrainduló).
+A periódus elhagyható (alap: DEFAULT_PERIODS). Az első értékek (bemelegedés) NaN-ok, illetve a
+rekurzív (ema, rsi) indikátoroknál pontatlanok – ezért a lekérdezés a start előtti lookback_rows()
+sort is beolvassa, és a kimenetből levágja.
+"""
+import re
+
+import numpy as np
+
+DEFAULT_PERIODS = {"sma": 20, "ema": 20, "rsi": 14, "bbands": 20}
+MAX_PERIOD = 5000
+BBANDS_STDDEV = 2.0
+# Rekurzív indikátoroknál ennyi periódusnyi előzmény – a kezdőérték súlya e^-10 alá csökken
+RECURSIVE_WARMUP = 10
+_EMA_BLOCK = 128
+
+_NAME_RE = re.compile(r"^(sma|ema|rsi|bbands)(\d*)$")
+
+
+def parse_indicators(names: str) -> list[tuple[str, str, int]]:
+    """
+    "sma20,ema50,rsi,vwap" → [(név, fajta, periódus), ...] a megadás sorrendjében.
+    Raises: ValueError ismeretlen névre vagy érvénytelen periódusra.
+    """
+    specs = []
+    for name in dict.fromkeys(n.strip().lower() for n in names.split(",") if n.strip()):
+        if name == "vwap":
+            specs.append((name, "vwap", 0))
+            continue
+        m = _NAME_RE.match(name)
+        if not m:
+            raise ValueError(f"Ismeretlen indikátor: {name} (sma<N>, ema<N>, rsi<N>, bbands<N>, vwap)")
+        period = int(m.group(2)) if m.group(2) else DEFAULT_PERIODS[m.group(1)]
+        if not 2 <= period <= MAX_PERIOD:
+            raise ValueError(f"Érvénytelen periódus: {name} (2..{MAX_PERIOD})")
+        specs.append((name, m.group(1), period))
+    if not specs:
+        raise ValueError("Legalább egy indikátor szükséges (pl. names=sma20,rsi14).")
+    return specs
+
+
+def lookback_rows(specs: list[tuple[str, str, int]]) -> int:
+    """A start előtt beolvasandó sorok száma (a vwap naponta újraindul – nem kell előzmény)."""
+    rows = [0]
+    for _, kind, period in specs:
+        if kind in ("sma", "bbands"):
+            rows.append(period - 1)
+        elif kind in ("ema", "rsi"):
+            rows.append(RECURSIVE_WARMUP * period)
+    return max(rows)
+
+
+def _rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    """Gördülő összeg kumulált összegből; az első period-1 érték NaN."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        c = np.cumsum(np.concatenate([[0.0], x]))
+        out[period - 1:] = c[period:] - c[:-period]
+    return out
+
+
+def sma(x: np.ndarray, period: int) -> np.ndarray:
+    return _rolling_sum(x, period) / period
+
+
+def ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponenciális mozgóátlag (y0 = x0, y_t = y_t-1 + alpha * (x_t - y_t-1)).
+    Blokkonként zárt alak (kumulált összeg súlyozva), a blokkok közti átvitel
+    skalár rekurzió a blokkok utolsó értékein – a ciklus blokkonként fut.
+    """
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    decay = 1.0 - alpha
+    k = np.arange(_EMA_BLOCK)
+    blocks = np.zeros(-(-n // _EMA_BLOCK) * _EMA_BLOCK)
+    blocks[:n] = x
+    blocks = blocks.reshape(-1, _EMA_BLOCK)
+    # Blokkon belül, nulla kezdőértékkel: alpha * sum_j decay^(k-j) * x_j
+    inner = alpha * np.cumsum(blocks * decay ** -k, axis=1) * decay**k
+    carry = decay ** (k + 1)  # az előző blokk utolsó értékének súlya
+
+    prev = np.empty(len(blocks))
+    last = x[0]  # y_-1 = x0 → y0 = x0
+    block_decay = carry[-1]
+    block_last = inner[:, -1]
+    for b in range(len(blocks)):
+        prev[b] = last
+        last = block_last[b] + block_decay * last
+    return (inner + prev[:, None] * carry).ravel()[:n]
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder RSI: a nyereségek és veszteségek 1/period súlyú mozgóátlaga; az első érték NaN."""
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    delta = np.diff(close)
+    avg_gain = ema(np.maximum(delta, 0.0), 1.0 / period)
+    avg_loss = ema(np.maximum(-delta, 0.0), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+def bbands(close: np.ndarray, period: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger szalag: (felső, közép = sma, alsó), ±BBANDS_STDDEV gördülő (populációs) szórással."""
+    centered = close - (close.mean() if len(close) else 0.0)  # kisebb kumulált összegek → pontosabb variancia
+    mean = _rolling_sum(centered, period) / period
+    var = np.maximum(_rolling_sum(centered * centered, period) / period - mean * mean, 0.0)
+    mid = sma(close, period)
+    width = BBANDS_STDDEV * np.sqrt(var)
+    return mid + width, mid, mid - width
+
+
+def vwap(
+    dates: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray
+) -> np.ndarray:
+    """Napon belüli VWAP a tipikus árral ((high+low+close)/3), kereskedési naponként újrakezdve."""
+    n = len(close)
+    if n == 0:
+        return np.empty(0)
+    typical = (high + low + close) / 3.0
+    pv = np.cumsum(typical * volume)
+    vol = np.cumsum(volume)
+    days = dates.astype("datetime64[D]")
+    starts = np.flatnonzero(np.concatenate([[True], days[1:] != days[:-1]]))
+    # Az adott nap előtti kumulált értékek levonása (naponkénti újraindulás)
+    day_index = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    pv_before = np.concatenate([[0.0], pv])[starts][day_index]
+    vol_before = np.concatenate([[0.0], vol])[starts][day_index]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (pv - pv_before) / (vol - vol_before)
+
+
+def compute(specs: list[tuple[str, str, int]], columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Indikátor oszlopok (név → tömb; bbands: <név>_upper, _mid, _lower) a date/high/low/close/volume oszlopokból."""
+    close = columns["close"].astype(np.float64)
+    out: dict[str, np.ndarray] = {}
+    for name, kind, period in specs:
+        if kind == "sma":
+            out[name] = sma(close, period)
+        elif kind == "ema":
+            out[name] = ema(close, 2.0 / (period + 1))
+        elif kind == "rsi":
+            out[name] = rsi(close, period)
+        elif kind == "bbands":
+            out[f"{name}_upper"], out[f"{name}_mid"], out[f"{name}_lower"] = bbands(close, period)
+        else:
+            out[name] = vwap(
+                columns["date"],
+                columns["high"].astype(np.float64),
+                columns["low"].astype(np.float64),
+                close,
+                columns["volume"].astype(np.float64),
+            )
+    return out
@@ -2,19 +2,37 @@
 Nifty 50 Stock Data API – FastAPI
 Parquet adatok olvasása DuckDB-vel.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 
-from .routers import health_router, stocks_router, symbols_router
+from .conditional import ConditionalGetMiddleware
+from .database import close_db, init_db
+from .executor import shutdown_lanes
+from .routers import analytics_router, health_router, stocks_router, symbols_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Megosztott DuckDB adatbázis: startupkor nyit, shutdownkor zár (a végrehajtási sávokkal együtt)."""
+    init_db()
+    yield
+    shutdown_lanes()
+    close_db()
+
 
 app = FastAPI(
     title="Nifty 50 Stock API",
     description="OHLCV adatok lekérdezése Parquet-ból",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(GZipMiddleware, minimum_size=500)
+# ETag / 304 a GZip-en kívül: a 304 nem megy át rajta, a Vary fejléc a GZip-é mellé kerül
+app.add_middleware(ConditionalGetMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -26,6 +44,7 @@ app.add_middleware(
 app.include_router(health_router)
 app.include_router(symbols_router)
 app.include_router(stocks_router)
+app.include_router(analytics_router)
 
 
 if __name__ == "__main__":
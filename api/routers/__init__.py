@@ -1,5 +1,6 @@
+from .analytics import router as analytics_router
 from .health import router as health_router
 from .symbols import router as symbols_router
 from .stocks import router as stocks_router
 
-__all__ = ["health_router", "symbols_router", "stocks_router"]
+__all__ = ["analytics_router", "health_router", "symbols_router", "stocks_router"]
@@ -0,0 +1,228 @@
+"""Keresztmetszeti elemzés – igazított hozammátrix, kovariancia/korreláció és top mozgók több szimbólumra."""
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from datetime import date
+from typing import Literal
+
+import numpy as np
+import orjson
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+
+from ..database import data_version, get_conn, require_parquet
+from ..executor import BULK
+from .stocks import BAR_INTERVALS, _bars_source, _build_where_clause, _parse_symbols
+
+router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
+
+# Kiszámolt mátrixok (adatverzió + szimbólumok + tartomány + interval szerint), bájtra korlátos LRU
+CROSS_SECTION_CACHE_BYTES = 256 * 2**20
+MAX_CROSS_SECTION_SYMBOLS = 500
+# Periódusok × szimbólumok felső korlátja (a hozammátrix mérete)
+MAX_CROSS_SECTION_CELLS = 2_000_000
+# Perc alapú intervalnál (5m, 15m) kötelező a start/end, legfeljebb ennyi nap
+MAX_INTRADAY_DAYS = 92
+
+_results: OrderedDict[tuple, tuple[dict, int]] = OrderedDict()  # kulcs → (eredmény, méret bájtban)
+_results_bytes = 0
+_results_lock = threading.Lock()
+
+
+@router.get("/cross-section")
+async def cross_section(
+    symbols: str | None = Query(
+        None, description="Vesszővel elválasztott szimbólumok (alap: az összes)"
+    ),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    interval: Literal["5m", "15m", "1h", "1d"] = Query("1d", description="Hozam periódus"),
+    top: int = Query(10, ge=1, le=MAX_CROSS_SECTION_SYMBOLS, description="Top mozgók száma irányonként"),
+    include_returns: bool = Query(False, description="A teljes hozammátrix is a válaszba kerül"),
+):
+    """
+    Keresztmetszeti statisztika egyetlen DuckDB aggregációval (párhuzamos, csak a kért partíciók):
+    intervalonkénti záróár szimbólumonként → igazított hozammátrix (close-to-close), kovariancia és
+    korreláció (páronként a közös megfigyelésekre), valamint a tartomány legnagyobb nyertesei és vesztesei.
+    Ha van megfelelő ETL rollup (1h, 1d), abból aggregál. A mátrixok adatverziónként cache-elődnek.
+    5m/15m intervalnál start és end kötelező (legfeljebb MAX_INTRADAY_DAYS nap).
+    """
+    if BAR_INTERVALS[interval][1] < 60:
+        if not (start and end):
+            raise HTTPException(400, f"{interval} intervalnál a start és az end kötelező.")
+        if (end - start).days > MAX_INTRADAY_DAYS:
+            raise HTTPException(
+                400, f"{interval} intervalnál legfeljebb {MAX_INTRADAY_DAYS} napos tartomány kérhető."
+            )
+    symbol_list = tuple(_parse_symbols(symbols, MAX_CROSS_SECTION_SYMBOLS)) if symbols else None
+    body = await BULK.run(
+        _cross_section_body, symbol_list, start, end, interval, top, include_returns
+    )
+    return Response(body, media_type="application/json")
+
+
+def _cross_section_body(
+    symbols: tuple[str, ...] | None,
+    start: date | None,
+    end: date | None,
+    interval: str,
+    top: int,
+    include_returns: bool,
+) -> bytes:
+    """A JSON válasz a (cache-elt) mátrixokból – a top és include_returns csak itt számít."""
+    require_parquet()
+    result = _cached_cross_section(symbols, start, end, interval)
+    payload = {
+        "symbols": result["symbols"],
+        "interval": interval,
+        "start": str(start) if start else None,
+        "end": str(end) if end else None,
+        "periods": len(result["returns"]),
+        "observations": result["observations"],
+        "covariance": result["covariance"],
+        "correlation": result["correlation"],
+        "top_movers": _top_movers(result, top),
+    }
+    if include_returns:
+        payload["dates"] = result["dates"]
+        payload["returns"] = result["returns"]
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _cached_cross_section(
+    symbols: tuple[str, ...] | None, start: date | None, end: date | None, interval: str
+) -> dict:
+    """_cross_section eredménye a bájtra korlátos LRU-ból (kulcs: adatverzió + paraméterek)."""
+    global _results_bytes
+    key = (data_version(), symbols, start, end, interval)
+    with _results_lock:
+        entry = _results.get(key)
+        if entry is not None:
+            _results.move_to_end(key)
+            return entry[0]
+
+    result = _cross_section(symbols, start, end, interval)
+    size = sum(v.nbytes for v in result.values() if isinstance(v, np.ndarray))
+    if size <= CROSS_SECTION_CACHE_BYTES:
+        with _results_lock:
+            old = _results.pop(key, None)
+            if old is not None:
+                _results_bytes -= old[1]
+            _results[key] = (result, size)
+            _results_bytes += size
+            while _results_bytes > CROSS_SECTION_CACHE_BYTES:
+                _, (_, evicted) = _results.popitem(last=False)
+                _results_bytes -= evicted
+    return result
+
+
+def _cross_section(
+    symbols: tuple[str, ...] | None, start: date | None, end: date | None, interval: str
+) -> dict:
+    """
+    Igazított hozammátrix, kovariancia/korreláció és a tartomány eleji/végi záróárak.
+    Raises: HTTPException(400), ha a hozammátrix nagyobb MAX_CROSS_SECTION_CELLS-nél.
+    """
+    source, is_rollup = _bars_source(interval)
+    where_sql, params = _build_where_clause(
+        list(symbols) if symbols else None, start, end, end_exclusive=is_rollup, prune=not is_rollup
+    )
+    with closing(get_conn()) as conn:
+        columns = conn.execute(
+            f"""
+            SELECT
+                symbol,
+                time_bucket(INTERVAL '{BAR_INTERVALS[interval][0]}', date) AS bucket,
+                arg_max(close, date) AS close
+            FROM {source}
+            WHERE {where_sql}
+            GROUP BY 1, 2
+            """,
+            params,
+        ).fetchnumpy()
+
+    names = list(symbols) if symbols else sorted(set(columns["symbol"].tolist()))
+    periods = len(np.unique(columns["bucket"]))
+    if periods * len(names) > MAX_CROSS_SECTION_CELLS:
+        raise HTTPException(
+            400,
+            f"Túl nagy hozammátrix ({periods} periódus × {len(names)} szimbólum); "
+            "szűkítsd a tartományt vagy válassz nagyobb intervalt.",
+        )
+    prices, buckets = _price_matrix(columns, names)
+    returns = prices[1:] / prices[:-1] - 1.0
+    cov, corr, observations = _pairwise_cov_corr(returns)
+    first, last = _first_last(prices)
+    return {
+        "symbols": names,
+        "dates": buckets[1:],
+        "returns": returns,
+        "covariance": cov,
+        "correlation": corr,
+        "observations": observations,
+        "first_close": first,
+        "last_close": last,
+    }
+
+
+def _price_matrix(columns: dict[str, np.ndarray], names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(symbol, bucket, close) sorok → időpont × szimbólum záróár mátrix (hiányzó: NaN) és az időpontok."""
+    buckets, t_idx = np.unique(columns["bucket"], return_inverse=True)
+    position = {name: i for i, name in enumerate(names)}
+    s_idx = np.array([position.get(s, -1) for s in columns["symbol"].tolist()], dtype=np.int64)
+    known = s_idx >= 0
+    prices = np.full((len(buckets), len(names)), np.nan)
+    prices[t_idx[known], s_idx[known]] = np.ma.filled(columns["close"].astype(np.float64), np.nan)[known]
+    return prices, buckets
+
+
+def _pairwise_cov_corr(returns: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Kovariancia és korreláció páronként a közös (mindkét szimbólumnál meglévő) periódusokra,
+    mátrixszorzásokkal (n×n ciklus nélkül). Returns: (kovariancia, korreláció, közös periódusok száma)
+    """
+    present = ~np.isnan(returns)
+    m = present.astype(np.float64)
+    x = np.where(present, returns, 0.0)
+    n = m.T @ m  # közös periódusok száma párokra
+    sum_x = x.T @ m  # [i, j]: i összege ott, ahol j is megvan
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (sum_xy - sum_x * sum_x.T / n) / (n - 1)
+        var_i = (sum_xx - sum_x * sum_x / n) / (n - 1)
+        corr = cov / np.sqrt(var_i * var_i.T)
+    cov[n < 2] = np.nan
+    corr[n < 2] = np.nan
+    return cov, np.clip(corr, -1.0, 1.0), n.astype(np.int64)
+
+
+def _first_last(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Szimbólumonként az első és az utolsó meglévő záróár (hiányzó oszlop: NaN)."""
+    if not len(prices):
+        return np.full(prices.shape[1], np.nan), np.full(prices.shape[1], np.nan)
+    valid = ~np.isnan(prices)
+    cols = np.arange(prices.shape[1])
+    first = prices[valid.argmax(axis=0), cols]
+    last = prices[len(prices) - 1 - valid[::-1].argmax(axis=0), cols]
+    return first, last
+
+
+def _top_movers(result: dict, top: int) -> dict[str, list[dict]]:
+    """A tartomány első és utolsó záróára közti változás szerint a top nyertesek és vesztesek."""
+    names, first, last = result["symbols"], result["first_close"], result["last_close"]
+    change = last / first - 1.0
+    ranked = [i for i in np.argsort(-change, kind="stable") if not np.isnan(change[i])]
+
+    def mover(i: int) -> dict:
+        return {
+            "symbol": names[i],
+            "return": float(change[i]),
+            "first_close": float(first[i]),
+            "last_close": float(last[i]),
+        }
+
+    return {
+        "gainers": [mover(i) for i in ranked[:top]],
+        "losers": [mover(i) for i in ranked[::-1][:top]],
+    }
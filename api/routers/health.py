@@ -1,28 +1,67 @@
 """Health check és meta endpointok."""
-from fastapi import APIRouter
+from contextlib import closing
 
-from ..database import get_conn, get_parquet_glob, parquet_exists, require_parquet
+from fastapi import APIRouter, Response
+from starlette.concurrency import run_in_threadpool
+
+from ..database import (
+    OHLCV_VIEW,
+    get_conn,
+    get_manifest,
+    parquet_exists,
+    refresh_catalog,
+    require_parquet,
+)
+from ..executor import LIGHT, lane_stats
 from ..schemas import DateRangeResponse
 
 router = APIRouter(prefix="/api", tags=["System"])
 
 
 @router.get("/health")
-def health():
-    """API állapot."""
-    return {"status": "ok", "parquet_available": parquet_exists()}
+async def health(response: Response):
+    """
+    API állapot, sávonkénti terheléssel (running, waiting, rejected) – nem cache-elhető.
+    A sávokon kívül fut (Starlette thread pool), így telített sávoknál sem ad 503-at.
+    """
+    response.headers["Cache-Control"] = "no-store"
+    return await run_in_threadpool(_health)
+
+
+def _health() -> dict:
+    manifest = get_manifest()
+    return {
+        "status": "ok",
+        "parquet_available": parquet_exists(),
+        "data_version": manifest["version"] if manifest else None,
+        "lanes": lane_stats(),
+    }
+
+
+@router.post("/catalog/refresh")
+async def refresh():
+    """Parquet katalógus újraregisztrálása (pl. ETL futás után)."""
+    return {"status": "ok", "files": await LIGHT.run(refresh_catalog)}
 
 
 @router.get("/date-range", response_model=DateRangeResponse)
-def get_date_range():
+async def get_date_range():
     """Legkorábbi és legutolsó dátum az összes adatban (lekérdezhető tartomány)."""
+    return await LIGHT.run(_date_range)
+
+
+def _date_range() -> DateRangeResponse:
     require_parquet()
 
-    conn = get_conn()
-    row = conn.execute(
-        "SELECT MIN(date), MAX(date) FROM read_parquet(?)",
-        [get_parquet_glob()],
-    ).fetchone()
-    conn.close()
+    manifest = get_manifest()
+    if manifest:
+        entries = manifest["symbols"].values()
+        return DateRangeResponse(
+            min_date=min(e["min_date"] for e in entries),
+            max_date=max(e["max_date"] for e in entries),
+        )
+
+    with closing(get_conn()) as conn:
+        row = conn.execute(f"SELECT MIN(date), MAX(date) FROM {OHLCV_VIEW}").fetchone()
 
     return DateRangeResponse(min_date=str(row[0]), max_date=str(row[1]))
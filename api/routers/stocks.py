@@ -1,87 +1,398 @@
 """Részvényadatok és statisztikák endpointok."""
-from datetime import date
+import base64
+import binascii
+from contextlib import closing
+from datetime import date, datetime
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException, Query
+import numpy as np
 
-from ..database import get_conn, get_parquet_glob, get_parquet_glob_for_symbol, require_parquet
-from ..schemas import OHLCVRow, StatsResponse, StockResponse
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from ..config import LIGHT_MAX_ROWS, STREAM_BATCH_ROWS
+from ..database import (
+    OHLCV_VIEW,
+    ROLLUP_VIEWS,
+    available_rollups,
+    get_conn,
+    get_manifest,
+    partition_filter,
+    require_parquet,
+)
+from ..downsample import lttb_indices, minmax_indices
+from ..executor import BULK, LIGHT
+from ..formats import (
+    binary_response,
+    columnar_json_response,
+    grouped_json_response,
+    model_json_response,
+    ndjson_stream_response,
+    negotiate_format,
+    wide_json_response,
+)
+from ..indicators import compute, lookback_rows, parse_indicators
+from ..schemas import BarsResponse, OHLCVRow, StatsResponse, StockResponse
 
 router = APIRouter(prefix="/api/stocks", tags=["Stocks"])
 
+# interval paraméter → (DuckDB INTERVAL, hossz percben)
+BAR_INTERVALS = {
+    "5m": ("5 minutes", 5),
+    "15m": ("15 minutes", 15),
+    "1h": ("1 hour", 60),
+    "1d": ("1 day", 1440),
+}
+# ETL rollup tierek hossza percben – durvábbtól a finomabb felé
+ROLLUP_MINUTES = {"1d": 1440, "1h": 60}
+# /api/stocks?symbols=... – egy kérésben lekérhető szimbólumok
+MAX_BATCH_SYMBOLS = 50
+
 
-def _build_where_clause(start: date | None, end: date | None) -> tuple[str, list]:
-    """WHERE feltételek építése (symbol nélkül – partition már szűr)."""
-    where_parts = []
-    params: list = []
+def _build_where_clause(
+    symbol: str | list[str] | None,
+    start: date | None,
+    end: date | None,
+    after: datetime | None = None,
+    end_exclusive: bool = False,
+    prune: bool = True,
+) -> tuple[str, list]:
+    """
+    WHERE feltételek építése – a symbol (és havi elrendezésnél a year/month) feltétel a hive partíciót szűri.
+    symbol: egy szimbólum, vagy lista (symbol IN (...) – csak a listázott partíciók nyílnak meg); None: mind.
+    end_exclusive: rollup gyertyáknál (a bucket az end napján kezdődő teljes időszakot fedné).
+    prune: year/month feltételek (csak az ohlcv view-n; a rollup view-kban nincsenek).
+    """
+    if symbol is None:
+        where_parts: list[str] = []
+        params: list = []
+    elif isinstance(symbol, list):
+        where_parts = [f"symbol IN ({', '.join('?' * len(symbol))})"]
+        params = list(symbol)
+    else:
+        where_parts = ["symbol = ?"]
+        params = [symbol]
+    if prune:
+        hive_parts, hive_params = partition_filter(start, end)
+        where_parts += hive_parts
+        params += hive_params
     if start:
         where_parts.append("date >= ?")
         params.append(str(start))
     if end:
-        where_parts.append("date <= ?")
+        where_parts.append("date < ?" if end_exclusive else "date <= ?")
         params.append(str(end))
-    where_sql = " AND ".join(where_parts) if where_parts else "1=1"
-    return where_sql, params
+    if after:
+        where_parts.append("date > ?")
+        params.append(after)
+    return " AND ".join(where_parts) or "TRUE", params
 
 
-def _get_parquet_and_where(symbol: str, start: date | None, end: date | None) -> tuple[str, str, list]:
-    """Parquet path és WHERE – symbol partition vagy full scan."""
-    symbol = symbol.upper().strip()
-    path = get_parquet_glob_for_symbol(symbol)
-    if path:
-        where_sql, where_params = _build_where_clause(start, end)
-        return path, where_sql, where_params
-    path = get_parquet_glob()
-    where_sql, where_params = _build_where_clause(start, end)
-    return path, f"symbol = ? AND ({where_sql})", [symbol, *where_params]
+def _encode_cursor(last_date: datetime | np.datetime64) -> str:
+    """Opaque cursor: az oldal utolsó időbélyege (ISO), URL-biztos base64-ben."""
+    if isinstance(last_date, np.datetime64):
+        iso = np.datetime_as_string(last_date, unit="us")
+    else:
+        iso = last_date.isoformat()
+    return base64.urlsafe_b64encode(iso.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> datetime:
+    """Cursor → időbélyeg; érvénytelen cursor esetén 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(400, "Érvénytelen cursor.")
+
+
+def _bars_source(interval: str) -> tuple[str, bool]:
+    """
+    A legdurvább forrás, amelyből az interval előállítható: rollup tier, ha a hossza
+    osztója az intervalnak, különben a perces adat. Returns: (view, rollup-e)
+    """
+    minutes = BAR_INTERVALS[interval][1]
+    rollups = available_rollups()
+    for tier, tier_minutes in ROLLUP_MINUTES.items():
+        if tier in rollups and minutes % tier_minutes == 0:
+            return ROLLUP_VIEWS[tier], True
+    return OHLCV_VIEW, False
+
+
+def _from_rollup(interval: str) -> bool:
+    """Előállítható-e az interval egy rollup tierből (sávválasztáshoz, katalógus nélkül)."""
+    minutes = BAR_INTERVALS[interval][1]
+    return any(minutes % tier_minutes == 0 for tier_minutes in ROLLUP_MINUTES.values())
+
+
+def _stats_from_manifest(symbol: str, start: date | None, end: date | None) -> StatsResponse | None:
+    """Statisztika a manifestből, ha a dátumablak a szimbólum teljes tartományát lefedi."""
+    manifest = get_manifest()
+    entry = manifest["symbols"].get(symbol) if manifest else None
+    if entry is None:
+        return None
+    if start and str(start) > entry["min_date"]:
+        return None
+    if end and str(end) < entry["max_date"]:
+        return None
+    return StatsResponse(
+        symbol=symbol,
+        date_range={"min": entry["min_date"], "max": entry["max_date"]},
+        row_count=entry["row_count"],
+        price_range={"min": entry["min_low"], "max": entry["max_high"]},
+    )
+
+
+def _parse_symbols(symbols: str, max_symbols: int = MAX_BATCH_SYMBOLS) -> list[str]:
+    """symbols=TCS,INFY,... → egyedi, nagybetűs lista a megadás sorrendjében."""
+    parsed = list(dict.fromkeys(s.upper().strip() for s in symbols.split(",") if s.strip()))
+    if not parsed:
+        raise HTTPException(400, "Legalább egy szimbólum szükséges (symbols=TCS,INFY).")
+    if len(parsed) > max_symbols:
+        raise HTTPException(400, f"Legfeljebb {max_symbols} szimbólum kérhető egyszerre.")
+    return parsed
+
+
+@router.get("")
+async def get_multi_stocks(
+    symbols: str = Query(..., description="Vesszővel elválasztott szimbólumok, pl. TCS,INFY,RELIANCE"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(
+        1000, ge=1, le=2_000_000, description="grouped: sorok szimbólumonként; wide: időbélyegek száma"
+    ),
+    layout: Literal["grouped", "wide"] = Query(
+        "grouped",
+        description=(
+            "grouped: szimbólumonként oszlopos OHLCV; wide: időbélyeg szerint igazított tábla "
+            "(date + szimbólumonként egy oszlop a field értékével, hiányzó perc: null)"
+        ),
+    ),
+    field: Literal["open", "high", "low", "close", "volume"] = Query(
+        "close", description="wide layoutnál a szimbólum oszlopok értéke"
+    ),
+):
+    """
+    Több szimbólum OHLCV adatai egyetlen DuckDB lekérdezéssel – csak a kért partíciók olvasódnak.
+    grouped: szimbólumonként a start utáni első limit sor (dátum szerint);
+    wide: az első limit időbélyeg, szimbólumonként egy értékoszloppal.
+    """
+    symbol_list = _parse_symbols(symbols)
+    rows = limit if layout == "wide" else limit * len(symbol_list)
+    return await (LIGHT if rows <= LIGHT_MAX_ROWS else BULK).run(
+        _query_multi, symbol_list, start, end, limit, layout, field
+    )
+
+
+def _query_multi(
+    symbols: list[str],
+    start: date | None,
+    end: date | None,
+    limit: int,
+    layout: str,
+    field: str,
+):
+    """A /api/stocks?symbols=... lekérdezés (a sáv executorán fut)."""
+    require_parquet()
+
+    if layout == "wide":
+        where_sql, where_params = _build_where_clause(symbols, start, end)
+        pivots = ", ".join(
+            f"max({field}) FILTER (WHERE symbol = ?) AS s{i}" for i in range(len(symbols))
+        )
+        query = f"""
+            SELECT date, {pivots}
+            FROM {OHLCV_VIEW}
+            WHERE {where_sql}
+            GROUP BY date
+            ORDER BY date
+            LIMIT ?
+        """
+        with closing(get_conn()) as conn:
+            columns = conn.execute(query, [*symbols, *where_params, limit]).fetchnumpy()
+        wide = {"date": columns["date"]}
+        wide.update((symbol, columns[f"s{i}"]) for i, symbol in enumerate(symbols))
+        return wide_json_response(symbols, field, wide)
+
+    # Szimbólumonként top-N (ORDER BY date LIMIT) al-lekérdezés egy UNION ALL-ban:
+    # mindegyik csak a saját partícióját olvassa, és nem kell a teljes tartományt rendezni
+    parts, params = [], []
+    for i, symbol in enumerate(symbols):
+        where_sql, where_params = _build_where_clause(symbol, start, end)
+        parts.append(
+            f"""(SELECT {i} AS g, date, open, high, low, close, volume
+                FROM {OHLCV_VIEW} WHERE {where_sql} ORDER BY date LIMIT ?)"""
+        )
+        params += [*where_params, limit]
+    query = " UNION ALL ".join(parts) + " ORDER BY g, date"
+    with closing(get_conn()) as conn:
+        columns = conn.execute(query, params).fetchnumpy()
+
+    bounds = np.searchsorted(columns.pop("g"), np.arange(len(symbols) + 1))
+    groups = {
+        symbol: {name: col[bounds[i]:bounds[i + 1]] for name, col in columns.items()}
+        for i, symbol in enumerate(symbols)
+    }
+    return grouped_json_response(groups)
 
 
 @router.get("/{symbol}", response_model=StockResponse)
-def get_stocks(
+async def get_stocks(
     symbol: str,
     start: date | None = Query(None),
     end: date | None = Query(None),
     limit: int = Query(1000, ge=1, le=2_000_000),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Kihagyott sorok (cursor-ral nem használható)"),
+    after: datetime | None = Query(
+        None, description="Keyset lapozás: csak az ennél későbbi sorok (date > after)"
+    ),
+    cursor: str | None = Query(
+        None, description="Az előző válasz next_cursor értéke (felülírja az after-t)"
+    ),
+    layout: Literal["rows", "columns", "ndjson"] = Query(
+        "rows",
+        description=(
+            "rows: soronkénti objektumok; columns: oszlopos JSON (gyors, nagy limithez); "
+            "ndjson: stream, soronként egy JSON objektum"
+        ),
+    ),
+    fmt: Literal["json", "arrow", "parquet", "csv"] | None = Query(
+        None,
+        alias="format",
+        description="Kimeneti formátum; ha nincs megadva, az Accept fejléc dönt (alap: json)",
+    ),
+    accept: str | None = Header(None),
+    max_points: int | None = Query(
+        None, ge=3, le=100_000, description="Grafikonhoz: legfeljebb ennyi pont (downsampling)"
+    ),
+    downsample: Literal["lttb", "minmax"] = Query(
+        "lttb",
+        description="lttb: Largest-Triangle-Three-Buckets; minmax: bucketenkénti min/max (max_points >= 4)",
+    ),
 ):
-    """OHLCV adatok lekérése szimbólum és dátum szerint."""
+    """
+    OHLCV adatok lekérése szimbólum és dátum szerint.
+    format=arrow|parquet|csv (vagy Accept fejléc): bináris/szöveges export DataFrame klienseknek.
+    Lapozás: offset helyett a next_cursor (cursor=...) – a mély oldalak is konstans idejűek.
+    max_points: a tartomány a close ár alapján mintavételezve (csak JSON rows/columns).
+    Kis JSON oldalak (limit <= LIGHT_MAX_ROWS) a light, a nagy és streamelt lekérések a bulk sávban futnak.
+    """
+    fmt = negotiate_format(fmt, accept)
+    light = fmt == "json" and layout != "ndjson" and limit <= LIGHT_MAX_ROWS
+    return await (LIGHT if light else BULK).run(
+        _query_stocks,
+        symbol, start, end, limit, offset, after, cursor, layout, fmt, max_points, downsample,
+    )
+
+
+def _query_stocks(
+    symbol: str,
+    start: date | None,
+    end: date | None,
+    limit: int,
+    offset: int,
+    after: datetime | None,
+    cursor: str | None,
+    layout: str,
+    fmt: str,
+    max_points: int | None,
+    downsample: str,
+):
+    """A /api/stocks/{symbol} lekérdezés (a sáv executorán fut)."""
     require_parquet()
 
     symbol = symbol.upper().strip()
-    parquet_path, where_sql, where_params = _get_parquet_and_where(symbol, start, end)
-    params = [parquet_path, *where_params, limit, offset]
+    if max_points and (fmt != "json" or layout == "ndjson"):
+        raise HTTPException(400, "A max_points csak JSON (rows/columns) válasznál használható.")
+    if cursor and offset:
+        # A cursor már az előző oldal végére mutat – az offset csendben sorokat hagyna ki
+        raise HTTPException(400, "A cursor és az offset nem használható együtt.")
+    if cursor:
+        after = _decode_cursor(cursor)
+    where_sql, where_params = _build_where_clause(symbol, start, end, after)
+    params = [*where_params, limit, offset]
 
-    conn = get_conn()
     query = f"""
         SELECT date, open, high, low, close, volume
-        FROM read_parquet(?)
+        FROM {OHLCV_VIEW}
         WHERE {where_sql}
         ORDER BY date
         LIMIT ? OFFSET ?
     """
-    rows = conn.execute(query, params).fetchall()
-    conn.close()
+    conn = get_conn()
+    if fmt != "json" or layout == "ndjson":
+        # Stream: a cursort a válasz generátora zárja le – itt csak hiba esetén
+        try:
+            if fmt != "json":
+                return binary_response(conn, query, params, fmt, symbol, STREAM_BATCH_ROWS)
+            return ndjson_stream_response(conn, query, params, STREAM_BATCH_ROWS)
+        except BaseException:
+            conn.close()
+            raise
+
+    with closing(conn):
+        if max_points or layout == "columns":
+            columns = conn.execute(query, params).fetchnumpy()
+        else:
+            rows = conn.execute(query, params).fetchall()
+
+    if max_points:
+        dates = columns["date"]
+        next_cursor = _encode_cursor(dates[-1]) if len(dates) == limit else None
+        # A minmax bucketenként 2 pontot ad – 4 pont alatt csak az első és az utolsó maradna
+        if downsample == "minmax" and max_points >= 4:
+            idx = minmax_indices(columns["close"], max_points)
+        else:
+            idx = lttb_indices(dates.astype("int64"), columns["close"], max_points)
+        columns = {name: col[idx] for name, col in columns.items()}
+        if layout == "columns":
+            return columnar_json_response(symbol, columns, next_cursor=next_cursor)
+        rows = zip(*(columns[c].tolist() for c in ("date", "open", "high", "low", "close", "volume")))
+        data = [
+            OHLCVRow(date=r[0], open=r[1], high=r[2], low=r[3], close=r[4], volume=r[5])
+            for r in rows
+        ]
+        return model_json_response(
+            StockResponse,
+            {"symbol": symbol, "data": data, "count": len(data), "next_cursor": next_cursor},
+        )
+
+    if layout == "columns":
+        dates = columns["date"]
+        next_cursor = _encode_cursor(dates[-1]) if len(dates) == limit else None
+        return columnar_json_response(symbol, columns, next_cursor=next_cursor)
+
+    next_cursor = _encode_cursor(rows[-1][0]) if len(rows) == limit else None
 
     data = [
         OHLCVRow(date=r[0], open=r[1], high=r[2], low=r[3], close=r[4], volume=r[5])
         for r in rows
     ]
-    return {"symbol": symbol, "data": data, "count": len(data)}
+    return model_json_response(
+        StockResponse,
+        {"symbol": symbol, "data": data, "count": len(data), "next_cursor": next_cursor},
+    )
 
 
 @router.get("/{symbol}/stats", response_model=StatsResponse)
-def get_stats(
+async def get_stats(
     symbol: str,
     start: date | None = Query(None),
     end: date | None = Query(None),
 ):
-    """Statisztikák egy szimbólumhoz."""
+    """Statisztikák egy szimbólumhoz (egysoros aggregátum – light sáv)."""
+    return await LIGHT.run(_query_stats, symbol, start, end)
+
+
+def _query_stats(symbol: str, start: date | None, end: date | None) -> StatsResponse:
     require_parquet()
 
     symbol = symbol.upper().strip()
-    parquet_path, where_sql, where_params = _get_parquet_and_where(symbol, start, end)
-    params = [parquet_path, *where_params]
+    cached = _stats_from_manifest(symbol, start, end)
+    if cached:
+        return cached
+
+    where_sql, params = _build_where_clause(symbol, start, end)
 
-    conn = get_conn()
     query = f"""
         SELECT
             MIN(date) as min_date,
@@ -89,11 +400,11 @@ def get_stats(
             COUNT(*) as row_count,
             MIN(low) as min_price,
             MAX(high) as max_price
-        FROM read_parquet(?)
+        FROM {OHLCV_VIEW}
         WHERE {where_sql}
     """
-    row = conn.execute(query, params).fetchone()
-    conn.close()
+    with closing(get_conn()) as conn:
+        row = conn.execute(query, params).fetchone()
 
     if not row or row[2] == 0:
         raise HTTPException(404, f"Nincs adat a(z) {symbol} szimbólumhoz.")
@@ -104,3 +415,137 @@ def get_stats(
         row_count=row[2],
         price_range={"min": row[3], "max": row[4]},
     )
+
+
+@router.get("/{symbol}/ohlcv", response_model=BarsResponse)
+async def get_bars(
+    symbol: str,
+    interval: Literal["5m", "15m", "1h", "1d"] = Query(..., description="Gyertya hossza"),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(100_000, ge=1, le=2_000_000),
+    layout: Literal["rows", "columns"] = Query("rows"),
+):
+    """
+    Újramintavételezett OHLCV gyertyák – az aggregálás DuckDB-ben fut (time_bucket).
+    open/close a bucket első/utolsó perce (arg_min/arg_max a dátum szerint).
+    Ha van megfelelő ETL rollup (1h, 1d), abból aggregál a perces adat helyett
+    (light sáv; a perces adatból aggregálás a bulk sávban fut). A forrás a sáv szálán dől el,
+    egyetlen beengedéssel – a sáv az intervalból jön (rollupból előállítható-e).
+    """
+    lane = LIGHT if _from_rollup(interval) else BULK
+    return await lane.run(_query_bars, symbol, interval, start, end, limit, layout)
+
+
+def _query_bars(
+    symbol: str,
+    interval: str,
+    start: date | None,
+    end: date | None,
+    limit: int,
+    layout: str,
+    source: str | None = None,
+    is_rollup: bool = False,
+):
+    """source: a gyertyák forrás view-ja (alap: _bars_source szerint)."""
+    require_parquet()
+    if source is None:
+        source, is_rollup = _bars_source(interval)
+
+    symbol = symbol.upper().strip()
+    where_sql, where_params = _build_where_clause(
+        symbol, start, end, end_exclusive=is_rollup, prune=not is_rollup
+    )
+
+    query = f"""
+        SELECT
+            time_bucket(INTERVAL '{BAR_INTERVALS[interval][0]}', date) AS date,
+            arg_min(open, date) AS open,
+            MAX(high) AS high,
+            MIN(low) AS low,
+            arg_max(close, date) AS close,
+            SUM(volume)::BIGINT AS volume
+        FROM {source}
+        WHERE {where_sql}
+        GROUP BY 1
+        ORDER BY 1
+        LIMIT ?
+    """
+    with closing(get_conn()) as conn:
+        if layout == "columns":
+            columns = conn.execute(query, [*where_params, limit]).fetchnumpy()
+        else:
+            rows = conn.execute(query, [*where_params, limit]).fetchall()
+    if layout == "columns":
+        return columnar_json_response(symbol, columns, interval=interval)
+
+    data = [
+        OHLCVRow(date=r[0], open=r[1], high=r[2], low=r[3], close=r[4], volume=r[5])
+        for r in rows
+    ]
+    return model_json_response(
+        BarsResponse,
+        {"symbol": symbol, "interval": interval, "data": data, "count": len(data)},
+    )
+
+
+@router.get("/{symbol}/indicators")
+async def get_indicators(
+    symbol: str,
+    names: str = Query(
+        "sma20,ema50,rsi14,vwap,bbands",
+        description="Vesszővel elválasztva: sma<N>, ema<N>, rsi<N>, bbands<N> (±2 szórás), vwap (napon belüli)",
+    ),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    limit: int = Query(100_000, ge=1, le=2_000_000),
+):
+    """
+    Technikai indikátorok szerveroldalon (NumPy) – a válasz csak date, close és az indikátor oszlopok.
+    A start előtti előzmény (a leghosszabb periódusnak megfelelő sor) ugyanabban a lekérdezésben olvasódik be,
+    így a start-tól kezdve minden érték bemelegedett; a kimenet a start előtti sorokat nem tartalmazza.
+    """
+    try:
+        specs = parse_indicators(names)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return await (LIGHT if limit <= LIGHT_MAX_ROWS else BULK).run(
+        _query_indicators, symbol, specs, start, end, limit
+    )
+
+
+def _query_indicators(
+    symbol: str,
+    specs: list[tuple[str, str, int]],
+    start: date | None,
+    end: date | None,
+    limit: int,
+):
+    require_parquet()
+
+    symbol = symbol.upper().strip()
+    select = f"SELECT date, high, low, close, volume FROM {OHLCV_VIEW}"
+    where_sql, where_params = _build_where_clause(symbol, start, end)
+    query = f"{select} WHERE {where_sql} ORDER BY date LIMIT ?"
+    params = [*where_params, limit]
+    lookback = lookback_rows(specs) if start else 0
+    if lookback:
+        # Bemelegedés: a start előtti utolsó lookback sor (havi elrendezésnél csak a start hónapjáig)
+        warm_sql, warm_params = _build_where_clause(symbol, None, start, end_exclusive=True)
+        query = f"""
+            ({select} WHERE {warm_sql} ORDER BY date DESC LIMIT ?)
+            UNION ALL ({query})
+            ORDER BY date
+        """
+        params = [*warm_params, lookback, *params]
+
+    with closing(get_conn()) as conn:
+        columns = conn.execute(query, params).fetchnumpy()
+
+    warm = int(np.searchsorted(columns["date"], np.datetime64(start))) if lookback else 0
+    values = compute(specs, columns)
+    out = {"date": columns["date"][warm:], "close": columns["close"][warm:]}
+    out.update((name, col[warm:]) for name, col in values.items())
+    return columnar_json_response(
+        symbol, out, indicators=[name for name, _, _ in specs], warmup_rows=warm
+    )
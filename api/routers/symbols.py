@@ -1,23 +1,33 @@
 """Szimbólumok listázása."""
+from contextlib import closing
+
 from fastapi import APIRouter
 
-from ..database import get_conn, get_parquet_glob, require_parquet
+from ..database import OHLCV_VIEW, get_conn, get_manifest, require_parquet
+from ..executor import LIGHT
 from ..schemas import SymbolsResponse
 
 router = APIRouter(prefix="/api", tags=["Symbols"])
 
 
 @router.get("/symbols", response_model=SymbolsResponse)
-def list_symbols():
+async def list_symbols():
     """Elérhető szimbólumok listája."""
+    return await LIGHT.run(_list_symbols)
+
+
+def _list_symbols() -> dict:
     require_parquet()
 
-    conn = get_conn()
-    result = conn.execute(
-        "SELECT DISTINCT symbol FROM read_parquet(?) ORDER BY symbol",
-        [get_parquet_glob()],
-    ).fetchall()
-    conn.close()
+    manifest = get_manifest()
+    if manifest:
+        symbols = list(manifest["symbols"])
+        return {"symbols": symbols, "count": len(symbols)}
+
+    with closing(get_conn()) as conn:
+        result = conn.execute(
+            f"SELECT DISTINCT symbol FROM {OHLCV_VIEW} ORDER BY symbol"
+        ).fetchall()
 
     symbols = [r[0] for r in result]
     return {"symbols": symbols, "count": len(symbols)}
@@ -17,6 +17,15 @@ class StockResponse(BaseModel):
     symbol: str
     data: list[OHLCVRow]
     count: int
+    next_cursor: str | None = None  # következő oldal (cursor=...), None ha nincs több
+
+
+class BarsResponse(BaseModel):
+    """Újramintavételezett (pl. 5 perces, napi) OHLCV gyertyák."""
+    symbol: str
+    interval: str
+    data: list[OHLCVRow]
+    count: int
 
 
 class SymbolsResponse(BaseModel):
@@ -0,0 +1 @@
+# Benchmarkok – reprodukálható mérések helyi, szintetikus adaton
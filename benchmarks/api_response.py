@@ -0,0 +1,131 @@
+"""
+/api/stocks/{symbol} válaszidő és memória – soronkénti (Pydantic) vs. oszlopos (NumPy + orjson).
+Szintetikus 1 perces adatot generál ideiglenes mappába, minden mérés külön folyamatban fut
+(így a csúcs RSS nem keveredik).
+Alapból tömörítés nélkül mér (Accept-Encoding: identity), hogy a GZip ne fedje el a különbséget.
+Futtatás: python -m benchmarks.api_response [--rows 10000 100000 1000000] [--repeat 3] [--gzip]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SYMBOL = "BENCH"
+LAYOUTS = ("rows", "columns")
+
+
+def _peak_rss_mb() -> float:
+    """A folyamat csúcs RSS-e MB-ban (Windows-on tracemalloc csúcs – csak Python heap)."""
+    try:
+        import resource
+    except ImportError:
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def generate_parquet(base: Path, rows: int) -> None:
+    """Szintetikus OHLCV partíció: base/symbol=BENCH/data.parquet."""
+    import duckdb
+
+    out_dir = base / f"symbol={SYMBOL}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    conn = duckdb.connect(":memory:")
+    conn.execute(
+        f"""
+        COPY (
+            SELECT
+                TIMESTAMP '2015-01-01 09:15:00' + to_minutes(i) AS date,
+                100 + random() AS open,
+                101 + random() AS high,
+                99 + random() AS low,
+                100 + random() AS close,
+                (random() * 10000)::BIGINT AS volume,
+                '{SYMBOL}' AS symbol
+            FROM range({rows}) r(i)
+        ) TO '{(out_dir / "data.parquet").as_posix()}' (FORMAT PARQUET)
+        """
+    )
+    conn.close()
+
+
+def _worker(rows: int, layout: str, repeat: int, gzip: bool = False) -> dict:
+    """Egy mérés (gyermekfolyamatban): bemelegítés, majd `repeat` lekérés."""
+    if sys.platform == "win32":
+        import tracemalloc
+        tracemalloc.start()
+
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    url = f"/api/stocks/{SYMBOL}"
+    params = {"limit": rows, "layout": layout}
+    headers = {"Accept-Encoding": "gzip" if gzip else "identity"}
+    with TestClient(app, headers=headers) as client:
+        client.get(url, params={"limit": 10, "layout": layout})
+        rss_before = _peak_rss_mb()
+        timings = []
+        size = 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            resp = client.get(url, params=params)
+            timings.append(time.perf_counter() - t0)
+            resp.raise_for_status()
+            size = len(resp.content)
+    return {
+        "rows": rows,
+        "layout": layout,
+        "latency_s": min(timings),
+        "payload_mb": size / 2**20,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_delta_mb": _peak_rss_mb() - rss_before,
+    }
+
+
+def main(row_counts: list[int], repeat: int = 3, gzip: bool = False) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        print(f"Szintetikus adat generálása ({max(row_counts):,} sor)...")
+        generate_parquet(base, max(row_counts))
+
+        env = {**os.environ, "PARQUET_PATH": str(base)}
+        for rows in row_counts:
+            for layout in LAYOUTS:
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.api_response",
+                     "--worker", str(rows), layout, "--repeat", str(repeat),
+                     *(["--gzip"] if gzip else [])],
+                    env=env, capture_output=True, text=True, check=True,
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(
+                    f"  {rows:>9,} sor  {layout:<8} "
+                    f"{result['latency_s'] * 1000:9.1f} ms  "
+                    f"{result['payload_mb']:8.1f} MB  "
+                    f"csúcs RSS {result['peak_rss_mb']:8.1f} MB "
+                    f"(+{result['peak_rss_delta_mb']:.1f})",
+                    flush=True,
+                )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API válaszformátum benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--gzip", action="store_true", help="GZip tömörítéssel mér")
+    parser.add_argument("--worker", nargs=2, metavar=("ROWS", "LAYOUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(int(args.worker[0]), args.worker[1], args.repeat, args.gzip)))
+    else:
+        main(args.rows, args.repeat, args.gzip)
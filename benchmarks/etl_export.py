@@ -0,0 +1,221 @@
+"""
+ETL export benchmark – CSV → Parquet motoronként, worker számonként, tömörítésenként és row group méretenként.
+A per-fájl workeres motorok (polars, duckdb) mellett a duckdb-single (egyetlen COPY, --workers szál) is mérhető.
+Alapból szintetikus, Nifty-szerű korpuszon fut (hálózat nélkül); --csv-dir-rel a valódi Kaggle CSV-ken.
+Mér: falióra- és CPU-idő, worker csúcs RSS, áteresztőképesség (sor/s, MB/s), kimeneti méret,
+valamint lépésenkénti időket (export, rollups, manifest, swap, source_hash – a feladatokra összegezve).
+Eredmény: <report>.json és <report>.csv – regressziós alapvonal az export változásaihoz.
+Futtatás: python -m benchmarks.etl_export [--symbols 8] [--rows 500000] [--engine polars duckdb duckdb-single]
+          [--workers 1 4] [--compression zstd snappy] [--row-group-size 25000 100000]
+          [--repeat 1] [--report etl_export]
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from etl.export_to_parquet import DEFAULT_LAYOUT, ROLLUP_TIERS, _run_export, rollup_path
+
+from .synthetic import generate_corpus
+
+STAGES = ("export", "rollups", "manifest", "swap", "source_hash")
+
+
+def _cpu_seconds() -> float:
+    """A folyamat és a (már leállt) gyermekfolyamatok user+sys CPU ideje (resource nélkül: csak a saját)."""
+    try:
+        import resource
+    except ImportError:
+        return time.process_time()
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _size_mb(base: Path) -> float:
+    return sum(f.stat().st_size for f in base.rglob("*.parquet")) / 2**20
+
+
+def run_case(
+    csv_files: list[Path], out_root: Path, engine: str, workers: int, layout: dict
+) -> dict:
+    """Egy teljes export (friss kimeneti mappába, friss worker pool) és a mért értékei."""
+    shutil.rmtree(out_root, ignore_errors=True)
+    base = out_root / "parquet"
+    base.mkdir(parents=True)
+    args_list = [
+        (str(f), str(base), f.stem.replace("_minute", ""), engine, layout) for f in csv_files
+    ]
+
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    results = list(_run_export(args_list, engine, workers, budget_mb=None))
+    wall = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_before
+
+    failed = [(symbol, msg) for symbol, success, msg, _, _ in results if not success]
+    if failed:
+        raise RuntimeError(f"Sikertelen export: {failed[:3]}")
+
+    worker_peaks: dict[int, float] = {}
+    stages = dict.fromkeys(STAGES, 0.0)
+    for _, _, _, _, stats in results:
+        if stats["peak_rss_mb"] is not None:
+            worker_peaks[stats["pid"]] = max(worker_peaks.get(stats["pid"], 0.0), stats["peak_rss_mb"])
+        for name, seconds in stats["stages"].items():
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    rows = sum(record["parquet"]["row_count"] for _, _, _, record, _ in results)
+    csv_mb = sum(f.stat().st_size for f in csv_files) / 2**20
+    return {
+        "engine": engine,
+        "workers": workers,
+        "compression": layout["compression"],
+        "row_group_size": layout["row_group_size"],
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "peak_rss_mb": round(max(worker_peaks.values()), 1) if worker_peaks else None,
+        "workers_rss_sum_mb": round(sum(worker_peaks.values()), 1) if worker_peaks else None,
+        "rows": rows,
+        "rows_per_s": round(rows / wall),
+        "csv_mb": round(csv_mb, 1),
+        "mb_per_s": round(csv_mb / wall, 1),
+        "output_mb": round(_size_mb(base), 1),
+        "rollup_mb": round(sum(_size_mb(rollup_path(base, tier)) for tier in ROLLUP_TIERS), 1),
+        **{f"stage_{name}_s": round(seconds, 3) for name, seconds in stages.items()},
+    }
+
+
+def write_report(report_base: Path, meta: dict, cases: list[dict]) -> None:
+    """<report>.json (metaadatok + esetek) és <report>.csv (esetenként egy sor)."""
+    report_base.parent.mkdir(parents=True, exist_ok=True)
+    json_path = report_base.with_suffix(".json")
+    json_path.write_text(json.dumps({"meta": meta, "cases": cases}, indent=2), encoding="utf-8")
+    csv_path = report_base.with_suffix(".csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(cases[0]))
+        writer.writeheader()
+        writer.writerows(cases)
+    print(f"\nRiport: {json_path}, {csv_path}")
+
+
+def main(
+    csv_dir: Path | None,
+    symbols: int,
+    rows: int,
+    engines: list[str],
+    workers_list: list[int],
+    compressions: list[str],
+    row_group_sizes: list[int],
+    repeat: int,
+    report_base: Path,
+) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if csv_dir is None:
+            print(f"Szintetikus korpusz: {symbols} szimbólum × {rows:,} sor...")
+            csv_files = generate_corpus(tmp / "csv", symbols, rows)
+        else:
+            csv_files = sorted(csv_dir.glob("*_minute.csv"))
+        csv_mb = sum(f.stat().st_size for f in csv_files) / 2**20
+        print(f"{len(csv_files)} CSV, {csv_mb:.1f} MB")
+
+        cases = []
+        for engine, workers, compression, row_group_size in itertools.product(
+            engines, workers_list, compressions, row_group_sizes
+        ):
+            layout = {
+                **DEFAULT_LAYOUT,
+                "compression": compression,
+                "row_group_size": row_group_size,
+            }
+            # Több ismétlésnél a legrövidebb falióra-idejű futás számít
+            runs = [
+                run_case(csv_files, tmp / "out", engine, workers, layout) for _ in range(repeat)
+            ]
+            case = min(runs, key=lambda r: r["wall_s"])
+            cases.append(case)
+            rss = f"{case['peak_rss_mb']:7.0f} MB" if case["peak_rss_mb"] is not None else "    n/a"
+            print(
+                f"  {engine:<13} w={workers:<2} {compression:<7} rg={row_group_size:<7,} "
+                f"{case['wall_s']:7.2f} s  CPU {case['cpu_s']:7.2f} s  RSS {rss}  "
+                f"{case['rows_per_s']:>10,} sor/s  {case['mb_per_s']:6.1f} MB/s  "
+                f"kimenet {case['output_mb']:7.1f} MB"
+            )
+
+    meta = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "versions": {name: _version(name) for name in ("polars", "duckdb", "pyarrow")},
+        "corpus": {
+            "csv_dir": str(csv_dir) if csv_dir else None,
+            "files": len(csv_files),
+            "rows_per_file": None if csv_dir else rows,
+            "csv_mb": round(csv_mb, 1),
+        },
+        "repeat": repeat,
+    }
+    write_report(report_base, meta, cases)
+    return cases
+
+
+def _version(module: str) -> str | None:
+    try:
+        return __import__(module).__version__
+    except ImportError:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETL (CSV → Parquet) export benchmark")
+    parser.add_argument("--csv-dir", type=Path, default=None, help="Valódi *_minute.csv mappa")
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument(
+        "--engine",
+        nargs="+",
+        choices=["polars", "duckdb", "duckdb-single"],
+        default=["polars", "duckdb", "duckdb-single"],
+        help="duckdb-single: egy COPY az összes CSV-re, --workers szálon",
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, min(os.cpu_count() or 4, 8)])
+    parser.add_argument(
+        "--compression",
+        nargs="+",
+        choices=["zstd", "snappy", "lz4", "gzip", "uncompressed"],
+        default=[DEFAULT_LAYOUT["compression"]],
+    )
+    parser.add_argument(
+        "--row-group-size", type=int, nargs="+", default=[DEFAULT_LAYOUT["row_group_size"]]
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Ismétlések esetenként (legjobb számít)")
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=Path("etl_export"),
+        help="Riport fájl alapneve (.json és .csv kerül mellé, alap: %(default)s)",
+    )
+    args = parser.parse_args()
+    main(
+        args.csv_dir,
+        args.symbols,
+        args.rows,
+        args.engine,
+        args.workers,
+        args.compression,
+        args.row_group_size,
+        args.repeat,
+        args.report,
+    )
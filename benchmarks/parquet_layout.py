@@ -0,0 +1,117 @@
+"""
+Parquet elrendezés benchmark – szűk dátumablakos lekérdezések a régi (alap Polars írás)
+és a hangolt (rendezett, explicit séma, row group + zstd) export után.
+Alapból szintetikus korpuszon fut; --csv-dir-rel a valódi Kaggle CSV-ken (teljes dataset).
+Futtatás: python -m benchmarks.parquet_layout [--csv-dir DIR] [--symbols 10] [--rows 1000000]
+          [--row-group-size 10000 25000 100000]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from etl.export_to_parquet import DEFAULT_LAYOUT, _export_polars
+
+from .synthetic import generate_corpus
+
+
+def _export_legacy(csv_path: Path, parquet_base: Path, symbol: str) -> None:
+    """A korábbi export: try_parse_dates, alapértelmezett row group és tömörítés, rendezés nélkül."""
+    import polars as pl
+
+    df = pl.read_csv(csv_path, try_parse_dates=True)
+    df = df.with_columns(pl.lit(symbol).alias("symbol"))
+    out_dir = parquet_base / f"symbol={symbol}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    df.write_parquet(out_dir / "data.parquet")
+
+
+def _store_size_mb(base: Path) -> float:
+    return sum(f.stat().st_size for f in base.rglob("*.parquet")) / 2**20
+
+
+def _query_windows(base: Path, symbols: list[str], queries: int, window_days: int) -> list[float]:
+    """Véletlen szimbólum + `window_days` napos ablak; lekérdezésenkénti idő (s)."""
+    import duckdb
+
+    file_list = ", ".join(f"'{f.as_posix()}'" for f in sorted(base.rglob("*.parquet")))
+    conn = duckdb.connect(":memory:")
+    conn.execute(
+        f"CREATE VIEW ohlcv AS SELECT * FROM read_parquet([{file_list}], hive_partitioning = true)"
+    )
+    lo, hi = conn.execute("SELECT MIN(date), MAX(date) FROM ohlcv").fetchone()
+    span_days = max(1, (hi - lo).days - window_days)
+
+    rng = np.random.default_rng(0)
+    timings = []
+    for _ in range(queries):
+        symbol = symbols[rng.integers(len(symbols))]
+        start = np.datetime64(lo.date()) + np.timedelta64(int(rng.integers(span_days)), "D")
+        end = start + np.timedelta64(window_days, "D")
+        t0 = time.perf_counter()
+        conn.execute(
+            """
+            SELECT COUNT(*), MIN(low), MAX(high), SUM(volume)
+            FROM ohlcv WHERE symbol = ? AND date >= ? AND date < ?
+            """,
+            [symbol, str(start), str(end)],
+        ).fetchone()
+        timings.append(time.perf_counter() - t0)
+    conn.close()
+    return timings
+
+
+def main(
+    csv_dir: Path | None,
+    symbols: int,
+    rows: int,
+    queries: int,
+    window_days: int,
+    row_group_sizes: list[int] | None = None,
+) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if csv_dir is None:
+            print(f"Szintetikus korpusz: {symbols} szimbólum × {rows:,} sor...")
+            csv_files = generate_corpus(tmp / "csv", symbols, rows)
+        else:
+            csv_files = sorted(csv_dir.glob("*_minute.csv"))
+        names = [f.stem.replace("_minute", "") for f in csv_files]
+
+        layouts = {
+            f"rg={size:,}": {**DEFAULT_LAYOUT, "row_group_size": size}
+            for size in row_group_sizes or [DEFAULT_LAYOUT["row_group_size"]]
+        }
+        stores = {"legacy": tmp / "legacy", **{name: tmp / name for name in layouts}}
+        for csv_path, symbol in zip(csv_files, names):
+            _export_legacy(csv_path, stores["legacy"], symbol)
+            for name, layout in layouts.items():
+                _export_polars(csv_path, stores[name], symbol, layout)
+
+        print(f"{queries} lekérdezés, {window_days} napos ablak")
+        for name, base in stores.items():
+            _query_windows(base, names, 5, window_days)  # bemelegítés (OS cache)
+            timings = _query_windows(base, names, queries, window_days)
+            timings.sort()
+            print(
+                f"  {name:<12} méret {_store_size_mb(base):8.1f} MB  "
+                f"medián {statistics.median(timings) * 1000:7.2f} ms  "
+                f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet elrendezés benchmark")
+    parser.add_argument("--csv-dir", type=Path, default=None, help="Valódi *_minute.csv mappa")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window-days", type=int, default=1)
+    parser.add_argument("--row-group-size", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+    main(
+        args.csv_dir, args.symbols, args.rows, args.queries, args.window_days, args.row_group_size
+    )
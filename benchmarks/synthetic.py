@@ -0,0 +1,49 @@
+"""
+Szintetikus, Nifty-szerű CSV korpusz – hálózat nélküli, reprodukálható mérésekhez.
+Szimbólumonként egy <SYMBOL>_minute.csv (date,open,high,low,close,volume), munkanapokon
+09:15–15:29 közötti 1 perces gyertyákkal (375 sor/nap), véletlen bolyongású árral.
+"""
+from pathlib import Path
+
+import numpy as np
+
+BARS_PER_DAY = 375  # 09:15 – 15:29
+
+
+def trading_minutes(rows: int, start: str = "2015-01-01") -> np.ndarray:
+    """Az első `rows` tőzsdei perc (hétköznapok, 09:15-től) datetime64[m] tömbként."""
+    days_needed = -(-rows // BARS_PER_DAY)
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(start, "D") + days_needed * 2)
+    days = days[np.is_busday(days)][:days_needed]
+    minutes = np.arange(BARS_PER_DAY, dtype="timedelta64[m]") + np.timedelta64(9 * 60 + 15, "m")
+    return (days.astype("datetime64[m]")[:, None] + minutes[None, :]).ravel()[:rows]
+
+
+def write_symbol_csv(path: Path, rows: int, seed: int) -> None:
+    """Egy szimbólum CSV-je – OHLC konzisztens (low ≤ open, close ≤ high)."""
+    import polars as pl
+
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, rows)) * close
+    pl.DataFrame({
+        "date": trading_minutes(rows).astype("datetime64[us]"),
+        "open": open_.round(2),
+        "high": (np.maximum(open_, close) + spread).round(2),
+        "low": (np.minimum(open_, close) - spread).round(2),
+        "close": close.round(2),
+        "volume": rng.integers(0, 50_000, rows),
+    }).write_csv(path, datetime_format="%Y-%m-%d %H:%M:%S")
+
+
+def generate_corpus(out_dir: Path, symbols: int, rows: int, seed: int = 42) -> list[Path]:
+    """`symbols` db CSV (SYM000_minute.csv, ...) `rows` sorral; a meglévőket újrahasználja."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(symbols):
+        path = out_dir / f"SYM{i:03d}_minute.csv"
+        if not path.exists():
+            write_symbol_csv(path, rows, seed + i)
+        paths.append(path)
+    return paths
@@ -2,14 +2,66 @@
 CSV → Parquet export – Polars vagy DuckDB, párhuzamos feldolgozás.
 Polars: Rust alapú, 5–10× gyorsabb Pandasnál.
 DuckDB: SQL-lel közvetlen CSV → Parquet.
-Futtatás: python -m etl.export_to_parquet [--engine polars|duckdb] [--workers N]
+DuckDB single: egyetlen COPY az összes CSV-re (PARTITION_BY symbol), a DuckDB belső párhuzamosságával.
+Futtatás: python -m etl.export_to_parquet [--engine polars|duckdb|duckdb-single] [--workers N] [--full]
+Inkrementális: csak a megváltozott CSV-k partíciói íródnak újra (állapot: _etl_state.json).
 """
+import hashlib
+import json
+import multiprocessing
 import os
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import queue
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 PARQUET_PATH = PROJECT_ROOT / "data" / "parquet"
+# Szimbólumonkénti metaadatok – az API ebből szolgál ki, és ebből látja az adatverziót
+MANIFEST_PATH = PARQUET_PATH / "_manifest.json"
+# Inkrementális export állapota: forrás CSV ujjlenyomat + a kiírt partíció metaadatai szimbólumonként
+STATE_PATH = PARQUET_PATH / "_etl_state.json"
+
+# Parquet elrendezés: dátum szerint rendezve, explicit séma, hangolható row group és tömörítés.
+# A row groupok min/max statisztikái alapján a DuckDB kihagyja a dátumszűrőn kívüli blokkokat.
+DEFAULT_LAYOUT = {
+    "row_group_size": 25_000,  # sor / row group (~1M sor/szimbólum → ~40 blokk, ~65 nap/blokk)
+    "compression": "zstd",
+    "compression_level": 3,
+    "float32": False,  # OHLC float32-ként (kisebb fájl, ~7 értékes jegy)
+    # symbol: symbol=X/data.parquet; month: symbol=X/year=YYYY/month=MM/part-0.parquet
+    "partition_by": "symbol",
+}
+PRICE_COLUMNS = ("open", "high", "low", "close")
+# Szimbólum a CSV fájlnévből (…/TCS_minute.csv → TCS) – a duckdb-single mód SQL-jében
+SYMBOL_FROM_FILENAME = r"([^/\\]+)_minute\.csv$"
+
+# Memóriakorlátos ütemezés: egy feladat becsült csúcs RSS-e = alap + szorzó × CSV méret
+# (polars streaming + rendezés, 100 MB CSV → ~290 MB mért csúcs; eager olvasással ~470 MB)
+WORKER_BASE_MB = 120
+CSV_MEMORY_FACTOR = 2.0
+MEMORY_BUDGET_FRACTION = 0.7  # az elérhető RAM ekkora része jut a workereknek
+
+# Előaggregált gyertyák (data/parquet_1h, data/parquet_1d) – tier → DuckDB INTERVAL
+ROLLUP_TIERS = {"1h": "1 hour", "1d": "1 day"}
+# Gyertya aggregátumok: open/close a bucket első/utolsó perce
+ROLLUP_AGGREGATES = """
+    arg_min(open, date) AS open,
+    MAX(high) AS high,
+    MIN(low) AS low,
+    arg_max(close, date) AS close,
+    SUM(volume)::BIGINT AS volume
+"""
+
+
+def rollup_path(parquet_base: Path, tier: str) -> Path:
+    """Rollup tier mappája a perces store mellett (pl. data/parquet → data/parquet_1h)."""
+    return parquet_base.parent / f"{parquet_base.name}_{tier}"
 
 
 def get_dataset_path() -> Path:
@@ -20,86 +72,760 @@ def get_dataset_path() -> Path:
     ))
 
 
-def _process_file(args: tuple) -> tuple[str, bool, str]:
+def _sha256(paths: list[Path]) -> str:
+    """Fájlok közös SHA-256 ellenőrzőösszege (a megadott sorrendben)."""
+    digest = hashlib.sha256()
+    for f in paths:
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _partition_dirs(parquet_base: Path, symbol: str) -> list[Path]:
+    """Egy szimbólum összes kimeneti mappája: perces partíció + rollup tierek."""
+    return [parquet_base / f"symbol={symbol}"] + [
+        rollup_path(parquet_base, tier) / f"symbol={symbol}" for tier in ROLLUP_TIERS
+    ]
+
+
+def _replace_dir(src: Path, dst: Path) -> None:
+    """
+    Kész partíció közzététele a meglévő mappába: fájlonként os.replace (atomikus), a mappa sosem hiányzik.
+    A lecserélt fájlok útvonala változatlan (symbol=X/data.parquet), így a futó API rögzített fájllistája
+    a csere alatt is olvasható – előbb a régi, utána az új tartalmat látja, félkészet soha.
+    Az új kimenetben nem szereplő régi fájlok (hozzáfűzött part fájlok, megszűnt hónapok) a csere után
+    törlődnek; ezeket az API a következő manifestig (a katalógus frissítéséig) hiányolhatja.
+    """
+    files = sorted(p.relative_to(src) for p in src.rglob("*") if p.is_file())
+    for rel in files:
+        (dst / rel).parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src / rel, dst / rel)
+    keep = set(files)
+    for p in sorted(dst.rglob("*"), reverse=True):  # mélyebb útvonalak előbb – az üres mappák is törölhetők
+        if p.is_dir():
+            if not any(p.iterdir()):
+                p.rmdir()
+        elif p.relative_to(dst) not in keep:
+            p.unlink()
+
+
+def _peak_rss_mb() -> float | None:
+    """A folyamat eddigi csúcs RSS-e MB-ban (resource modul nélkül, pl. Windows-on: None)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def available_memory_mb() -> float | None:
+    """Elérhető RAM MB-ban (Linux: MemAvailable, egyébként sysconf; ismeretlen: None)."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_memory_mb(csv_path: Path) -> float:
+    """Egy CSV exportjának becsült csúcs memóriája (MB)."""
+    return WORKER_BASE_MB + CSV_MEMORY_FACTOR * csv_path.stat().st_size / 2**20
+
+
+def _state_record(csv_path: Path, stat: os.stat_result, layout: dict, entry: dict) -> dict:
+    """Egy szimbólum állapot rekordja: forrás ujjlenyomat (a SHA-256 itt számolódik), layout, manifest bejegyzés."""
+    return {
+        "source": {
+            "path": str(csv_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _sha256([csv_path]),
+        },
+        "layout": layout,
+        "parquet": entry,
+    }
+
+
+def _process_file(args: tuple) -> tuple[str, bool, str, dict | None, dict]:
     """
     Egy CSV feldolgozása (worker – ProcessPoolExecutor-ban fut).
-    args: (csv_path, parquet_base, symbol, engine)
-    Returns: (symbol, success, msg)
+    A kimenet először egy staging mappába íródik (data/.staging/<symbol>/), és csak
+    siker esetén cseréli le a régi partíciót – hiba esetén a régi adat érintetlen marad.
+    args: (csv_path, parquet_base, symbol, engine, layout)
+    Returns: (symbol, success, msg, állapot rekord: source/layout/parquet,
+              worker statisztika: pid, seconds, peak_rss_mb, stages)
+    stages: lépésenkénti idő (s) – export, rollups, manifest (checksum), swap, source_hash
     """
-    csv_path, parquet_base, symbol, engine = args
+    csv_path, parquet_base, symbol, engine, layout = args
     csv_path = Path(csv_path)
     parquet_base = Path(parquet_base)
+    stage_root = parquet_base.parent / ".staging" / symbol
+    stage_base = stage_root / parquet_base.name
+    started = time.perf_counter()
+    stages: dict[str, float] = {}
+    lap = [started]
+
+    def stage(name: str) -> None:
+        now = time.perf_counter()
+        stages[name] = now - lap[0]
+        lap[0] = now
+
+    def stats() -> dict:
+        return {
+            "pid": os.getpid(),
+            "seconds": time.perf_counter() - started,
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": stages,
+        }
+
     try:
+        shutil.rmtree(stage_root, ignore_errors=True)
+        stat = csv_path.stat()
         if engine == "duckdb":
-            _export_duckdb(csv_path, parquet_base, symbol)
+            _export_duckdb(csv_path, stage_base, symbol, layout)
         else:
-            _export_polars(csv_path, parquet_base, symbol)
-        return (symbol, True, "ok")
+            _export_polars(csv_path, stage_base, symbol, layout)
+        stage("export")
+        _export_rollups(stage_base, symbol, layout)
+        stage("rollups")
+        entry = partition_manifest_entry(stage_base / f"symbol={symbol}")
+        stage("manifest")
+        for src, dst in zip(
+            _partition_dirs(stage_base, symbol), _partition_dirs(parquet_base, symbol)
+        ):
+            _replace_dir(src, dst)
+        stage("swap")
+        record = _state_record(csv_path, stat, layout, entry)
+        stage("source_hash")
+        return (symbol, True, "ok", record, stats())
     except Exception as e:
-        return (symbol, False, str(e))
+        return (symbol, False, str(e), None, stats())
+    finally:
+        shutil.rmtree(stage_root, ignore_errors=True)
 
 
-def _export_polars(csv_path: Path, parquet_base: Path, symbol: str) -> None:
-    """Polars: CSV olvasás → symbol oszlop → Parquet írás."""
+def _export_polars(csv_path: Path, parquet_base: Path, symbol: str, layout: dict) -> None:
+    """
+    Polars streaming: scan_csv explicit sémával → dátum szerint rendezés → sink_parquet.
+    A CSV nem töltődik be egészben; havi bontásnál egy rendezett köztes fájlból
+    hónaponként dátumszűrt sink készül (a row group statisztikák miatt csak az adott hónap blokkjai olvasódnak).
+    """
     import polars as pl
 
-    df = pl.read_csv(csv_path, try_parse_dates=True)
-    df = df.with_columns(pl.lit(symbol).alias("symbol"))
     out_dir = parquet_base / f"symbol={symbol}"
     out_dir.mkdir(parents=True, exist_ok=True)
-    df.write_parquet(out_dir / "data.parquet")
+    lf = scan_csv_polars(csv_path, symbol, layout).sort("date")
+    write_opts = _polars_write_opts(layout)
+    if layout["partition_by"] != "month":
+        lf.sink_parquet(out_dir / "data.parquet", **write_opts)
+        return
+
+    sorted_path = out_dir / "_sorted.parquet.tmp"
+    lf.sink_parquet(sorted_path, **write_opts)
+    try:
+        months = (
+            pl.scan_parquet(sorted_path)
+            .select(pl.col("date").dt.truncate("1mo").unique().sort())
+            .collect()
+            .to_series()
+        )
+        for month_start in months:
+            next_month = datetime(
+                month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1
+            )
+            part_dir = out_dir / f"year={month_start.year}" / f"month={month_start.month:02d}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            (
+                pl.scan_parquet(sorted_path)
+                .filter((pl.col("date") >= month_start) & (pl.col("date") < next_month))
+                .sink_parquet(part_dir / "part-0.parquet", **write_opts)
+            )
+    finally:
+        sorted_path.unlink(missing_ok=True)
+
+
+def scan_csv_polars(csv_path: Path, symbol: str, layout: dict):
+    """
+    Minute CSV lusta olvasása a Parquet sémára (polars LazyFrame, explicit séma – nincs típus-kikövetkeztetés).
+    A dátum a CSV első 19 karaktere (tőzsdei helyi idő, az esetleges +05:30 eltolás nélkül).
+    """
+    import polars as pl
 
+    price_type = pl.Float32 if layout["float32"] else pl.Float64
+    lf = pl.scan_csv(
+        csv_path,
+        schema={
+            "date": pl.String,
+            **{c: pl.Float64 for c in PRICE_COLUMNS},
+            "volume": pl.Float64,
+        },
+    )
+    return lf.select(
+        pl.col("date").str.slice(0, 19).str.to_datetime(time_unit="us"),
+        *(pl.col(c).cast(price_type) for c in PRICE_COLUMNS),
+        pl.col("volume").cast(pl.Int64),
+        pl.lit(symbol).alias("symbol"),
+    )
 
-def _export_duckdb(csv_path: Path, parquet_base: Path, symbol: str) -> None:
-    """DuckDB: SQL-lel közvetlen CSV → Parquet."""
+
+def read_csv_polars(csv_path: Path, symbol: str, layout: dict):
+    """Minute CSV beolvasása a Parquet sémára (polars DataFrame – kis, napi fájlokhoz)."""
+    return scan_csv_polars(csv_path, symbol, layout).collect()
+
+
+def _polars_write_opts(layout: dict) -> dict:
+    """Parquet írási opciók a layoutból (write_parquet és sink_parquet közös)."""
+    return {
+        "compression": layout["compression"],
+        "compression_level": layout["compression_level"],
+        "row_group_size": layout["row_group_size"],
+        "statistics": True,
+    }
+
+
+def _duckdb_copy_opts(layout: dict) -> str:
+    """Parquet COPY opciók a layoutból (a DuckDB csak zstd-nél fogad el tömörítési szintet)."""
+    level = (
+        f", COMPRESSION_LEVEL {int(layout['compression_level'])}"
+        if layout["compression"] == "zstd" else ""
+    )
+    return (
+        f"COMPRESSION {layout['compression']}{level}, "
+        f"ROW_GROUP_SIZE {int(layout['row_group_size'])}"
+    )
+
+
+def write_partition(df, out_dir: Path, layout: dict, name: str | None = None) -> None:
+    """
+    Rendezett DataFrame kiírása egy symbol partícióba a layout szerint
+    (month: year=YYYY/month=MM/ almappánként egy fájl).
+    name: fájlnév (alap: data.parquet, ill. havi bontásnál part-0.parquet).
+    A fájl .tmp néven íródik, majd rename – a futó API sosem lát félkész fájlt.
+    """
+    import polars as pl
+
+    write_opts = _polars_write_opts(layout)
+
+    def write(part, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        part.write_parquet(tmp, **write_opts)
+        os.replace(tmp, path)
+
+    if layout["partition_by"] != "month":
+        write(df, out_dir / (name or "data.parquet"))
+        return
+
+    months = df.with_columns(
+        pl.col("date").dt.year().alias("_year"), pl.col("date").dt.month().alias("_month")
+    )
+    for (year, month), part in months.group_by(["_year", "_month"], maintain_order=True):
+        part_path = out_dir / f"year={year}" / f"month={month:02d}" / (name or "part-0.parquet")
+        write(part.drop("_year", "_month"), part_path)
+
+
+def _export_duckdb(csv_path: Path, parquet_base: Path, symbol: str, layout: dict) -> None:
+    """DuckDB: SQL-lel közvetlen CSV → Parquet (explicit típusok, dátum szerint rendezve)."""
     import duckdb
 
     out_dir = parquet_base / f"symbol={symbol}"
     out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / "data.parquet"
+    monthly = layout["partition_by"] == "month"
+    # Havi bontásnál a year/month hive mappa lesz (a fájlba nem kerül be)
+    out_path = out_dir if monthly else out_dir / "data.parquet"
+    partition_cols = (
+        ", year(date) AS year, lpad(month(date)::VARCHAR, 2, '0') AS month" if monthly else ""
+    )
+    partition_opts = (
+        ", PARTITION_BY (year, month), FILENAME_PATTERN 'part-{i}', OVERWRITE_OR_IGNORE"
+        if monthly else ""
+    )
 
+    price_type = "FLOAT" if layout["float32"] else "DOUBLE"
+    prices = ", ".join(f"{c}::{price_type} AS {c}" for c in PRICE_COLUMNS)
     conn = duckdb.connect(":memory:")
     conn.execute(
-        """
+        f"""
         COPY (
-            SELECT *, ?::VARCHAR as symbol
-            FROM read_csv_auto(?)
-        ) TO ? (FORMAT PARQUET)
+            SELECT *{partition_cols}
+            FROM (
+                SELECT
+                    left(date, 19)::TIMESTAMP AS date,
+                    {prices},
+                    volume::BIGINT AS volume,
+                    $symbol::VARCHAR AS symbol
+                FROM read_csv($csv_path, header = true, all_varchar = true)
+            )
+            ORDER BY date
+        ) TO $out_path (FORMAT PARQUET, {_duckdb_copy_opts(layout)}{partition_opts})
         """,
-        [symbol, str(csv_path), str(out_path)],
+        {"symbol": symbol, "csv_path": str(csv_path), "out_path": str(out_path)},
     )
     conn.close()
 
 
-def main(engine: str = "polars", workers: int | None = None):
-    """Parquet export – párhuzamosan, Polars vagy DuckDB motorral."""
+def _export_rollups(
+    parquet_base: Path, symbol: str, layout: dict, out_base: Path | None = None
+) -> None:
+    """
+    Órás és napi gyertyák a frissen írt perces partícióból (ugyanabban a workerben).
+    open/close a bucket első/utolsó perce; a bucketek a time_bucket alapértelmezett origójához igazodnak.
+    A fájlok a perces adattal azonos tömörítéssel és row group mérettel íródnak (layout).
+    out_base: a rollup tierek helye ennek a store-nak a mellett (alap: parquet_base).
+    """
+    import duckdb
+
+    source = (parquet_base / f"symbol={symbol}" / "**" / "*.parquet").as_posix()
+    conn = duckdb.connect(":memory:")
+    for tier, interval in ROLLUP_TIERS.items():
+        out_dir = rollup_path(out_base or parquet_base, tier) / f"symbol={symbol}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        conn.execute(
+            f"""
+            COPY (
+                SELECT
+                    time_bucket(INTERVAL '{interval}', date) AS date,
+                    {ROLLUP_AGGREGATES},
+                    $symbol::VARCHAR AS symbol
+                FROM read_parquet($source)
+                GROUP BY 1
+                ORDER BY 1
+            ) TO $out_path (FORMAT PARQUET, {_duckdb_copy_opts(layout)})
+            """,
+            {"symbol": symbol, "source": source, "out_path": str(out_dir / "data.parquet")},
+        )
+    conn.close()
+
+
+def _export_consolidated(
+    args_list: list[tuple], threads: int, memory_limit_mb: float | None
+) -> list[tuple]:
+    """
+    DuckDB single mód: egyetlen COPY az összes CSV-re, PARTITION_BY (symbol) – egy kapcsolat,
+    szabályozott threads/memory_limit mellett (nincs folyamatonkénti szálkészlet-verseny).
+    A symbol a fájlnévből jön (regexp_extract), a rollupok szintén egy-egy partícionált COPY-val készülnek.
+    Globális rendezés nincs: a párhuzamos partícionált írás úgysem tartja meg a sorrendet,
+    de a row groupok a forrás szerinti, szűk dátumtartományú blokkok maradnak. Csak symbol elrendezéssel.
+    Az eredmény formátuma a _process_file-é; a közös lépések ideje egyenlően oszlik el a szimbólumok közt.
+    """
+    import duckdb
+
+    parquet_base = Path(args_list[0][1])
+    layout = args_list[0][4]
+    symbols = [a[2] for a in args_list]
+    stage_root = parquet_base.parent / ".staging" / "_consolidated"
+    stage_base = stage_root / parquet_base.name
+    started = time.perf_counter()
+    shared: dict[str, float] = {}
+
+    def stats(seconds: float, stages: dict) -> dict:
+        return {
+            "pid": os.getpid(),
+            "seconds": seconds,
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": stages,
+        }
+
+    shutil.rmtree(stage_root, ignore_errors=True)
+    stage_base.mkdir(parents=True)
+    try:
+        price_type = "FLOAT" if layout["float32"] else "DOUBLE"
+        prices = ", ".join(f"{c}::{price_type} AS {c}" for c in PRICE_COLUMNS)
+        conn = duckdb.connect(":memory:")
+        conn.execute(f"SET threads = {int(threads)}")
+        if memory_limit_mb:
+            conn.execute(f"SET memory_limit = '{int(memory_limit_mb)}MB'")
+        conn.execute("SET temp_directory = $tmp", {"tmp": str(stage_root / "spill")})
+
+        t0 = time.perf_counter()
+        conn.execute(
+            f"""
+            COPY (
+                SELECT
+                    left(date, 19)::TIMESTAMP AS date,
+                    {prices},
+                    volume::BIGINT AS volume,
+                    regexp_extract(filename, $symbol_re, 1) AS symbol
+                FROM read_csv($csv_paths, header = true, all_varchar = true, filename = true)
+            ) TO $out_dir (
+                FORMAT PARQUET,
+                {_duckdb_copy_opts(layout)},
+                PARTITION_BY (symbol),
+                WRITE_PARTITION_COLUMNS true,
+                FILENAME_PATTERN 'data_{{i}}'
+            )
+            """,
+            {
+                "csv_paths": [a[0] for a in args_list],
+                "out_dir": str(stage_base),
+                "symbol_re": SYMBOL_FROM_FILENAME,
+            },
+        )
+        shared["export"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        source = (stage_base / "*" / "*.parquet").as_posix()
+        for tier, interval in ROLLUP_TIERS.items():
+            conn.execute(
+                f"""
+                COPY (
+                    SELECT
+                        time_bucket(INTERVAL '{interval}', date) AS date,
+                        {ROLLUP_AGGREGATES},
+                        symbol
+                    FROM read_parquet($source, hive_partitioning = true)
+                    GROUP BY symbol, 1
+                    ORDER BY symbol, 1
+                ) TO $out_dir (
+                    FORMAT PARQUET,
+                    {_duckdb_copy_opts(layout)},
+                    PARTITION_BY (symbol),
+                    WRITE_PARTITION_COLUMNS true,
+                    FILENAME_PATTERN 'data_{{i}}'
+                )
+                """,
+                {"source": source, "out_dir": str(rollup_path(stage_base, tier))},
+            )
+        conn.close()
+        # Egy fájl / partíció → a per-fájl exporttal azonos név
+        for f in stage_root.glob("*/symbol=*/data_0.parquet"):
+            f.rename(f.with_name("data.parquet"))
+        shared["rollups"] = time.perf_counter() - t0
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        return [(symbol, False, str(e), None, stats(elapsed, {})) for symbol in symbols]
+    finally:
+        if "rollups" not in shared:
+            shutil.rmtree(stage_root, ignore_errors=True)
+
+    results = []
+    share = {name: seconds / len(symbols) for name, seconds in shared.items()}
+    try:
+        for csv_path, _, symbol, _, _ in args_list:
+            t0 = time.perf_counter()
+            stages = dict(share)
+            try:
+                stat = Path(csv_path).stat()
+                entry = partition_manifest_entry(stage_base / f"symbol={symbol}")
+                stages["manifest"] = time.perf_counter() - t0
+                for src, dst in zip(
+                    _partition_dirs(stage_base, symbol), _partition_dirs(parquet_base, symbol)
+                ):
+                    _replace_dir(src, dst)
+                stages["swap"] = time.perf_counter() - t0 - stages["manifest"]
+                record = _state_record(Path(csv_path), stat, layout, entry)
+                stages["source_hash"] = time.perf_counter() - t0 - stages["manifest"] - stages["swap"]
+                results.append((symbol, True, "ok", record, None))
+            except Exception as e:
+                results.append((symbol, False, str(e), None, None))
+            seconds = sum(share.values()) + time.perf_counter() - t0
+            results[-1] = (*results[-1][:4], stats(seconds, stages))
+    finally:
+        shutil.rmtree(stage_root, ignore_errors=True)
+    return results
+
+
+def partition_manifest_entry(partition_dir: Path) -> dict:
+    """
+    Egy symbol partíció metaadatai: sorok száma, dátum- és ártartomány,
+    fájlméret és SHA-256 ellenőrzőösszeg (a partíció fájljai rendezve).
+    """
+    import duckdb
+
+    files = sorted(partition_dir.rglob("*.parquet"))
+    conn = duckdb.connect(":memory:")
+    row = conn.execute(
+        """
+        SELECT COUNT(*), MIN(date), MAX(date), MIN(low), MAX(high)
+        FROM read_parquet(?)
+        """,
+        [[str(f) for f in files]],
+    ).fetchone()
+    conn.close()
+
+    return {
+        "row_count": row[0],
+        "min_date": str(row[1]),
+        "max_date": str(row[2]),
+        "min_low": row[3],
+        "max_high": row[4],
+        "file_size": sum(f.stat().st_size for f in files),
+        "checksum": _sha256(files),
+    }
+
+
+def write_manifest(entries: dict[str, dict]) -> dict:
+    """
+    _manifest.json atomikus írása (temp fájl → rename).
+    A version minden exportnál új – a futó API ebből tudja, hogy frissítenie kell.
+    """
+    manifest = {
+        "version": str(time.time_ns()),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "symbols": dict(sorted(entries.items())),
+    }
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, MANIFEST_PATH)
+    return manifest
+
+
+def load_state() -> dict[str, dict]:
+    """Előző export állapota (szimbólum → rekord); hiányzó/hibás fájl esetén üres."""
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))["symbols"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def write_state(records: dict[str, dict]) -> None:
+    """_etl_state.json atomikus írása (temp fájl → rename)."""
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    tmp.write_text(
+        json.dumps({"symbols": dict(sorted(records.items()))}, indent=2), encoding="utf-8"
+    )
+    os.replace(tmp, STATE_PATH)
+
+
+def _is_unchanged(csv_path: Path, record: dict | None, layout: dict, symbol: str) -> bool:
+    """
+    A szimbólum kihagyható-e: azonos elrendezés, a kimenet megvan (méret egyezik),
+    és a CSV mérete + mtime-ja egyezik. Eltérő mtime-nál (pl. újraletöltés) a hash dönt;
+    egyezés esetén a rekord mtime-ja frissül.
+    """
+    if not record or record.get("layout") != layout:
+        return False
+    partition, *rollups = _partition_dirs(PARQUET_PATH, symbol)
+    if not all((d / "data.parquet").exists() for d in rollups):
+        return False
+    if sum(f.stat().st_size for f in partition.rglob("*.parquet")) != record["parquet"]["file_size"]:
+        return False
+    source = record["source"]
+    stat = csv_path.stat()
+    if stat.st_size != source["size"]:
+        return False
+    if stat.st_mtime_ns != source["mtime_ns"]:
+        if _sha256([csv_path]) != source["sha256"]:
+            return False
+        source["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+_END_OF_TASKS = object()
+
+
+def _feed(tasks: Iterable[tuple], arrivals: queue.Queue) -> None:
+    """Feeder szál: a (lassan érkező, pl. letöltő) feladat-iterátor elemeit a sorba teszi."""
+    try:
+        for args in tasks:
+            arrivals.put(args)
+    finally:
+        arrivals.put(_END_OF_TASKS)
+
+
+def _run_scheduled(
+    tasks: Iterable[tuple], workers: int, budget_mb: float | None
+) -> Iterator[tuple]:
+    """
+    Feladatok futtatása memóriakorlát mellett: a legnagyobb CSV-k indulnak először, és új feladat
+    csak akkor indul, ha a futók becsült memóriájával együtt belefér a keretbe (legalább egy mindig fut).
+    A kisebb, beférő fájlok megelőzhetik a várakozó nagyot. Az eredményeket befejezési sorrendben adja.
+    tasks: lista, vagy iterátor, amelyet egy feeder szál olvas (producer/consumer) – így a konvertálás
+    az első beérkezett fájllal indul, és a már megérkezettek közül a legnagyobb kerül sorra.
+    A workerek spawn-nal indulnak: a szülő polars/DuckDB szálkészlete fork után holtpontot okozhat.
+    """
+    arrivals: queue.Queue = queue.Queue()
+    if isinstance(tasks, list):
+        _feed(tasks, arrivals)
+    else:
+        threading.Thread(target=_feed, args=(tasks, arrivals), daemon=True).start()
+
+    feeding = True
+    pending: list[tuple[float, tuple]] = []  # (becsült MB, args)
+    running: dict = {}  # future → becsült MB
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        while feeding or pending or running:
+            # Beérkezett feladatok átvétele; blokkol, ha nincs más teendő
+            block = not (pending or running)
+            while feeding:
+                try:
+                    args = arrivals.get(block=block)
+                except queue.Empty:
+                    break
+                block = False
+                if args is _END_OF_TASKS:
+                    feeding = False
+                else:
+                    pending.append((estimate_memory_mb(Path(args[0])), args))
+            pending.sort(key=lambda p: p[0], reverse=True)
+
+            for item in list(pending):
+                if len(running) >= workers:
+                    break
+                used = sum(running.values())
+                if running and budget_mb is not None and used + item[0] > budget_mb:
+                    continue
+                pending.remove(item)
+                running[executor.submit(_process_file, item[1])] = item[0]
+            if not running:
+                continue
+            # Érkezés közben rövid várakozás, hogy az új fájlok is sorra kerüljenek
+            finished, _ = wait(
+                running, timeout=0.2 if feeding else None, return_when=FIRST_COMPLETED
+            )
+            for future in finished:
+                del running[future]
+                yield future.result()
+
+
+def _run_export(
+    tasks: Iterable[tuple], engine: str, workers: int, budget_mb: float | None
+) -> Iterator[tuple]:
+    """
+    Export futtatása a motor szerint: per-fájl workerek (polars, duckdb) vagy egyetlen DuckDB COPY
+    (duckdb-single – külön spawn folyamatban, workers szálon, a memóriakeret mint memory_limit).
+    """
+    if engine != "duckdb-single":
+        yield from _run_scheduled(tasks, workers, budget_mb)
+        return
+    args_list = list(tasks)
+    if not args_list:
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        yield from executor.submit(_export_consolidated, args_list, workers, budget_mb).result()
+
+
+def main(
+    engine: str = "polars",
+    workers: int | None = None,
+    layout: dict | None = None,
+    incremental: bool = True,
+    memory_budget_mb: float | None = None,
+    source=None,
+    prune: bool = False,
+):
+    """
+    Parquet export – párhuzamosan, Polars vagy DuckDB motorral.
+    layout: a DEFAULT_LAYOUT kulcsainak felülírása (row_group_size, compression, ...).
+    incremental: csak a megváltozott CSV-k exportja (False: minden szimbólum újraíródik).
+    memory_budget_mb: a párhuzamos feladatok becsült memóriájának felső korlátja
+        (alap: az elérhető RAM MEMORY_BUDGET_FRACTION része).
+    source: CSV forrás (etl.sources; alap: a kagglehub cache mappája). streaming forrásnál
+        a konvertálás a letöltéssel párhuzamosan fut (pipeline).
+    prune: a forrásban nem szereplő szimbólumok partíciójának törlése akkor is, ha a forrás nem
+        teljes (source.complete=False, pl. néhány frissített CSV mappája). Teljes forrásnál alapból töröl.
+    """
     if workers is None:
         workers = min(os.cpu_count() or 4, 8)  # max 8 worker
+    layout = {**DEFAULT_LAYOUT, **(layout or {})}
+    if engine == "duckdb-single" and layout["partition_by"] != "symbol":
+        raise ValueError("A duckdb-single motor csak symbol elrendezéssel használható.")
+    if memory_budget_mb is None:
+        available = available_memory_mb()
+        memory_budget_mb = available * MEMORY_BUDGET_FRACTION if available else None
 
-    print(f"Parquet export ({engine}, {workers} worker)...")
-    data_path = get_dataset_path()
-    csv_files = sorted(data_path.glob("*_minute.csv"))
-    total = len(csv_files)
+    budget = f", memóriakeret {memory_budget_mb:.0f} MB" if memory_budget_mb else ""
+    if source is None:
+        from etl.sources import LocalDirSource
+        source = LocalDirSource(get_dataset_path(), complete=True)
+    # duckdb-single egyetlen COPY – ott meg kell várni az összes fájlt
+    streaming = source.streaming and engine != "duckdb-single"
+    pipeline = ", pipeline" if streaming else ""
+    print(f"Parquet export ({engine}, {workers} worker{budget}{pipeline})...")
 
     PARQUET_PATH.mkdir(parents=True, exist_ok=True)
 
-    args_list = [
-        (str(f), str(PARQUET_PATH), f.stem.replace("_minute", ""), engine)
-        for f in csv_files
-    ]
+    state = load_state()
+    previous = state if incremental else {}
+    records: dict[str, dict] = {}
+    seen: set[str] = set()
+    unchanged = 0
+    source_errors: list[Exception] = []
+
+    def tasks() -> Iterator[tuple]:
+        """A forrás fájljai érkezési sorrendben; a változatlanok kimaradnak (streamingnél a feeder szálban fut)."""
+        nonlocal unchanged
+        try:
+            for f in source.iter_csv():
+                symbol = f.stem.replace("_minute", "")
+                seen.add(symbol)
+                if _is_unchanged(f, previous.get(symbol), layout, symbol):
+                    records[symbol] = previous[symbol]
+                    unchanged += 1
+                else:
+                    yield (str(f), str(PARQUET_PATH), symbol, engine, layout)
+        except Exception as e:
+            source_errors.append(e)
+
+    task_source = tasks() if streaming else list(tasks())
+    total = "?" if streaming else len(task_source)
+    if not streaming:
+        print(f"  Változatlan: {unchanged}, exportálandó: {total}")
 
     done = 0
     errors = []
+    worker_peaks: dict[int, tuple[int, float | None]] = {}  # pid → (feladatok, csúcs RSS MB)
 
-    with ProcessPoolExecutor(max_workers=workers) as executor:
-        futures = {executor.submit(_process_file, a): a for a in args_list}
-        for future in as_completed(futures):
-            symbol, success, msg = future.result()
+    if streaming or task_source:
+        for symbol, success, msg, record, stats in _run_export(
+            task_source, engine, workers, memory_budget_mb
+        ):
             done += 1
             status = "ok" if success else f"HIBA: {msg}"
-            print(f"  [{done}/{total}] {symbol}... {status}", flush=True)
-            if not success:
+            rss = f", csúcs RSS {stats['peak_rss_mb']:.0f} MB" if stats["peak_rss_mb"] else ""
+            print(
+                f"  [{done}/{total}] {symbol}... {status} ({stats['seconds']:.1f} s{rss})",
+                flush=True,
+            )
+            count, _ = worker_peaks.get(stats["pid"], (0, None))
+            worker_peaks[stats["pid"]] = (count + 1, stats["peak_rss_mb"])
+            if success:
+                records[symbol] = record
+            else:
                 errors.append((symbol, msg))
+                # A régi partíció érintetlen – a következő futás újra megpróbálja
+                if symbol in previous:
+                    records[symbol] = previous[symbol]
+
+        shutil.rmtree(PARQUET_PATH.parent / ".staging", ignore_errors=True)
+        if any(peak for _, peak in worker_peaks.values()):
+            print("  Worker csúcs RSS:")
+            for pid, (count, peak) in sorted(worker_peaks.items()):
+                print(f"    pid {pid}: {count} feladat, {peak:.0f} MB")
+    if streaming:
+        print(f"  Változatlan: {unchanged}, exportált: {done}")
+
+    # Forrás nélküli (törölt CSV) szimbólumok partíciói csak teljes forrásnál vagy --prune-nal törlődnek;
+    # részleges vagy hibás forrásnál (hiányos a lista) a nem látott szimbólumok partíciója és állapota marad
+    missing = set(state) - seen
+    removed = missing if missing and not source_errors and (prune or source.complete) else set()
+    for symbol in sorted(missing - removed):
+        records[symbol] = state[symbol]
+        print(f"  {symbol}... nincs a forrásban – megtartva (törlés: --prune)")
+    for symbol in sorted(removed):
+        for d in _partition_dirs(PARQUET_PATH, symbol):
+            shutil.rmtree(d, ignore_errors=True)
+        print(f"  {symbol}... törölve (nincs forrás CSV)")
+    for e in source_errors:
+        errors.append(("forrás", str(e)))
+        print(f"  HIBA (forrás): {e}")
+
+    write_state(records)
+    # Új manifest (= új adatverzió) csak tényleges változásnál – a no-op futás nem érvényteleníti az API cache-t
+    if done or removed or not MANIFEST_PATH.exists():
+        write_manifest({symbol: r["parquet"] for symbol, r in records.items()})
 
     if errors:
         print(f"\nFigyelmeztetés: {len(errors)} fájl sikertelen.")
@@ -113,9 +839,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CSV → Parquet export")
     parser.add_argument(
         "--engine",
-        choices=["polars", "duckdb"],
+        choices=["polars", "duckdb", "duckdb-single"],
         default="polars",
-        help="Motor: polars (gyors) vagy duckdb (SQL)",
+        help="Motor: polars (gyors), duckdb (SQL) vagy duckdb-single (egy COPY, --workers szál)",
     )
     parser.add_argument(
         "--workers",
@@ -123,5 +849,73 @@ if __name__ == "__main__":
         default=None,
         help="Párhuzamos workerök száma (alap: CPU magok)",
     )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=DEFAULT_LAYOUT["row_group_size"],
+        help="Sorok száma row grouponként (alap: %(default)s)",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["zstd", "snappy", "lz4", "gzip", "uncompressed"],
+        default=DEFAULT_LAYOUT["compression"],
+        help="Parquet tömörítés (alap: %(default)s)",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        default=DEFAULT_LAYOUT["compression_level"],
+        help="Tömörítési szint (zstd: 1–22, alap: %(default)s)",
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=["symbol", "month"],
+        default=DEFAULT_LAYOUT["partition_by"],
+        help="symbol: egy fájl/szimbólum; month: symbol=X/year=YYYY/month=MM/ (alap: %(default)s)",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="OHLC árak float32-ként (alap: float64)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=None,
+        help="Párhuzamos exportok memóriakerete MB-ban (alap: az elérhető RAM 70%%-a)",
+    )
+    parser.add_argument(
+        "--source",
+        default=None,
+        help="CSV forrás: 'kaggle' (fájlonkénti letöltés, pipeline), mappa vagy http(s) URL "
+        "(alap: a kagglehub cache)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Minden szimbólum újraexportálása (alap: csak a megváltozott CSV-k)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="A forrásban nem szereplő szimbólumok partíciójának törlése mappa/URL forrásnál is "
+        "(alap: csak a teljes Kaggle datasetnél)",
+    )
     args = parser.parse_args()
-    main(engine=args.engine, workers=args.workers)
+    from etl.sources import source_from_arg
+
+    main(
+        source=source_from_arg(args.source) if args.source else None,
+        engine=args.engine,
+        workers=args.workers,
+        incremental=not args.full,
+        memory_budget_mb=args.memory_budget,
+        prune=args.prune,
+        layout={
+            "row_group_size": args.row_group_size,
+            "compression": args.compression,
+            "compression_level": args.compression_level,
+            "float32": args.float32,
+            "partition_by": args.partition_by,
+        },
+    )
@@ -0,0 +1,188 @@
+"""
+Napi minute bar-ok hozzáfűzése a meglévő Parquet partíciókhoz – teljes újraexport nélkül.
+append:  az új sorok külön part fájlba kerülnek (symbol=X/part-<ns>.parquet, havi bontásnál
+         year=/month= alá); a partícióban már meglévő dátumok kimaradnak.
+compact: a több fájlos partíciók (mappák) összevonása egy rendezett, row groupokra tagolt fájlba.
+Mindkettő után a rollup tierek, a manifest és az export állapot frissül – a futó API a manifest
+változásából azonnal látja az új fájlokat.
+Futtatás:
+  python -m etl.ingest append <csv> [<csv> ...] [--symbol X]
+  python -m etl.ingest compact [--symbol X ...] [--min-parts N]
+Egyszerre csak egy ingest/export fusson ugyanazon a store-on.
+"""
+import json
+import shutil
+import time
+from pathlib import Path
+
+from etl.export_to_parquet import (
+    DEFAULT_LAYOUT,
+    MANIFEST_PATH,
+    PARQUET_PATH,
+    _export_rollups,
+    _partition_dirs,
+    _replace_dir,
+    load_state,
+    partition_manifest_entry,
+    read_csv_polars,
+    write_manifest,
+    write_partition,
+    write_state,
+)
+
+
+def _symbol_layout(symbol: str, state: dict[str, dict]) -> dict:
+    """A partíció elrendezése: az export állapotából, ennek hiányában a mappaszerkezetből."""
+    if symbol in state:
+        return {**DEFAULT_LAYOUT, **state[symbol]["layout"]}
+    monthly = any((PARQUET_PATH / f"symbol={symbol}").glob("year=*"))
+    return {**DEFAULT_LAYOUT, "partition_by": "month" if monthly else "symbol"}
+
+
+def _update_manifest(symbol: str) -> dict:
+    """
+    A szimbólum manifest bejegyzésének újraszámolása, majd atomikus írás (új adatverzió).
+    A manifestből hiányzó többi partíció bejegyzése is elkészül, hogy az API elfogadja.
+    """
+    try:
+        symbols = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))["symbols"]
+    except (OSError, ValueError, KeyError):
+        symbols = {}
+    symbols[symbol] = partition_manifest_entry(PARQUET_PATH / f"symbol={symbol}")
+    for partition in PARQUET_PATH.glob("symbol=*"):
+        name = partition.name.split("=", 1)[1]
+        if name not in symbols:
+            symbols[name] = partition_manifest_entry(partition)
+    write_manifest(symbols)
+    return symbols[symbol]
+
+
+def _publish(symbol: str, state: dict[str, dict], rollups: bool = True) -> None:
+    """
+    Változás közzététele: rollup tierek újraépítése (staging → rename), manifest és állapot frissítése.
+    Az állapotban a partíció új metaadatai kerülnek be, így az inkrementális export nem írja felül.
+    """
+    if rollups:
+        stage_root = PARQUET_PATH.parent / ".staging" / symbol
+        stage_base = stage_root / PARQUET_PATH.name
+        shutil.rmtree(stage_root, ignore_errors=True)
+        try:
+            _export_rollups(
+                PARQUET_PATH, symbol, _symbol_layout(symbol, state), out_base=stage_base
+            )
+            for src, dst in zip(
+                _partition_dirs(stage_base, symbol)[1:], _partition_dirs(PARQUET_PATH, symbol)[1:]
+            ):
+                _replace_dir(src, dst)
+        finally:
+            shutil.rmtree(stage_root, ignore_errors=True)
+
+    entry = _update_manifest(symbol)
+    if symbol in state:
+        state[symbol]["parquet"] = entry
+        write_state(state)
+
+
+def append_csv(csv_path: Path, symbol: str) -> int:
+    """
+    Új sorok hozzáfűzése egy CSV-ből (dátum szerint deduplikálva).
+    A CSV-n belüli ismételt dátumoknál az utolsó sor, a partícióban már meglévőknél a meglévő marad.
+    Returns: hozzáfűzött sorok száma
+    """
+    import polars as pl
+
+    state = load_state()
+    layout = _symbol_layout(symbol, state)
+    partition = PARQUET_PATH / f"symbol={symbol}"
+    new = read_csv_polars(csv_path, symbol, layout).unique("date", keep="last").sort("date")
+
+    files = sorted(partition.rglob("*.parquet"))
+    if files and new.height:
+        # Csak az új sorok dátumtartományát kell beolvasni (rendezett row groupok → kevés blokk)
+        existing = (
+            pl.scan_parquet(files, hive_partitioning=False)
+            .select("date")
+            .filter(pl.col("date").is_between(new["date"].min(), new["date"].max()))
+            .collect()
+        )
+        new = new.join(existing, on="date", how="anti")
+    if new.is_empty():
+        return 0
+
+    write_partition(new, partition, layout, name=f"part-{time.time_ns()}.parquet")
+    _publish(symbol, state)
+    return new.height
+
+
+def compact_symbol(symbol: str, min_parts: int = 2) -> bool:
+    """
+    Egy partíció összevonása, ha valamelyik mappájában legalább min_parts fájl van.
+    Az új partíció staging mappába íródik, majd fájlonként cseréli a régit (a part fájlok törlődnek).
+    Returns: történt-e összevonás
+    """
+    import polars as pl
+
+    partition = PARQUET_PATH / f"symbol={symbol}"
+    files = sorted(partition.rglob("*.parquet"))
+    dirs = {f.parent for f in files}
+    if not any(sum(1 for _ in d.glob("*.parquet")) >= min_parts for d in dirs):
+        return False
+
+    state = load_state()
+    layout = _symbol_layout(symbol, state)
+    df = pl.read_parquet(files, hive_partitioning=False).unique("date", keep="first").sort("date")
+
+    stage_root = PARQUET_PATH.parent / ".staging" / symbol
+    stage_partition = stage_root / PARQUET_PATH.name / f"symbol={symbol}"
+    shutil.rmtree(stage_root, ignore_errors=True)
+    try:
+        write_partition(df, stage_partition, layout)
+        _replace_dir(stage_partition, partition)
+    finally:
+        shutil.rmtree(stage_root, ignore_errors=True)
+    # Az adat nem változott, csak a fájlok – a rollupok maradhatnak
+    _publish(symbol, state, rollups=False)
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Minute bar-ok hozzáfűzése és partíció tömörítés")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_append = sub.add_parser("append", help="Új sorok hozzáfűzése CSV-ből")
+    p_append.add_argument("csv", nargs="+", type=Path, help="CSV fájl(ok) (<SYMBOL>_minute.csv)")
+    p_append.add_argument(
+        "--symbol",
+        default=None,
+        help="Szimbólum (alap: a fájlnévből, pl. TCS_minute.csv → TCS)",
+    )
+
+    p_compact = sub.add_parser("compact", help="Több fájlos partíciók összevonása")
+    p_compact.add_argument(
+        "--symbol",
+        nargs="*",
+        default=None,
+        help="Szimbólumok (alap: mind)",
+    )
+    p_compact.add_argument(
+        "--min-parts",
+        type=int,
+        default=2,
+        help="Összevonás, ha egy mappában legalább ennyi fájl van (alap: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "append":
+        for csv_path in args.csv:
+            symbol = args.symbol or csv_path.stem.replace("_minute", "")
+            rows = append_csv(csv_path, symbol)
+            print(f"  {symbol}: {rows} új sor")
+    else:
+        symbols = args.symbol or sorted(
+            p.name.split("=", 1)[1] for p in PARQUET_PATH.glob("symbol=*")
+        )
+        for symbol in symbols:
+            status = "összevonva" if compact_symbol(symbol, args.min_parts) else "kihagyva"
+            print(f"  {symbol}: {status}")
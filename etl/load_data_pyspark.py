@@ -2,10 +2,18 @@
 Stock Market Data betöltése PySpark-kal
 Nifty 50 – 1 perces OHLCV adatok
 
+Betöltési módok:
+  single  egyetlen spark.read.csv az összes CSV-re, explicit sémával; a symbol az input_file_name()-ből (alap)
+  union   fájlonkénti olvasás inferSchema-val és unionByName (régi – 105 mély logikai terv, extra séma-pass)
+  parquet a partícionált Parquet store (data/parquet, symbol=X/[year=/month=/]) közvetlen olvasása
+
 Előfeltétel: Java 8+ (OpenJDK) telepítve.
   Windows: winget install Microsoft.OpenJDK.17
+Futtatás: python etl/load_data_pyspark.py [--mode single|union|parquet] [--driver-memory 4g]
+          [--shuffle-partitions 16] [--write data/parquet_spark] [--compare]
 """
 import os
+import time
 from pathlib import Path
 
 # JAVA_HOME auto-detekció (Windows – Microsoft OpenJDK)
@@ -23,7 +31,24 @@ if not os.environ.get("JAVA_HOME"):
                 break
 
 from pyspark.sql import SparkSession
-from pyspark.sql.types import DoubleType, LongType
+from pyspark.sql.types import DoubleType, LongType, StringType, StructField, StructType
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PARQUET_PATH = PROJECT_ROOT / "data" / "parquet"
+# Spark által írt store – a data/parquet-et az export_to_parquet kezeli (manifest, állapot)
+SPARK_PARQUET_PATH = PROJECT_ROOT / "data" / "parquet_spark"
+DRIVER_MEMORY = "2g"
+
+# A CSV sémája – explicit, így nincs inferSchema pass (a dátum szövegként, az első 19 karakter számít)
+CSV_SCHEMA = StructType([
+    StructField("date", StringType()),
+    StructField("open", DoubleType()),
+    StructField("high", DoubleType()),
+    StructField("low", DoubleType()),
+    StructField("close", DoubleType()),
+    StructField("volume", DoubleType()),
+])
+SYMBOL_FROM_PATH = r"([^/]+)_minute\.csv$"
 
 
 def get_dataset_path() -> Path:
@@ -35,21 +60,85 @@ def get_dataset_path() -> Path:
     return Path(path)
 
 
-def create_spark_session() -> SparkSession:
-    """SparkSession létrehozása."""
-    return (
+def create_spark_session(
+    driver_memory: str = DRIVER_MEMORY, shuffle_partitions: int | None = None
+) -> SparkSession:
+    """
+    SparkSession létrehozása.
+    shuffle_partitions: spark.sql.shuffle.partitions (alap: a Spark 200-a – helyi gépen, 105 szimbólumra
+    a magok számának néhányszorosa elég).
+    Az időbélyegek időzóna nélküliek (tőzsdei helyi idő), és mikroszekundumos Parquet típusként íródnak,
+    ahogy az export_to_parquet is írja.
+    """
+    builder = (
         SparkSession.builder
         .appName("Nifty50-StockData")
         .master("local[*]")
-        .config("spark.driver.memory", "2g")
-        .getOrCreate()
+        .config("spark.driver.memory", driver_memory)
+        .config("spark.sql.session.timeZone", "UTC")
+        .config("spark.sql.timestampType", "TIMESTAMP_NTZ")
+        .config("spark.sql.parquet.outputTimestampType", "TIMESTAMP_MICROS")
+    )
+    if shuffle_partitions:
+        builder = builder.config("spark.sql.shuffle.partitions", str(shuffle_partitions))
+    return builder.getOrCreate()
+
+
+def load_stock_data_single(spark: SparkSession, data_path: Path):
+    """
+    Összes CSV betöltése egyetlen olvasással (explicit séma, nincs inferSchema és union).
+    A szimbólum a forrásfájl nevéből jön (input_file_name() URL-kódolt útvonal → dekódolás).
+    """
+    from pyspark.sql import functions as F
+
+    df = (
+        spark.read
+        .schema(CSV_SCHEMA)
+        .option("header", "true")
+        .csv(str(data_path / "*_minute.csv"))
+    )
+    file_path = F.expr("reflect('java.net.URLDecoder', 'decode', input_file_name(), 'UTF-8')")
+    return df.select(
+        F.to_timestamp(F.substring("date", 1, 19)).alias("date"),
+        *(F.col(c) for c in ("open", "high", "low", "close")),
+        F.col("volume").cast(LongType()).alias("volume"),
+        F.regexp_extract(file_path, SYMBOL_FROM_PATH, 1).alias("symbol"),
+    )
+
+
+def load_parquet_store(spark: SparkSession, parquet_path: Path = PARQUET_PATH):
+    """
+    A partícionált Parquet store olvasása (symbol=X/ hive partíciók; havi bontásnál year/month oszlopokkal).
+    A _manifest.json / _etl_state.json fájlokat a Spark kihagyja (aláhúzással kezdődnek).
+    """
+    return (
+        spark.read
+        .option("basePath", str(parquet_path))
+        .parquet(str(parquet_path / "symbol=*"))
+    )
+
+
+def write_parquet_store(df, out_path: Path = SPARK_PARQUET_PATH) -> None:
+    """
+    DataFrame kiírása a store elrendezésében: symbol=X/ partíciók, partíción belül dátum szerint rendezve
+    (szimbólumonként egy task → egy fájl, szűk dátumtartományú row groupok).
+    """
+    (
+        df.repartition("symbol")
+        .sortWithinPartitions("symbol", "date")
+        .write
+        .mode("overwrite")
+        .option("compression", "zstd")
+        .partitionBy("symbol")
+        .parquet(str(out_path))
     )
 
 
 def load_stock_data(spark: SparkSession, data_path: Path):
     """
-    Összes CSV betöltése PySpark DataFrame-be.
+    Összes CSV betöltése PySpark DataFrame-be (régi mód: fájlonként inferSchema + unionByName).
     A szimbólum (pl. RELIANCE, TCS) a fájlnévből kerül a 'symbol' oszlopba.
+    Összevetéshez megtartva – helyette: load_stock_data_single.
     """
     from pyspark.sql import functions as F
 
@@ -81,16 +170,73 @@ def load_stock_data(spark: SparkSession, data_path: Path):
     return df
 
 
-def main():
+LOADERS = {
+    "single": load_stock_data_single,
+    "union": load_stock_data,
+}
+
+
+def time_loader(spark: SparkSession, data_path: Path, mode: str) -> dict:
+    """
+    Egy betöltési mód mérése: terv felépítése + analízis (df.schema), majd teljes olvasás (count).
+    """
+    started = time.perf_counter()
+    df = LOADERS[mode](spark, data_path)
+    df.schema  # kikényszeríti az analízist (unionnál a 105 mély terv itt lassú)
+    planned = time.perf_counter()
+    rows = df.count()
+    finished = time.perf_counter()
+    return {
+        "mode": mode,
+        "plan_s": round(planned - started, 2),
+        "count_s": round(finished - planned, 2),
+        "total_s": round(finished - started, 2),
+        "rows": rows,
+    }
+
+
+def compare_loaders(spark: SparkSession, data_path: Path) -> list[dict]:
+    """A régi (union) és az új (single) betöltés időinek összevetése ugyanazon a sessionön."""
+    results = []
+    for mode in ("union", "single"):
+        spark.catalog.clearCache()
+        result = time_loader(spark, data_path, mode)
+        results.append(result)
+        print(
+            f"  {mode:<7} terv {result['plan_s']:7.2f} s  count {result['count_s']:7.2f} s  "
+            f"összesen {result['total_s']:7.2f} s  ({result['rows']:,} sor)"
+        )
+    return results
+
+
+def main(
+    mode: str = "single",
+    driver_memory: str = DRIVER_MEMORY,
+    shuffle_partitions: int | None = None,
+    write_path: Path | None = None,
+    compare: bool = False,
+):
     print("Spark session inicializálása...")
-    spark = create_spark_session()
+    spark = create_spark_session(driver_memory, shuffle_partitions)
+
+    if mode == "parquet":
+        print(f"Parquet store olvasása: {PARQUET_PATH}")
+        df = load_parquet_store(spark)
+    else:
+        print("Dataset útvonal betöltése...")
+        data_path = get_dataset_path()
+        print(f"Adatok: {data_path}")
+
+        if compare:
+            print("Betöltési módok összevetése...")
+            compare_loaders(spark, data_path)
 
-    print("Dataset útvonal betöltése...")
-    data_path = get_dataset_path()
-    print(f"Adatok: {data_path}")
+        print(f"CSV fájlok betöltése PySpark-kal ({mode})...")
+        df = LOADERS[mode](spark, data_path)
 
-    print("CSV fájlok betöltése PySpark-kal...")
-    df = load_stock_data(spark, data_path)
+    if write_path is not None:
+        print(f"Parquet store írása: {write_path}")
+        write_parquet_store(df, write_path)
 
     df.cache()
     print(f"\nSorok száma: {df.count():,}")
@@ -104,4 +250,44 @@ def main():
 
 
 if __name__ == "__main__":
-    spark, df = main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Nifty 50 minute adatok betöltése PySpark-kal")
+    parser.add_argument(
+        "--mode",
+        choices=["single", "union", "parquet"],
+        default="single",
+        help="single: egy olvasás explicit sémával (alap); union: régi fájlonkénti; parquet: a store olvasása",
+    )
+    parser.add_argument(
+        "--driver-memory",
+        default=DRIVER_MEMORY,
+        help="spark.driver.memory (alap: %(default)s)",
+    )
+    parser.add_argument(
+        "--shuffle-partitions",
+        type=int,
+        default=None,
+        help="spark.sql.shuffle.partitions (alap: a Spark alapértéke)",
+    )
+    parser.add_argument(
+        "--write",
+        type=Path,
+        nargs="?",
+        const=SPARK_PARQUET_PATH,
+        default=None,
+        help=f"Kiírás symbol=X/ partícionált Parquetbe (alap útvonal: {SPARK_PARQUET_PATH})",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="A union és a single betöltés időinek kiírása (terv + count)",
+    )
+    args = parser.parse_args()
+    spark, df = main(
+        mode=args.mode,
+        driver_memory=args.driver_memory,
+        shuffle_partitions=args.shuffle_partitions,
+        write_path=args.write,
+        compare=args.compare,
+    )
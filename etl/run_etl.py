@@ -1,7 +1,10 @@
 """
 ETL folyamat egyszeri indítása – letöltés és Parquet export.
-Használat: python -m etl.run_etl [--clean]
-  --clean   Törli a data/parquet mappát és a Kaggle cache-t, majd nulláról letölt
+Használat: python -m etl.run_etl [--clean] [--full] [--pipeline] [--source kaggle|<mappa>|<URL>] [--prune]
+  --clean     Törli a data/parquet mappát és a Kaggle cache-t, majd nulláról letölt
+  --full      Minden szimbólum újraexportálása (alap: csak a megváltozott CSV-k)
+  --pipeline  Letöltés és konvertálás átlapolva: az export az első letöltött fájllal indul
+  --prune     A forrásban nem szereplő szimbólumok törlése mappa/URL forrásnál is (alap: csak teljes Kaggle datasetnél)
 """
 import argparse
 import os
@@ -20,13 +23,20 @@ def get_kagglehub_dataset_path() -> Path:
 
 
 def clean_parquet():
-    """Törli a projekt data/parquet mappáját."""
+    """Törli a projekt data/parquet mappáját és a rollup tiereket (data/parquet_1h, _1d)."""
+    from etl.export_to_parquet import ROLLUP_TIERS, rollup_path
+
     if PARQUET_PATH.exists():
         print(f"Törlés: {PARQUET_PATH}")
         shutil.rmtree(PARQUET_PATH)
         print("  Parquet mappa törölve.")
     else:
         print("Parquet mappa nem létezik – kihagyva.")
+    for tier in ROLLUP_TIERS:
+        path = rollup_path(PARQUET_PATH, tier)
+        if path.exists():
+            shutil.rmtree(path)
+            print(f"  Rollup törölve: {path}")
 
 
 def get_kagglehub_dataset_cache_path() -> Path:
@@ -52,10 +62,24 @@ def clean_kagglehub_cache():
         print(f"Figyelmeztetés: Kaggle cache törlése sikertelen: {e}")
 
 
-def run_export(engine: str = "polars", workers: int | None = None):
-    """Parquet export futtatása."""
+def run_export(
+    engine: str = "polars",
+    workers: int | None = None,
+    incremental: bool = True,
+    memory_budget_mb: float | None = None,
+    source=None,
+    prune: bool = False,
+):
+    """Parquet export futtatása (alapból inkrementálisan, az elérhető RAM-hoz igazított párhuzamossággal)."""
     from etl.export_to_parquet import main as export_main
-    export_main(engine=engine, workers=workers)
+    export_main(
+        engine=engine,
+        workers=workers,
+        incremental=incremental,
+        memory_budget_mb=memory_budget_mb,
+        source=source,
+        prune=prune,
+    )
 
 
 def main():
@@ -70,7 +94,7 @@ def main():
     )
     parser.add_argument(
         "--engine",
-        choices=["polars", "duckdb"],
+        choices=["polars", "duckdb", "duckdb-single"],
         default="polars",
         help="Export motor: polars (alap) vagy duckdb",
     )
@@ -80,8 +104,39 @@ def main():
         default=None,
         help="Párhuzamos workerök száma (alap: CPU magok)",
     )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=None,
+        help="Párhuzamos exportok memóriakerete MB-ban (alap: az elérhető RAM 70%%-a)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Minden szimbólum újraexportálása (alap: csak a megváltozott CSV-k)",
+    )
+    parser.add_argument(
+        "--source",
+        default="kaggle",
+        help="CSV forrás: kaggle (alap), helyi mappa vagy http(s) URL",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Letöltés és konvertálás átlapolva (fájlonkénti letöltés, az export azonnal indul)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="A forrásban nem szereplő szimbólumok partíciójának törlése mappa/URL forrásnál is "
+        "(alap: csak a teljes Kaggle datasetnél)",
+    )
     args = parser.parse_args()
 
+    from etl.sources import source_from_arg
+
+    source = source_from_arg(args.source, streaming=args.pipeline)
+
     if args.clean:
         print("=== Tisztítás ===")
         clean_parquet()
@@ -89,12 +144,22 @@ def main():
         print()
 
     print("=== ETL indítása ===")
-    print("1. Kaggle letöltés (CSV)...")
-    get_kagglehub_dataset_path()
-    print("   Kész.")
-
-    print("\n2. Parquet export...")
-    run_export(engine=args.engine, workers=args.workers)
+    if source.streaming:
+        print("1. Letöltés → Parquet export (pipeline)...")
+    else:
+        if args.source == "kaggle":
+            print("1. Kaggle letöltés (CSV)...")
+            get_kagglehub_dataset_path()
+            print("   Kész.")
+        print("\n2. Parquet export...")
+    run_export(
+        engine=args.engine,
+        workers=args.workers,
+        incremental=not args.full,
+        memory_budget_mb=args.memory_budget,
+        source=source,
+        prune=args.prune,
+    )
     print("\n=== ETL kész. ===")
 
 
@@ -0,0 +1,143 @@
+"""
+CSV források az exporthoz – a Kaggle helyett helyi mappa vagy HTTP (pl. tesztben egy helyi http.server).
+Minden forrás iter_csv()-je a kész (teljesen letöltött) *_minute.csv fájlokat adja, ahogy elérhetővé válnak;
+a streaming=True források mellett az export már az első fájllal indul (pipeline: letöltés ∥ konvertálás).
+Forrás megadása (CLI): kaggle | <mappa> | http(s)://host/path/
+complete: a forrás a teljes dataset (a benne nem szereplő szimbólumok törölhetők a store-ból);
+mappa és URL forrásnál alapból False – lehet, hogy csak néhány frissített CSV-t tartalmaz.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urljoin
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATASET_ID = "debashis74017/stock-market-data-nifty-50-stocks-1-min-data"
+# HTTP forrásból letöltött CSV-k helye
+DOWNLOAD_PATH = PROJECT_ROOT / "data" / "csv"
+KAGGLE_FILES_URL = "https://www.kaggle.com/api/v1/datasets/list/" + DATASET_ID
+DOWNLOAD_WORKERS = 4  # párhuzamos letöltések (HTTP / Kaggle fájlonként)
+
+_CSV_HREF_RE = re.compile(r'href="([^"?#]*_minute\.csv)"')
+
+
+class LocalDirSource:
+    """Helyi mappa *_minute.csv fájljai (pl. a kagglehub cache) – minden fájl azonnal elérhető."""
+
+    streaming = False
+
+    def __init__(self, path: Path, complete: bool = False):
+        self.path = Path(path)
+        self.complete = complete
+
+    def iter_csv(self) -> Iterator[Path]:
+        yield from sorted(self.path.glob("*_minute.csv"))
+
+
+class HttpSource:
+    """
+    HTTP forrás: a base_url alatti index.json (fájlnevek listája) vagy könyvtárlista
+    (pl. python -m http.server) *_minute.csv hivatkozásai. A fájlok párhuzamosan töltődnek le
+    (.part néven, majd rename), és egyenként adódnak tovább, ahogy elkészülnek
+    (streaming=False: a teljes letöltés után, név szerint rendezve).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        dest: Path = DOWNLOAD_PATH,
+        workers: int = DOWNLOAD_WORKERS,
+        streaming: bool = True,
+        complete: bool = False,
+    ):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.dest = Path(dest)
+        self.workers = workers
+        self.streaming = streaming
+        self.complete = complete
+
+    def list_files(self, client) -> list[str]:
+        resp = client.get(urljoin(self.base_url, "index.json"))
+        if resp.status_code == 200:
+            return [name for name in resp.json() if name.endswith("_minute.csv")]
+        resp = client.get(self.base_url)
+        resp.raise_for_status()
+        return sorted({os.path.basename(h) for h in _CSV_HREF_RE.findall(resp.text)})
+
+    def _download(self, client, name: str) -> Path:
+        target = self.dest / name
+        tmp = target.with_name(name + ".part")
+        with client.stream("GET", urljoin(self.base_url, name)) as resp:
+            resp.raise_for_status()
+            with open(tmp, "wb") as fh:
+                for chunk in resp.iter_bytes(1 << 20):
+                    fh.write(chunk)
+        os.replace(tmp, target)
+        return target
+
+    def iter_csv(self) -> Iterator[Path]:
+        import httpx
+
+        self.dest.mkdir(parents=True, exist_ok=True)
+        with httpx.Client(timeout=httpx.Timeout(30.0, read=300.0), follow_redirects=True) as client:
+            names = self.list_files(client)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self._download, client, name) for name in names]
+                if not self.streaming:
+                    yield from sorted(f.result() for f in futures)
+                    return
+                for future in as_completed(futures):
+                    yield future.result()
+
+
+class KaggleSource:
+    """
+    Kaggle dataset kagglehub-bal. Ha a dataset már a cache-ben van, helyi forrásként viselkedik.
+    streaming=True: fájlonkénti letöltés (dataset_download(path=...)) a Kaggle fájllistája alapján;
+    ha a lista nem kérhető le, a teljes archívum töltődik le (pipeline nélkül).
+    Teljesnek (complete) csak a teljes archívum számít – a fájllista API lapozhat.
+    """
+
+    def __init__(self, streaming: bool = False, workers: int = DOWNLOAD_WORKERS):
+        self.streaming = streaming
+        self.workers = workers
+        self.complete = False
+
+    def list_files(self) -> list[str] | None:
+        import httpx
+
+        try:
+            resp = httpx.get(KAGGLE_FILES_URL, timeout=30.0, follow_redirects=True)
+            resp.raise_for_status()
+            files = resp.json().get("datasetFiles") or []
+        except (httpx.HTTPError, ValueError):
+            return None
+        names = [f["name"] for f in files if f.get("name", "").endswith("_minute.csv")]
+        return names or None
+
+    def iter_csv(self) -> Iterator[Path]:
+        import kagglehub
+
+        names = self.list_files() if self.streaming else None
+        if names is None:
+            self.complete = True
+            yield from LocalDirSource(Path(kagglehub.dataset_download(DATASET_ID))).iter_csv()
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(kagglehub.dataset_download, DATASET_ID, path=n) for n in names]
+            for future in as_completed(futures):
+                yield Path(future.result())
+
+
+def source_from_arg(spec: str, streaming: bool = True):
+    """CLI forrás: 'kaggle', http(s) URL vagy helyi mappa."""
+    if spec == "kaggle":
+        return KaggleSource(streaming=streaming)
+    if spec.startswith(("http://", "https://")):
+        return HttpSource(spec, streaming=streaming)
+    path = Path(spec)
+    if not path.is_dir():
+        raise ValueError(f"Ismeretlen forrás (nem mappa, URL vagy 'kaggle'): {spec}")
+    return LocalDirSource(path)
@@ -0,0 +1,132 @@
+"""
+Proxy válasz cache – bájtméretre korlátos LRU, bejegyzésenkénti TTL-lel és single-flight összevonással:
+az egyidejű, azonos kulcsú miss-ek egyetlen upstream hívást várnak meg. A lejárt bejegyzés a kiszorításig
+megmarad, így a fetch feltételes kéréssel újraellenőrizheti (304 → a régi érték marad, új TTL-lel).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache asyncio-hoz. Az értékek méretét (bájt) a fetch adja vissza; a max_entry_bytes-nál
+    nagyobb válaszok nem kerülnek be. A fetch külön taskban fut, így a kezdeményező kliens bontása
+    nem szakítja meg a rá váró többi kérést.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()  # → (érték, méret, lejárat)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expired = 0
+        self.revalidated = 0
+        self.oversized = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Friss érték (és LRU frissítés), vagy None. A lejárt bejegyzés újraellenőrzésig megmarad."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def stale(self, key: Hashable) -> Any | None:
+        """A tárolt érték frissességtől függetlenül (újraellenőrzéshez), vagy None."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any, size: int, ttl: float | None = None) -> None:
+        if size > self.max_entry_bytes:
+            self.oversized += 1
+            return
+        self._drop(key)
+        self._entries[key] = (value, size, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[Any | None], Awaitable[tuple[Any, int]]],
+        ttl: float | None = None,
+    ) -> tuple[Any, str]:
+        """
+        Érték a cache-ből, vagy fetch(lejárt érték | None) → (érték, méret bájtban) eredménye.
+        Ha a fetch a kapott lejárt értéket adja vissza (upstream 304), az újraellenőrzött bejegyzés új TTL-t kap.
+        Returns: (érték, "hit" | "miss" | "revalidated" | "coalesced").
+        A fetch hibája minden várakozóhoz eljut, és nem cache-elődik.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), "coalesced"
+
+        self.misses += 1
+        stale = self.stale(key)
+
+        async def fill() -> Any:
+            value, size = await fetch(stale)
+            self.put(key, value, size, ttl)
+            if stale is not None and value is stale:
+                self.revalidated += 1
+            return value
+
+        task = asyncio.ensure_future(fill())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        value = await asyncio.shield(task)
+        return value, "revalidated" if stale is not None and value is stale else "miss"
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # ha minden várakozó bontott, ne legyen "never retrieved" figyelmeztetés
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "revalidated": self.revalidated,  # a miss-ek közül upstream 304-gyel (törzs és lekérdezés nélkül)
+            "oversized": self.oversized,
+        }
@@ -0,0 +1,35 @@
+"""
+Gyenge ETag a frontend GZip-je miatt.
+A proxy az upstream tömörítetlen (identity) törzsét kéri le, és annak erős ETag-jét adja tovább;
+a gzipet elfogadó kérésre viszont a frontend GZip middleware-je tömöríti a törzset – a két
+bájtsor nem osztozhat egy erős validátoron. Ilyen kérésnél az ETag gyenge (W/"..."), 304-nél is.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class WeakETagMiddleware:
+    """
+    ASGI middleware a GZip-en kívül: ha a kérés elfogadja a gzipet, a válasz ETag-je W/ előtagot kap.
+    Az If-None-Match összevetés (api.etag.etag_matches) a W/ előtagot figyelmen kívül hagyja,
+    így a gyenge tag a proxy cache-ben és az upstream felé is érvényes validátor marad.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Ugyanaz a feltétel, mint a GZipMiddleware-ben
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_weak(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["etag"] = f"W/{etag}"
+            await send(message)
+
+        await self.app(scope, receive, send_weak)
@@ -1,2 +1,11 @@
 """Frontend konfiguráció."""
+import os
+
 DATA_API_URL = "http://localhost:8000"  # Az adat API címe
+
+# Proxy válasz cache (LRU + TTL, bájtkorlát) – a népszerű szimbólum oldalak memóriából mennek
+PROXY_CACHE_MAX_BYTES = int(os.environ.get("PROXY_CACHE_MAX_BYTES", 128 * 2**20))
+PROXY_CACHE_MAX_ENTRY_BYTES = int(os.environ.get("PROXY_CACHE_MAX_ENTRY_BYTES", 8 * 2**20))
+PROXY_CACHE_TTL = float(os.environ.get("PROXY_CACHE_TTL", 60))
+# Ennél nagyobb limit-ű /api/stocks kérések pufferelés nélkül, streamelve mennek (nem cache-elődnek)
+PROXY_CACHE_MAX_ROWS = int(os.environ.get("PROXY_CACHE_MAX_ROWS", 50_000))
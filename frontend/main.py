@@ -10,6 +10,7 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 
+from .conditional import WeakETagMiddleware
 from .proxy import router as proxy_router
 
 app = FastAPI(
@@ -19,6 +20,8 @@ app = FastAPI(
 )
 
 app.add_middleware(GZipMiddleware, minimum_size=500)
+# A GZip-en kívül: a tömörített válasz ETag-je gyenge (a proxy az upstream identity törzs ETag-jét adja tovább)
+app.add_middleware(WeakETagMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
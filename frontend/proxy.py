@@ -1,16 +1,27 @@
 """Proxy – lekérdezés a 8000-es portú adat API-ról."""
-import time
 from typing import Any
 
 import httpx
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
-from .config import DATA_API_URL
+from api.etag import etag_matches
+
+from .cache import ResponseCache
+from .config import (
+    DATA_API_URL,
+    PROXY_CACHE_MAX_BYTES,
+    PROXY_CACHE_MAX_ENTRY_BYTES,
+    PROXY_CACHE_MAX_ROWS,
+    PROXY_CACHE_TTL,
+)
 
 router = APIRouter(tags=["Proxy"])
 
-_CACHE_TTL = 300  # 5 perc
-_cache: dict[str, tuple[Any, float]] = {}
+_META_TTL = 300  # symbols, date-range: 5 perc
+_PASSTHROUGH_HEADERS = ("content-disposition", "etag", "last-modified", "cache-control", "vary")
+_cache = ResponseCache(PROXY_CACHE_MAX_BYTES, PROXY_CACHE_TTL, PROXY_CACHE_MAX_ENTRY_BYTES)
 
 # Megosztott client – connection pooling, kevesebb TCP handshake
 _http_client: httpx.AsyncClient | None = None
@@ -26,31 +37,110 @@ async def _get_client() -> httpx.AsyncClient:
     return _http_client
 
 
-async def _fetch(path: str, params: dict[str, Any] | None = None) -> dict | list:
-    """HTTP GET a data API-ra. 4xx/5xx hibákat HTTPException-ként továbbadja."""
-    url = f"{DATA_API_URL.rstrip('/')}{path}"
-    client = await _get_client()
-    resp = await client.get(url, params=params)
+def _raise_for_error(resp: httpx.Response) -> None:
+    """4xx/5xx válasz → HTTPException a data API hibaüzenetével (túlterhelésnél a Retry-After fejléccel)."""
     if resp.is_error:
         try:
             body = resp.json()
             detail = body.get("detail", body) if isinstance(body, dict) else body
         except Exception:
             detail = resp.text or f"HTTP {resp.status_code}"
-        raise HTTPException(resp.status_code, detail)
+        retry_after = resp.headers.get("retry-after")
+        headers = {"Retry-After": retry_after} if retry_after else None
+        raise HTTPException(resp.status_code, detail, headers=headers)
+
+
+async def _fetch(path: str, params: dict[str, Any] | None = None) -> dict | list:
+    """HTTP GET a data API-ra. 4xx/5xx hibákat HTTPException-ként továbbadja."""
+    url = f"{DATA_API_URL.rstrip('/')}{path}"
+    client = await _get_client()
+    resp = await client.get(url, params=params)
+    _raise_for_error(resp)
     return resp.json()
 
 
-async def _cached_fetch(key: str, path: str, params: dict | None = None) -> dict | list:
-    """Cache-elt fetch – symbols, date-range ritkán változnak."""
-    now = time.time()
-    if key in _cache:
-        data, ts = _cache[key]
-        if now - ts < _CACHE_TTL:
-            return data
-    data = await _fetch(path, params)
-    _cache[key] = (data, now)
-    return data
+async def _stream(
+    path: str,
+    params: dict[str, Any] | None = None,
+    accept: str | None = None,
+    if_none_match: str | None = None,
+) -> Response:
+    """
+    HTTP GET a data API-ra stream módban – a választ pufferelés nélkül továbbítja.
+    Az upstream kapcsolat a stream végén (vagy kliens bontáskor) záródik; tömörítést
+    nem kér, azt a frontend GZip middleware-je végzi a böngésző felé.
+    A kliens If-None-Match fejlécét is átadja: változatlan adatnál az upstream 304-e megy tovább.
+    """
+    url = f"{DATA_API_URL.rstrip('/')}{path}"
+    client = await _get_client()
+    headers = {"Accept-Encoding": "identity"}
+    if accept:
+        headers["Accept"] = accept
+    if if_none_match:
+        headers["If-None-Match"] = if_none_match
+    request = client.build_request("GET", url, params=params, headers=headers)
+    resp = await client.send(request, stream=True)
+    if resp.is_error:
+        await resp.aread()
+        await resp.aclose()
+        _raise_for_error(resp)
+    passthrough = _passthrough_headers(resp)
+    if resp.status_code == 304:
+        await resp.aclose()
+        return Response(status_code=304, headers=passthrough)
+    return StreamingResponse(
+        resp.aiter_bytes(),
+        status_code=resp.status_code,
+        media_type=resp.headers.get("content-type"),
+        headers=passthrough,
+        background=BackgroundTask(resp.aclose),
+    )
+
+
+def _passthrough_headers(resp: httpx.Response) -> dict[str, str]:
+    """Továbbított upstream fejlécek: letöltési név és HTTP cache validátorok."""
+    return {k: v for k, v in resp.headers.items() if k.lower() in _PASSTHROUGH_HEADERS}
+
+
+async def _cached_response(
+    path: str,
+    params: dict[str, Any] | None = None,
+    accept: str | None = None,
+    if_none_match: str | None = None,
+    ttl: float | None = None,
+) -> Response:
+    """
+    HTTP GET a data API-ra a válasz cache-en át (kulcs: útvonal + paraméterek + Accept).
+    Az upstream válasz (bármely formátum) bájtra pontosan tárolódik; az egyidejű azonos kérések
+    egyetlen upstream hívást várnak meg. Lejárt bejegyzésnél feltételes kérés (If-None-Match) megy
+    az upstreamre – változatlan adatnál 304, a tárolt törzs új TTL-t kap.
+    Egyező kliens If-None-Match esetén 304 törzs nélkül. X-Cache fejléc: hit | miss | revalidated | coalesced.
+    Upstream 4xx/5xx: HTTPException a data API hibaüzenetével (_raise_for_error) – nem cache-elődik.
+    """
+    key = ("response", path, tuple(sorted((params or {}).items())), accept)
+
+    async def fetch(stale: tuple | None) -> tuple[tuple, int]:
+        url = f"{DATA_API_URL.rstrip('/')}{path}"
+        client = await _get_client()
+        headers = {"Accept-Encoding": "identity"}
+        if accept:
+            headers["Accept"] = accept
+        if stale is not None and "etag" in stale[2]:
+            headers["If-None-Match"] = stale[2]["etag"]
+        resp = await client.get(url, params=params, headers=headers)
+        _raise_for_error(resp)
+        if resp.status_code == 304 and stale is not None:
+            return stale, len(stale[3])
+        value = (resp.status_code, resp.headers.get("content-type"), _passthrough_headers(resp), resp.content)
+        return value, len(resp.content)
+
+    (status, media_type, headers, body), state = await _cache.get_or_fetch(key, fetch, ttl=ttl)
+    etag = headers.get("etag")
+    if if_none_match and etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "X-Cache": state})
+    return Response(
+        body, status_code=status, media_type=media_type, headers={**headers, "X-Cache": state}
+    )
 
 
 @router.get("/api/health")
@@ -63,19 +153,68 @@ async def proxy_health():
 
 
 @router.get("/api/date-range")
-async def proxy_date_range():
+async def proxy_date_range(if_none_match: str | None = Header(None)):
     """Globális dátumtartomány proxy (cache-elve)."""
     try:
-        return await _cached_fetch("date_range", "/api/date-range")
+        return await _cached_response("/api/date-range", if_none_match=if_none_match, ttl=_META_TTL)
     except httpx.RequestError as e:
         raise HTTPException(502, f"Data API nem elérhető: {e}")
 
 
 @router.get("/api/symbols")
-async def proxy_symbols():
+async def proxy_symbols(if_none_match: str | None = Header(None)):
     """Szimbólumok listája proxy (cache-elve)."""
     try:
-        return await _cached_fetch("symbols", "/api/symbols")
+        return await _cached_response("/api/symbols", if_none_match=if_none_match, ttl=_META_TTL)
+    except httpx.RequestError as e:
+        raise HTTPException(502, f"Data API nem elérhető: {e}")
+
+
+@router.get("/api/stocks")
+async def proxy_multi_stocks(
+    symbols: str = Query(...),
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    limit: int = Query(1000, ge=1, le=2_000_000),
+    layout: str = Query("grouped"),
+    field: str = Query("close"),
+    if_none_match: str | None = Header(None),
+):
+    """Több szimbólum egy kérésben proxy (symbols=TCS,INFY,...; layout=grouped|wide)."""
+    params = {"symbols": symbols, "limit": limit, "layout": layout, "field": field}
+    if start:
+        params["start"] = start
+    if end:
+        params["end"] = end
+    rows = limit if layout == "wide" else limit * len(symbols.split(","))
+    try:
+        if rows <= PROXY_CACHE_MAX_ROWS:
+            return await _cached_response("/api/stocks", params, if_none_match=if_none_match)
+        return await _stream("/api/stocks", params, if_none_match=if_none_match)
+    except httpx.RequestError as e:
+        raise HTTPException(502, f"Data API nem elérhető: {e}")
+
+
+@router.get("/api/analytics/cross-section")
+async def proxy_cross_section(
+    symbols: str | None = Query(None),
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    interval: str = Query("1d"),
+    top: int = Query(10, ge=1),
+    include_returns: bool | None = Query(None),
+    if_none_match: str | None = Header(None),
+):
+    """
+    Keresztmetszeti elemzés proxy (hozammátrix, kovariancia/korreláció, top mozgók – cache-elve).
+    Az include_returns csak megadás esetén megy tovább (alap: a data API-é, a hozammátrix nélkül).
+    """
+    params = {k: v for k, v in [("symbols", symbols), ("start", start), ("end", end)] if v}
+    params.update(interval=interval, top=top)
+    if include_returns is not None:
+        params["include_returns"] = str(include_returns).lower()
+    try:
+        return await _cached_response("/api/analytics/cross-section", params, if_none_match=if_none_match)
     except httpx.RequestError as e:
         raise HTTPException(502, f"Data API nem elérhető: {e}")
 
@@ -87,15 +226,84 @@ async def proxy_stocks(
     end: str | None = Query(None),
     limit: int = Query(1000, ge=1, le=2_000_000),
     offset: int = Query(0, ge=0),
+    after: str | None = Query(None),
+    cursor: str | None = Query(None),
+    layout: str = Query("rows"),
+    fmt: str | None = Query(None, alias="format"),
+    max_points: int | None = Query(None, ge=3, le=100_000),
+    downsample: str | None = Query(None),
+    accept: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    """
+    Részvényadatok proxy. A választ (JSON, NDJSON stream, Arrow, Parquet, CSV)
+    újrakódolás nélkül továbbítja; az Accept fejlécet is átadja.
+    limit <= PROXY_CACHE_MAX_ROWS: a válasz a proxy cache-ből jön (oldalak, grafikon nézetek);
+    nagyobb limitnél pufferelés nélkül streamel.
+    """
+    params = {"limit": limit, "offset": offset, "layout": layout}
+    if start:
+        params["start"] = start
+    if end:
+        params["end"] = end
+    if after:
+        params["after"] = after
+    if cursor:
+        params["cursor"] = cursor
+    if fmt:
+        params["format"] = fmt
+    if max_points:
+        params["max_points"] = max_points
+    if downsample:
+        params["downsample"] = downsample
+    try:
+        if limit <= PROXY_CACHE_MAX_ROWS:
+            return await _cached_response(f"/api/stocks/{symbol}", params, accept, if_none_match=if_none_match)
+        return await _stream(f"/api/stocks/{symbol}", params, accept, if_none_match=if_none_match)
+    except httpx.RequestError as e:
+        raise HTTPException(502, f"Data API nem elérhető: {e}")
+
+
+@router.get("/api/stocks/{symbol}/ohlcv")
+async def proxy_bars(
+    symbol: str,
+    interval: str = Query(...),
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    limit: int = Query(100_000, ge=1, le=2_000_000),
+    layout: str = Query("rows"),
+    if_none_match: str | None = Header(None),
 ):
-    """Részvényadatok proxy."""
-    params = {"limit": limit, "offset": offset}
+    """Újramintavételezett gyertyák proxy (5m/15m/1h/1d)."""
+    params = {"interval": interval, "limit": limit, "layout": layout}
     if start:
         params["start"] = start
     if end:
         params["end"] = end
     try:
-        return await _fetch(f"/api/stocks/{symbol}", params)
+        if limit <= PROXY_CACHE_MAX_ROWS:
+            return await _cached_response(f"/api/stocks/{symbol}/ohlcv", params, if_none_match=if_none_match)
+        return await _stream(f"/api/stocks/{symbol}/ohlcv", params, if_none_match=if_none_match)
+    except httpx.RequestError as e:
+        raise HTTPException(502, f"Data API nem elérhető: {e}")
+
+
+@router.get("/api/stocks/{symbol}/indicators")
+async def proxy_indicators(
+    symbol: str,
+    names: str | None = Query(None),
+    start: str | None = Query(None),
+    end: str | None = Query(None),
+    limit: int = Query(100_000, ge=1, le=2_000_000),
+    if_none_match: str | None = Header(None),
+):
+    """Technikai indikátorok proxy (sma/ema/rsi/vwap/bbands – a data API számolja)."""
+    params = {k: v for k, v in [("names", names), ("start", start), ("end", end)] if v}
+    params["limit"] = limit
+    try:
+        if limit <= PROXY_CACHE_MAX_ROWS:
+            return await _cached_response(f"/api/stocks/{symbol}/indicators", params, if_none_match=if_none_match)
+        return await _stream(f"/api/stocks/{symbol}/indicators", params, if_none_match=if_none_match)
     except httpx.RequestError as e:
         raise HTTPException(502, f"Data API nem elérhető: {e}")
 
@@ -105,16 +313,17 @@ async def proxy_stats(
     symbol: str,
     start: str | None = Query(None),
     end: str | None = Query(None),
+    if_none_match: str | None = Header(None),
 ):
-    """Statisztikák proxy. 404 = nincs adat a dátumtartományban."""
+    """Statisztikák proxy (cache-elve). 404 = nincs adat a dátumtartományban."""
     params = {k: v for k, v in [("start", start), ("end", end)] if v}
     try:
-        return await _fetch(f"/api/stocks/{symbol}/stats", params or None)
-    except httpx.HTTPStatusError as e:
-        try:
-            detail = e.response.json().get("detail", e.response.text)
-        except Exception:
-            detail = e.response.text or str(e)
-        raise HTTPException(e.response.status_code, detail)
+        return await _cached_response(f"/api/stocks/{symbol}/stats", params or None, if_none_match=if_none_match)
     except httpx.RequestError as e:
         raise HTTPException(502, f"Data API nem elérhető: {e}")
+
+
+@router.get("/api/proxy/cache")
+async def proxy_cache_stats():
+    """Proxy cache metrikák: bejegyzések, bájtok, hit/miss/coalesced, kiszorítások."""
+    return _cache.stats()
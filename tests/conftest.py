@@ -0,0 +1,135 @@
+"""
+Közös fixture-ök: szintetikus perces CSV-k, ETL export ideiglenes store-ba,
+és a Data API erre a store-ra irányítva (TestClient).
+Az API a PARQUET_PATH környezeti változóból olvas – ezért ez az api csomag importja előtt áll be.
+Az API store-ja a teljes futásra közös: módosítani csak a MUTABLE szimbólumot szabad,
+és csak a többi szimbólum dátumtartományán belül.
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+API_ROOT = Path(tempfile.mkdtemp(prefix="nifty-api-"))
+os.environ["PARQUET_PATH"] = str(API_ROOT / "parquet")
+
+import etl.export_to_parquet as export
+import etl.ingest as ingest
+from etl.sources import LocalDirSource
+from frontend.cache import ResponseCache
+
+SYMBOLS = {"AAA": 2_000, "BBB": 1_500, "CCC": 600}  # szimbólum → sorok száma
+MUTABLE = "CCC"  # ezt a szimbólumot a tesztek módosíthatják (hozzáfűzés, tömörítés)
+START = datetime(2020, 1, 1, 9, 15)
+
+
+def write_csv(directory: Path, symbol: str, rows: int, start: datetime = START, seed: int = 0) -> Path:
+    """Kaggle formátumú *_minute.csv (date, open, high, low, close, volume), percenként egy sor."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, rows))
+    dates = [start + timedelta(minutes=i) for i in range(rows)]
+    path = directory / f"{symbol}_minute.csv"
+    pl.DataFrame(
+        {
+            "date": [d.strftime("%Y-%m-%d %H:%M:%S") for d in dates],
+            "open": close,
+            "high": close + 0.5,
+            "low": close - 0.5,
+            "close": close + 0.1,
+            "volume": rng.integers(1, 1_000, rows),
+        }
+    ).write_csv(path)
+    return path
+
+
+def read_csv(path: Path) -> pl.DataFrame:
+    """A write_csv kimenete a Parquet sémára (date: datetime[us], volume: int64) – elvárt értékekhez."""
+    return pl.read_csv(path).with_columns(
+        pl.col("date").str.to_datetime("%Y-%m-%d %H:%M:%S", time_unit="us"),
+        pl.col("volume").cast(pl.Int64),
+    )
+
+
+def run_export(csv_dir: Path, complete: bool = True, **kwargs) -> None:
+    """ETL export egy worker-rel a csv_dir mappából."""
+    export.main(workers=1, source=LocalDirSource(csv_dir, complete=complete), **kwargs)
+
+
+def _point_etl_at(mp: pytest.MonkeyPatch, base: Path) -> None:
+    mp.setattr(export, "PARQUET_PATH", base)
+    mp.setattr(export, "MANIFEST_PATH", base / "_manifest.json")
+    mp.setattr(export, "STATE_PATH", base / "_etl_state.json")
+    mp.setattr(ingest, "PARQUET_PATH", base)
+    mp.setattr(ingest, "MANIFEST_PATH", base / "_manifest.json")
+
+
+@pytest.fixture
+def etl_store(tmp_path, monkeypatch) -> tuple[Path, Path]:
+    """Üres ideiglenes store (az ETL modulok ide írnak) és egy CSV mappa. Returns: (parquet mappa, csv mappa)"""
+    base = tmp_path / "parquet"
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    _point_etl_at(monkeypatch, base)
+    return base, csv_dir
+
+
+@pytest.fixture(scope="session")
+def api_store():
+    """
+    Az API store-ja (PARQUET_PATH) exportált SYMBOLS adatokkal.
+    Returns: (parquet mappa, csv mappa)
+    """
+    from api import database
+
+    base, csv_dir = API_ROOT / "parquet", API_ROOT / "csv"
+    csv_dir.mkdir()
+    with pytest.MonkeyPatch.context() as mp:
+        _point_etl_at(mp, base)
+        for i, (symbol, rows) in enumerate(SYMBOLS.items()):
+            write_csv(csv_dir, symbol, rows, seed=i)
+        run_export(csv_dir)
+    database.close_db()
+    yield base, csv_dir
+    database.close_db()
+    shutil.rmtree(API_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def mutable_store(api_store, monkeypatch) -> tuple[Path, Path]:
+    """Az API store-ja az ETL (ingest) modulok számára is – csak a MUTABLE szimbólum módosítható."""
+    _point_etl_at(monkeypatch, api_store[0])
+    return api_store
+
+
+@pytest.fixture(scope="session")
+def client(api_store):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def frontend(client, monkeypatch):
+    """
+    A frontend (proxy) TestClient-je; az upstream data API ugyanebben a folyamatban fut (ASGITransport).
+    Minden teszt üres proxy cache-sel indul.
+    """
+    import httpx
+    from fastapi.testclient import TestClient
+
+    from api.main import app as api_app
+    from frontend import proxy
+    from frontend.main import app
+
+    monkeypatch.setattr(proxy, "_http_client", httpx.AsyncClient(transport=httpx.ASGITransport(app=api_app)))
+    monkeypatch.setattr(proxy, "_cache", ResponseCache(2**20, 60, 2**19))
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,84 @@
+"""/api/analytics/cross-section: igazított hozammátrix, páronkénti kovariancia/korreláció, top mozgók."""
+import numpy as np
+import polars as pl
+import pytest
+
+from api.routers import analytics
+
+from .conftest import read_csv
+
+PARAMS = {"symbols": "AAA,BBB", "interval": "1h"}
+
+
+@pytest.fixture(scope="module")
+def prices(api_store) -> pl.DataFrame:
+    """Órás záróárak (bucket × AAA, BBB; hiányzó óra: null) a forrás CSV-kből."""
+    frames = [
+        read_csv(api_store[1] / f"{symbol}_minute.csv")
+        .sort("date")
+        .group_by(pl.col("date").dt.truncate("1h"))
+        .agg(pl.col("close").last().alias(symbol))
+        for symbol in ("AAA", "BBB")
+    ]
+    return frames[0].join(frames[1], on="date", how="full", coalesce=True).sort("date")
+
+
+def test_returns_and_pairwise_statistics(client, prices):
+    body = client.get("/api/analytics/cross-section", params={**PARAMS, "include_returns": True}).json()
+    matrix = prices.select("AAA", "BBB").to_numpy().astype(np.float64)
+    returns = matrix[1:] / matrix[:-1] - 1.0
+
+    assert body["symbols"] == ["AAA", "BBB"]
+    assert body["periods"] == len(returns) == len(body["dates"])
+    got = np.array(body["returns"], dtype=np.float64)  # null → nan
+    np.testing.assert_allclose(got, returns, rtol=1e-9)
+
+    both = ~np.isnan(returns).any(axis=1)
+    assert body["observations"][0][1] == both.sum()
+    expected_cov = np.cov(returns[both].T)
+    assert body["covariance"][0][1] == pytest.approx(expected_cov[0, 1], rel=1e-6)
+    assert body["correlation"][0][1] == pytest.approx(np.corrcoef(returns[both].T)[0, 1], rel=1e-6)
+    own = returns[~np.isnan(returns[:, 1]), 1]
+    assert body["covariance"][1][1] == pytest.approx(own.var(ddof=1), rel=1e-6)
+    assert body["correlation"][0][0] == pytest.approx(1.0)
+
+
+def test_top_movers(client, prices):
+    body = client.get("/api/analytics/cross-section", params={**PARAMS, "top": 1}).json()
+    closes = {symbol: prices[symbol].drop_nulls() for symbol in ("AAA", "BBB")}
+    change = {symbol: close[-1] / close[0] - 1.0 for symbol, close in closes.items()}
+    best, worst = sorted(change, key=change.get, reverse=True)
+    assert [m["symbol"] for m in body["top_movers"]["gainers"]] == [best]
+    assert [m["symbol"] for m in body["top_movers"]["losers"]] == [worst]
+    assert body["top_movers"]["gainers"][0]["return"] == pytest.approx(change[best])
+    assert "returns" not in body and "dates" not in body  # alapból a mátrix nélkül
+
+
+def test_matrices_are_cached_per_data_version(client, monkeypatch):
+    first = client.get("/api/analytics/cross-section", params=PARAMS).json()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a mátrixot a cache-ből kell adni")
+
+    monkeypatch.setattr(analytics, "_cross_section", fail)
+    # Más top / include_returns ugyanabból a cache bejegyzésből
+    again = client.get("/api/analytics/cross-section", params={**PARAMS, "top": 1, "include_returns": True})
+    assert again.status_code == 200
+    assert again.json()["covariance"] == first["covariance"]
+
+
+def test_intraday_intervals_need_a_bounded_range(client):
+    url = "/api/analytics/cross-section"
+    assert client.get(url, params={"symbols": "AAA", "interval": "5m"}).status_code == 400
+    wide = {"symbols": "AAA", "interval": "15m", "start": "2020-01-01", "end": "2020-06-01"}
+    assert client.get(url, params=wide).status_code == 400
+    bounded = {"symbols": "AAA,BBB", "interval": "15m", "start": "2020-01-01", "end": "2020-01-03"}
+    ok = client.get(url, params=bounded)
+    assert ok.status_code == 200 and ok.json()["periods"] > 0
+
+
+def test_proxy_forwards_include_returns_only_when_given(frontend):
+    url = "/api/analytics/cross-section"
+    assert "returns" not in frontend.get(url, params=PARAMS).json()
+    assert "returns" in frontend.get(url, params={**PARAMS, "include_returns": "true"}).json()
+    assert "returns" not in frontend.get(url, params={**PARAMS, "include_returns": "false"}).json()
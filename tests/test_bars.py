@@ -0,0 +1,75 @@
+"""/api/stocks/{symbol}/ohlcv: újramintavételezett gyertyák (perces adatból és ETL rollup tierekből)."""
+import json
+
+import polars as pl
+import pytest
+
+from api.database import OHLCV_VIEW, ROLLUP_VIEWS
+from api.routers import stocks
+
+from .conftest import read_csv
+
+
+def expected_bars(frame: pl.DataFrame, every: str) -> pl.DataFrame:
+    """Elvárt gyertyák: open/close a bucket első/utolsó perce."""
+    return (
+        frame.sort("date")
+        .group_by(pl.col("date").dt.truncate(every))
+        .agg(
+            pl.col("open").first(),
+            pl.col("high").max(),
+            pl.col("low").min(),
+            pl.col("close").last(),
+            pl.col("volume").sum(),
+        )
+        .sort("date")
+    )
+
+
+def assert_bars(columns: dict, expected: pl.DataFrame) -> None:
+    assert columns["date"] == expected["date"].dt.to_string("%Y-%m-%dT%H:%M:%S").to_list()
+    for name in ("open", "high", "low", "close"):
+        assert columns[name] == pytest.approx(expected[name].to_list())
+    assert columns["volume"] == expected["volume"].to_list()
+
+
+@pytest.fixture(scope="module")
+def bbb(api_store) -> pl.DataFrame:
+    return read_csv(api_store[1] / "BBB_minute.csv")
+
+
+@pytest.mark.parametrize("interval, every", [("5m", "5m"), ("15m", "15m")])
+def test_minute_bars_match_resampled_source(client, bbb, interval, every):
+    body = client.get("/api/stocks/BBB/ohlcv", params={"interval": interval, "layout": "columns"}).json()
+    assert body["interval"] == interval
+    assert_bars(body["columns"], expected_bars(bbb, every))
+
+
+def test_rows_layout_and_limit(client, bbb):
+    body = client.get("/api/stocks/bbb/ohlcv", params={"interval": "5m", "limit": 7}).json()
+    assert body["symbol"] == "BBB"
+    assert body["count"] == 7
+    expected = expected_bars(bbb, "5m").head(7)
+    assert_bars({k: [row[k] for row in body["data"]] for k in body["data"][0]}, expected)
+
+
+def test_bars_date_window_and_bad_interval(client, bbb):
+    params = {"interval": "15m", "start": "2020-01-02", "layout": "columns"}
+    body = client.get("/api/stocks/BBB/ohlcv", params=params).json()
+    assert_bars(body["columns"], expected_bars(bbb.filter(pl.col("date") >= pl.datetime(2020, 1, 2)), "15m"))
+    assert client.get("/api/stocks/BBB/ohlcv", params={"interval": "2m"}).status_code == 422
+
+
+@pytest.mark.parametrize("interval, every", [("1h", "1h"), ("1d", "1d")])
+def test_hourly_and_daily_bars_come_from_rollups(client, bbb, interval, every):
+    assert stocks._bars_source(interval) == (ROLLUP_VIEWS[interval], True)
+    body = client.get("/api/stocks/BBB/ohlcv", params={"interval": interval, "layout": "columns"}).json()
+    assert_bars(body["columns"], expected_bars(bbb, every))
+
+
+def test_coarser_bars_aggregate_the_rollup(client):
+    # 1d a perces adatból és az órás tierből ugyanaz
+    assert stocks._bars_source("1d")[0] == ROLLUP_VIEWS["1d"]
+    from_hours = stocks._query_bars("BBB", "1d", None, None, 100, "columns", ROLLUP_VIEWS["1h"], True)
+    from_minutes = stocks._query_bars("BBB", "1d", None, None, 100, "columns", OHLCV_VIEW, False)
+    assert json.loads(from_hours.body) == json.loads(from_minutes.body)
@@ -0,0 +1,126 @@
+"""Proxy válasz cache: bájtkorlátos LRU, TTL, single-flight összevonás, újraellenőrzés."""
+import asyncio
+
+import pytest
+
+from frontend.cache import ResponseCache
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResponseCache(max_bytes=100, ttl=60, max_entry_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # a most használt: b a legrégebbi
+    cache.put("c", "C", 40)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.bytes == 80
+    assert cache.evictions == 1
+
+
+def test_oversized_entry_is_not_stored():
+    cache = ResponseCache(max_bytes=100, ttl=60, max_entry_bytes=10)
+    cache.put("a", "A", 11)
+    assert cache.get("a") is None
+    assert cache.bytes == 0 and cache.oversized == 1
+
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = ResponseCache(max_bytes=100, ttl=60, max_entry_bytes=100)
+    cache.put("a", "A", 30)
+    cache.put("a", "A2", 50)
+    assert cache.bytes == 50 and cache.get("a") == "A2"
+
+
+def test_ttl_expiry_keeps_stale_value(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("frontend.cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(max_bytes=100, ttl=10, max_entry_bytes=100)
+    cache.put("a", "A", 1)
+    cache.put("b", "B", 1, ttl=100)
+    now[0] += 11
+
+    assert cache.get("a") is None and cache.expired == 1
+    assert cache.stale("a") == "A"  # újraellenőrzéshez megmarad
+    assert cache.get("b") == "B"
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache(max_bytes=1000, ttl=60, max_entry_bytes=1000)
+    calls = []
+
+    async def fetch(stale):
+        calls.append(stale)
+        await asyncio.sleep(0.01)
+        return "value", 5
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(5)))
+        return results, await cache.get_or_fetch("k", fetch)
+
+    results, again = asyncio.run(scenario())
+    assert calls == [None]
+    assert sorted(state for _, state in results) == ["coalesced"] * 4 + ["miss"]
+    assert all(value == "value" for value, _ in results)
+    assert again == ("value", "hit")
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["inflight"]) == (1, 4, 1, 0)
+    assert stats["hit_ratio"] == pytest.approx(5 / 6, abs=1e-4)
+
+
+def test_stale_entry_is_revalidated(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("frontend.cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(max_bytes=1000, ttl=10, max_entry_bytes=1000)
+    old = ("body",)
+    cache.put("k", old, 4)
+    now[0] += 11
+    seen = []
+
+    async def not_modified(stale):
+        seen.append(stale)
+        return stale, 4  # upstream 304: a régi érték marad
+
+    value, state = asyncio.run(cache.get_or_fetch("k", not_modified))
+    assert seen == [old]
+    assert (value, state) == (old, "revalidated")
+    assert cache.revalidated == 1
+    assert cache.get("k") is old  # új TTL-lel friss
+
+
+def test_fetch_errors_reach_all_waiters_and_are_not_cached():
+    cache = ResponseCache(max_bytes=1000, ttl=60, max_entry_bytes=1000)
+    calls = []
+
+    async def failing(stale):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("k", failing) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert cache.stale("k") is None and cache.stats()["inflight"] == 0
+
+
+def test_cancelled_initiator_does_not_cancel_the_fetch():
+    cache = ResponseCache(max_bytes=1000, ttl=60, max_entry_bytes=1000)
+
+    async def fetch(stale):
+        await asyncio.sleep(0.05)
+        return "value", 5
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == ("value", "coalesced")
+    assert cache.get("k") == "value"
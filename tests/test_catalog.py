@@ -0,0 +1,121 @@
+"""Parquet katalógus: egyszer regisztrált view, partíció szűrés, manifest alapú metaadatok."""
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import duckdb
+import polars as pl
+import pytest
+
+from api import database
+from api.routers import stocks
+
+from .conftest import START, SYMBOLS, read_csv, run_export, write_csv
+
+
+def test_symbol_filter_opens_only_its_partition(tmp_path):
+    conn = duckdb.connect()
+    files = []
+    for symbol in ("A", "B"):
+        path = tmp_path / f"symbol={symbol}" / "data.parquet"
+        path.parent.mkdir()
+        conn.execute(
+            f"""
+            COPY (
+                SELECT range AS date, 1.0 AS open, 1.0 AS high, 1.0 AS low, 1.0 AS close, 1 AS volume
+                FROM range(TIMESTAMP '2020-01-01', TIMESTAMP '2020-01-02', INTERVAL 1 MINUTE)
+            ) TO '{path.as_posix()}' (FORMAT PARQUET)
+            """
+        )
+        files.append(path.as_posix())
+    database._register_view(conn, "t", files)
+    (tmp_path / "symbol=B" / "data.parquet").write_bytes(b"nem parquet")
+
+    # A hibás B partíciót az A szűrésű lekérdezés meg sem nyitja
+    assert conn.execute("SELECT COUNT(*) FROM t WHERE symbol = 'A'").fetchone() == (1440,)
+    with pytest.raises(duckdb.Error):
+        conn.execute("SELECT COUNT(*) FROM t WHERE symbol = 'B'").fetchall()
+
+
+def test_view_is_registered_once_per_data_version(client, api_store, monkeypatch):
+    base, _ = api_store
+    calls = []
+    refresh = database.refresh_catalog
+    monkeypatch.setattr(database, "refresh_catalog", lambda: calls.append(1) or refresh())
+
+    for _ in range(3):
+        assert client.get("/api/stocks/AAA", params={"limit": 5}).status_code == 200
+    assert calls == []
+
+    # Új ETL futás (új manifest) → a következő kérés egyszer újraregisztrál
+    version = database.data_version()
+    manifest = base / "_manifest.json"
+    mtime = manifest.stat().st_mtime_ns + 10**9
+    os.utime(manifest, ns=(mtime, mtime))
+    for _ in range(3):
+        assert client.get("/api/stocks/AAA", params={"limit": 5}).status_code == 200
+    assert calls == [1]
+    assert database.data_version() == mtime != version
+
+
+def test_symbols_and_date_range_from_manifest(client):
+    assert database.get_manifest() is not None
+    assert client.get("/api/symbols").json() == {"symbols": sorted(SYMBOLS), "count": len(SYMBOLS)}
+    last = START + timedelta(minutes=max(SYMBOLS.values()) - 1)
+    assert client.get("/api/date-range").json() == {"min_date": str(START), "max_date": str(last)}
+
+
+def test_stats_full_range_from_manifest_partial_range_queried(client, api_store):
+    _, csv_dir = api_store
+    expected = read_csv(csv_dir / "BBB_minute.csv")
+
+    full = client.get("/api/stocks/BBB/stats").json()
+    assert full["row_count"] == SYMBOLS["BBB"]
+    assert full["date_range"] == {"min": str(START), "max": str(expected["date"].max())}
+    assert full["price_range"] == pytest.approx({"min": expected["low"].min(), "max": expected["high"].max()})
+
+    partial = expected.filter(pl.col("date") >= datetime(2020, 1, 2))
+    stats = client.get("/api/stocks/BBB/stats", params={"start": "2020-01-02"}).json()
+    assert stats["row_count"] == partial.height
+    assert stats["date_range"]["min"] == str(partial["date"].min())
+
+
+def test_stale_manifest_is_ignored(tmp_path, monkeypatch):
+    partition = tmp_path / "symbol=A"
+    partition.mkdir()
+    data = partition / "data.parquet"
+    data.write_bytes(b"x" * 10)
+    manifest = tmp_path / "_manifest.json"
+    monkeypatch.setattr(database, "MANIFEST_PATH", manifest)
+    files = [data.as_posix()]
+
+    manifest.write_text(json.dumps({"symbols": {"A": {"file_size": 10}}}), encoding="utf-8")
+    assert database._load_manifest(files) is not None
+    # Az ETL azóta újraírta a partíciót (más méret), vagy a manifest más szimbólumokat ír le
+    manifest.write_text(json.dumps({"symbols": {"A": {"file_size": 11}}}), encoding="utf-8")
+    assert database._load_manifest(files) is None
+    manifest.write_text(json.dumps({"symbols": {"B": {"file_size": 10}}}), encoding="utf-8")
+    assert database._load_manifest(files) is None
+    # Közben törölt fájl: nincs kivétel, csak fallback
+    data.unlink()
+    assert database._load_manifest(files) is None
+
+
+def test_month_filter_prunes_monthly_partitions(etl_store, monkeypatch):
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 2_000, start=datetime(2020, 1, 31, 9, 15))
+    run_export(csv_dir, layout={"partition_by": "month"})
+    files = database._list_parquet_files(base)
+    conn = duckdb.connect()
+    database._register_view(conn, "t", files, monthly=True)
+    monkeypatch.setattr(database, "_monthly", True)
+    (base / "symbol=AAA" / "year=2020" / "month=02" / "part-0.parquet").write_bytes(b"nem parquet")
+
+    # A januári year/month feltétel a februári fájlt meg sem nyitja
+    parts, params = database.partition_filter(date(2020, 1, 1), date(2020, 1, 31))
+    count = conn.execute(f"SELECT COUNT(*) FROM t WHERE {' AND '.join(parts)}", params).fetchone()[0]
+    january = read_csv(csv_dir / "AAA_minute.csv").filter(pl.col("date").dt.month() == 1)
+    assert count == january.height
+    # Az endpointok WHERE feltételébe is bekerül
+    where_sql, _ = stocks._build_where_clause("AAA", date(2020, 1, 1), None)
+    assert "year" in where_sql
@@ -0,0 +1,60 @@
+"""Level-of-detail mintavételezés: LTTB és min/max."""
+import numpy as np
+import pytest
+
+from api.downsample import lttb_indices, minmax_indices
+
+
+@pytest.fixture
+def series() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(7)
+    y = np.cumsum(rng.normal(size=10_000))
+    y[4321] = y.max() + 50  # kiugró érték
+    return np.arange(len(y), dtype=np.int64), y
+
+
+@pytest.mark.parametrize("points", [3, 4, 100, 999])
+def test_lttb_keeps_endpoints_and_returns_exact_count(series, points):
+    x, y = series
+    idx = lttb_indices(x, y, points)
+    assert len(idx) == points
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_spike(series):
+    x, y = series
+    assert 4321 in lttb_indices(x, y, 50)
+
+
+def test_minmax_keeps_extremes(series):
+    _, y = series
+    idx = minmax_indices(y, 100)
+    assert len(idx) <= 100
+    assert np.all(np.diff(idx) > 0)
+    assert {int(np.argmin(y)), int(np.argmax(y))} <= set(idx.tolist())
+    # Bucketenként a saját min és max
+    assert len(minmax_indices(y, 4)) == 4
+
+
+def test_short_series_is_returned_whole(series):
+    x, y = series
+    assert lttb_indices(x[:10], y[:10], 50).tolist() == list(range(10))
+    assert minmax_indices(y[:10], 50).tolist() == list(range(10))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("points", [3, 4, 50])
+def test_max_points_endpoint(client, method, points):
+    body = client.get(
+        "/api/stocks/AAA",
+        params={"limit": 2_000, "max_points": points, "downsample": method, "layout": "columns"},
+    ).json()
+    full = client.get("/api/stocks/AAA", params={"limit": 2_000, "layout": "columns"}).json()["columns"]
+    dates = body["columns"]["date"]
+    assert 2 < len(dates) <= points
+    if method == "lttb" or points < 4:
+        assert len(dates) == points
+        assert dates[0] == full["date"][0] and dates[-1] == full["date"][-1]
+    assert set(dates) <= set(full["date"])
+    assert dates == sorted(dates)
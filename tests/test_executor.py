@@ -0,0 +1,164 @@
+"""Végrehajtási sávok: beengedés (503), törölt kérés, streamelt válasz a sáv szálain, leállítás; az API sávhasználata."""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from api import executor
+from api.executor import Lane, iterate_in_lane
+
+
+def _blocking(event: threading.Event) -> str:
+    event.wait(5)
+    return "ok"
+
+
+async def _settle() -> None:
+    """A call_soon_threadsafe-fel ütemezett felszabadítások lefutása."""
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_full_queue_rejects_with_503():
+    lane = Lane("t", workers=1, max_queue=0, queue_timeout=1)
+    event = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(lane.run(_blocking, event))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as exc:
+            await lane.run(_blocking, event)
+        event.set()
+        assert await first == "ok"
+        return exc.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        lane.shutdown()
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert lane.stats()["rejected"] == 1
+
+
+def test_queue_timeout_returns_503():
+    lane = Lane("t", workers=1, max_queue=5, queue_timeout=0.05)
+    event = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(lane.run(_blocking, event))
+        await asyncio.sleep(0.02)
+        with pytest.raises(HTTPException) as exc:
+            await lane.run(_blocking, event)
+        event.set()
+        await first
+        return exc.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        lane.shutdown()
+    assert error.status_code == 503
+    assert lane.stats()["timed_out"] == 1
+
+
+def test_cancelled_request_holds_slot_until_work_finishes():
+    lane = Lane("t", workers=1, max_queue=5, queue_timeout=5)
+    event = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(lane.run(_blocking, event))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await _settle()
+        during = lane.stats()["running"]
+        event.set()
+        await _settle()
+        return during, lane.stats()["running"]
+
+    try:
+        during, after = asyncio.run(scenario())
+    finally:
+        lane.shutdown()
+    assert during == 1  # a futó feladat a törlés után is foglalja a helyet
+    assert after == 0
+
+
+def test_stream_chunks_run_on_lane_threads():
+    lane = Lane("t", workers=1, max_queue=5, queue_timeout=5)
+    threads: list[str] = []
+
+    def chunks():
+        for i in range(3):
+            threads.append(threading.current_thread().name)
+            yield str(i).encode()
+
+    async def scenario():
+        response = await lane.run(lambda: StreamingResponse(iterate_in_lane(chunks())))
+        held = lane.stats()["running"]
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        await _settle()
+        return held, body, lane.stats()["running"]
+
+    try:
+        held, body, after = asyncio.run(scenario())
+    finally:
+        lane.shutdown()
+    assert body == b"012"
+    assert threads and all(name.startswith("api-t") for name in threads)
+    assert held == 1  # a hely a stream végéig foglalt
+    assert after == 0
+
+
+def test_release_after_shutdown_is_safe():
+    lane = Lane("t", workers=1, max_queue=5, queue_timeout=5)
+    event = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(lane.run(_blocking, event))
+        await asyncio.sleep(0.05)
+        lane.shutdown()  # a futó feladat a leállítás után fejeződik be
+        event.set()
+        return await task
+
+    assert asyncio.run(scenario()) == "ok"
+    assert lane.stats()["running"] == 0
+
+
+@pytest.fixture
+def saturated_light(monkeypatch):
+    """A light sáv minden kérést 503-mal utasít el (telített sáv)."""
+    async def reject():
+        raise executor.LIGHT._overloaded()
+
+    monkeypatch.setattr(executor.LIGHT, "_admit", reject)
+
+
+def test_health_runs_outside_the_lanes(client, saturated_light):
+    assert client.get("/api/symbols").status_code == 503
+    health = client.get("/api/health")
+    assert health.status_code == 200
+    assert set(health.json()["lanes"]) == {"light", "bulk"}
+
+
+def test_proxy_forwards_retry_after(frontend, saturated_light):
+    response = frontend.get("/api/symbols")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(max(1, round(executor.LIGHT.queue_timeout)))
+
+
+@pytest.mark.parametrize("interval, lane", [("1h", "light"), ("1d", "light"), ("5m", "bulk"), ("15m", "bulk")])
+def test_bars_are_admitted_once(client, monkeypatch, interval, lane):
+    admitted = []
+    for target in (executor.LIGHT, executor.BULK):
+        def run(fn, *args, _lane=target, _run=target.run, **kwargs):
+            admitted.append(_lane.name)
+            return _run(fn, *args, **kwargs)
+
+        monkeypatch.setattr(target, "run", run)
+
+    response = client.get("/api/stocks/BBB/ohlcv", params={"interval": interval, "limit": 2})
+    assert response.status_code == 200 and response.json()["count"] == 2
+    assert admitted == [lane]
@@ -0,0 +1,289 @@
+"""ETL export: Parquet elrendezés (rendezés, row groupok, havi bontás), rollup tierek, inkrementális futás."""
+import json
+import os
+from datetime import datetime
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+
+import etl.export_to_parquet as export
+from etl.sources import LocalDirSource
+
+from .conftest import read_csv, run_export, write_csv
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+
+def _row_groups(path) -> tuple[int, set[str]]:
+    """(row groupok száma, oszlop tömörítések)"""
+    meta = pq.ParquetFile(path).metadata
+    codecs = {
+        meta.row_group(i).column(j).compression
+        for i in range(meta.num_row_groups)
+        for j in range(meta.num_columns)
+    }
+    return meta.num_row_groups, codecs
+
+
+def test_rollup_tiers_follow_layout(etl_store):
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 130_000)  # > 2048 órás gyertya
+    run_export(csv_dir, layout={"compression": "gzip", "row_group_size": 2048})
+
+    hourly = export.rollup_path(base, "1h") / "symbol=AAA" / "data.parquet"
+    daily = export.rollup_path(base, "1d") / "symbol=AAA" / "data.parquet"
+    assert pq.ParquetFile(hourly).metadata.num_rows == -(-130_000 // 60)
+    assert _row_groups(hourly) == (2, {"GZIP"})
+    assert _row_groups(daily) == (1, {"GZIP"})
+
+
+def _shuffled_csv(csv_dir, symbol: str, rows: int) -> pl.DataFrame:
+    """Időrendtől eltérő sorrendű CSV – az exportnak kell rendeznie. Returns: az elvárt (rendezett) sorok"""
+    path = write_csv(csv_dir, symbol, rows)
+    pl.read_csv(path).sample(fraction=1.0, shuffle=True, seed=3).write_csv(path)
+    return read_csv(path).sort("date")
+
+
+@pytest.mark.parametrize("engine", ["polars", "duckdb"])
+def test_partition_is_sorted_with_date_statistics(etl_store, engine):
+    base, csv_dir = etl_store
+    expected = _shuffled_csv(csv_dir, "AAA", 10_000)
+    run_export(csv_dir, engine=engine, layout={"row_group_size": 2_048})
+
+    path = base / "symbol=AAA" / "data.parquet"
+    frame = pl.read_parquet(path)
+    assert frame.select(COLUMNS).equals(expected.select(COLUMNS))
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == -(-10_000 // 2_048)
+    date = meta.schema.names.index("date")
+    bounds = [meta.row_group(i).column(date).statistics for i in range(meta.num_row_groups)]
+    assert all(s is not None and s.has_min_max for s in bounds)
+    # Egymást nem fedő, növekvő dátumtartományú row groupok → a dátumszűrő blokkokat hagy ki
+    assert all(a.max < b.min for a, b in zip(bounds, bounds[1:]))
+    assert _row_groups(path)[1] == {"ZSTD"}
+
+
+def test_explicit_schema_and_float32(etl_store):
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 500)
+    run_export(csv_dir, layout={"float32": True})
+
+    schema = pq.read_schema(base / "symbol=AAA" / "data.parquet")
+    assert str(schema.field("date").type) == "timestamp[us]"
+    assert {str(schema.field(c).type) for c in ("open", "high", "low", "close")} == {"float"}
+    assert str(schema.field("volume").type) == "int64"
+
+
+@pytest.mark.parametrize("engine", ["polars", "duckdb"])
+def test_monthly_layout(etl_store, engine):
+    base, csv_dir = etl_store
+    path = write_csv(csv_dir, "AAA", 2_000, start=datetime(2020, 1, 31, 9, 15))  # január → február
+    run_export(csv_dir, engine=engine, layout={"partition_by": "month"})
+
+    partition = base / "symbol=AAA"
+    files = sorted(partition.rglob("*.parquet"))
+    assert [f.relative_to(partition).parent.as_posix() for f in files] == [
+        "year=2020/month=01",
+        "year=2020/month=02",
+    ]
+    frame = pl.concat([pl.read_parquet(f, hive_partitioning=False).select(COLUMNS) for f in files])
+    assert frame.equals(read_csv(path).select(COLUMNS))
+    assert all(pl.read_parquet(f)["date"].dt.month().unique().len() == 1 for f in files)
+
+
+def test_replace_dir_keeps_partition_paths(tmp_path):
+    src, dst = tmp_path / "new", tmp_path / "old"
+    (src / "year=2020" / "month=02").mkdir(parents=True)
+    (src / "year=2020" / "month=02" / "part-0.parquet").write_bytes(b"uj feb")
+    (src / "data.parquet").write_bytes(b"uj")
+    (dst / "year=2019" / "month=12").mkdir(parents=True)
+    (dst / "year=2019" / "month=12" / "part-0.parquet").write_bytes(b"regi dec")
+    (dst / "data.parquet").write_bytes(b"regi")
+    (dst / "part-1.parquet").write_bytes(b"hozzafuzott")
+    inode = (dst / "data.parquet").stat().st_ino
+
+    export._replace_dir(src, dst)
+    assert sorted(p.relative_to(dst).as_posix() for p in dst.rglob("*")) == [
+        "data.parquet",
+        "year=2020",
+        "year=2020/month=02",
+        "year=2020/month=02/part-0.parquet",
+    ]
+    # A fájl a helyén cserélődött (rename), nem a mappa
+    assert (dst / "data.parquet").read_bytes() == b"uj"
+    assert (dst / "data.parquet").stat().st_ino != inode
+
+
+def test_reexport_never_removes_the_partition(etl_store, monkeypatch):
+    """Újraexport közben a partíció mappája és a data.parquet útvonala végig létezik."""
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 300)
+    run_export(csv_dir)
+    partition = base / "symbol=AAA"
+    seen = []
+    replace = os.replace
+
+    def observe(src, dst):
+        replace(src, dst)
+        seen.append((partition / "data.parquet").exists())
+
+    monkeypatch.setattr(export.os, "replace", observe)
+    write_csv(csv_dir, "AAA", 400)
+    args = (str(csv_dir / "AAA_minute.csv"), str(base), "AAA", "polars", export.DEFAULT_LAYOUT)
+    assert export._process_file(args)[1]
+    assert seen and all(seen)
+    assert pl.read_parquet(partition / "data.parquet").height == 400
+
+
+def _manifest_entries(base) -> dict[str, dict]:
+    return json.loads((base / "_manifest.json").read_text(encoding="utf-8"))["symbols"]
+
+
+def _manifest_symbols(base) -> set[str]:
+    return set(_manifest_entries(base))
+
+
+def _export_two(base, csv_dir) -> None:
+    write_csv(csv_dir, "AAA", 300, seed=0)
+    write_csv(csv_dir, "BBB", 200, seed=1)
+    run_export(csv_dir)
+    assert _manifest_symbols(base) == {"AAA", "BBB"}
+
+
+def test_incremental_export_is_noop(etl_store, capsys):
+    base, csv_dir = etl_store
+    _export_two(base, csv_dir)
+    manifest_mtime = (base / "_manifest.json").stat().st_mtime_ns
+    capsys.readouterr()
+
+    run_export(csv_dir)
+    assert "Változatlan: 2, exportálandó: 0" in capsys.readouterr().out
+    # Változás nélkül nincs új manifest (= nincs új adatverzió)
+    assert (base / "_manifest.json").stat().st_mtime_ns == manifest_mtime
+
+
+def test_changed_csv_is_reexported(etl_store, capsys):
+    base, csv_dir = etl_store
+    _export_two(base, csv_dir)
+    write_csv(csv_dir, "BBB", 250, seed=1)
+    capsys.readouterr()
+
+    run_export(csv_dir)
+    assert "Változatlan: 1, exportálandó: 1" in capsys.readouterr().out
+    manifest = json.loads((base / "_manifest.json").read_text(encoding="utf-8"))
+    assert manifest["symbols"]["BBB"]["row_count"] == 250
+    # Azonos tartalom, új mtime (újraletöltés): a hash dönt, nincs újraexport
+    os.utime(csv_dir / "AAA_minute.csv")
+    run_export(csv_dir)
+    assert "Változatlan: 2, exportálandó: 0" in capsys.readouterr().out
+
+
+def test_partial_source_keeps_other_symbols(etl_store, tmp_path, capsys):
+    base, csv_dir = etl_store
+    _export_two(base, csv_dir)
+    partial = tmp_path / "partial"
+    partial.mkdir()
+    write_csv(partial, "AAA", 400, seed=0)
+    capsys.readouterr()
+
+    run_export(partial, complete=False)
+    assert "BBB... nincs a forrásban – megtartva" in capsys.readouterr().out
+    assert _manifest_symbols(base) == {"AAA", "BBB"}
+    assert list((base / "symbol=BBB").rglob("*.parquet"))
+
+    run_export(partial, complete=False, prune=True)
+    assert _manifest_symbols(base) == {"AAA"}
+    assert not (base / "symbol=BBB").exists()
+
+
+def test_complete_source_removes_missing_symbols(etl_store):
+    base, csv_dir = etl_store
+    _export_two(base, csv_dir)
+    (csv_dir / "BBB_minute.csv").unlink()
+
+    run_export(csv_dir)
+    assert _manifest_symbols(base) == {"AAA"}
+    assert not (base / "symbol=BBB").exists()
+
+
+def test_polars_export_is_lazy_and_strips_offset(tmp_path):
+    path = tmp_path / "AAA_minute.csv"
+    path.write_text(
+        "date,open,high,low,close,volume\n"
+        "2020-01-01 09:16:00+05:30,2,3,1,2.5,7\n"
+        "2020-01-01 09:15:00+05:30,1,2,0.5,1.5,5.0\n",
+        encoding="utf-8",
+    )
+    lf = export.scan_csv_polars(path, "AAA", export.DEFAULT_LAYOUT)
+    assert isinstance(lf, pl.LazyFrame)  # a CSV csak a sink alatt, darabokban olvasódik
+
+    base = tmp_path / "parquet"
+    export._export_polars(path, base, "AAA", export.DEFAULT_LAYOUT)
+    frame = pl.read_parquet(base / "symbol=AAA" / "data.parquet", hive_partitioning=False)
+    assert frame["date"].to_list() == [datetime(2020, 1, 1, 9, 15), datetime(2020, 1, 1, 9, 16)]
+    assert frame["volume"].to_list() == [5, 7]
+    assert frame["symbol"].unique().to_list() == ["AAA"]
+
+
+def test_memory_estimate_grows_with_csv_size(tmp_path):
+    small = write_csv(tmp_path, "AAA", 100)
+    large = write_csv(tmp_path, "BBB", 10_000)
+    assert export.estimate_memory_mb(small) >= export.WORKER_BASE_MB
+    assert export.estimate_memory_mb(large) - export.estimate_memory_mb(small) == pytest.approx(
+        export.CSV_MEMORY_FACTOR * (large.stat().st_size - small.stat().st_size) / 2**20
+    )
+
+
+def test_tiny_memory_budget_runs_largest_first_one_at_a_time(etl_store, capsys):
+    """A keretnél nagyobb feladat is lefut (egyedül); a sorrend a becsült memória szerint csökkenő."""
+    base, csv_dir = etl_store
+    for symbol, rows in (("AAA", 200), ("BBB", 3_000), ("CCC", 1_000)):
+        write_csv(csv_dir, symbol, rows)
+    capsys.readouterr()
+
+    export.main(workers=2, memory_budget_mb=1, source=LocalDirSource(csv_dir, complete=True))
+    out = capsys.readouterr().out
+    order = [line.split("] ")[1].split("...")[0] for line in out.splitlines() if line.startswith("  [")]
+    assert order == ["BBB", "CCC", "AAA"]
+    assert _manifest_symbols(base) == {"AAA", "BBB", "CCC"}
+
+
+def test_duckdb_single_matches_polars(tmp_path, monkeypatch):
+    """Az egyetlen COPY-s motor ugyanazt a store-t (percek, rollupok, manifest) adja, mint a per-fájl export."""
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    for i, (symbol, rows) in enumerate((("AAA", 3_000), ("BBB", 1_200))):
+        write_csv(csv_dir, symbol, rows, seed=i)
+    stores = {}
+    for engine in ("polars", "duckdb-single"):
+        base = tmp_path / engine / "parquet"
+        monkeypatch.setattr(export, "PARQUET_PATH", base)
+        monkeypatch.setattr(export, "MANIFEST_PATH", base / "_manifest.json")
+        monkeypatch.setattr(export, "STATE_PATH", base / "_etl_state.json")
+        run_export(csv_dir, engine=engine)
+        stores[engine] = base
+
+    polars_base, single_base = stores["polars"], stores["duckdb-single"]
+    for symbol in ("AAA", "BBB"):
+        for tier in (None, "1h", "1d"):
+            roots = [b if tier is None else export.rollup_path(b, tier) for b in (polars_base, single_base)]
+            frames = [
+                pl.read_parquet(root / f"symbol={symbol}" / "data.parquet", hive_partitioning=False)
+                .select(COLUMNS)
+                .sort("date")
+                for root in roots
+            ]
+            assert frames[0].equals(frames[1]), (symbol, tier)
+    manifests = [_manifest_entries(b) for b in (polars_base, single_base)]
+    for symbol in ("AAA", "BBB"):
+        for key in ("row_count", "min_date", "max_date"):
+            assert manifests[0][symbol][key] == manifests[1][symbol][key]
+    assert not (single_base.parent / ".staging").exists()
+
+
+def test_duckdb_single_requires_symbol_layout(etl_store):
+    _, csv_dir = etl_store
+    with pytest.raises(ValueError):
+        run_export(csv_dir, engine="duckdb-single", layout={"partition_by": "month"})
@@ -0,0 +1,79 @@
+"""HTTP cache: ETag / Last-Modified az adatverzióból, 304 lekérdezés nélkül; gyenge ETag a frontend gzip-jénél."""
+import pytest
+
+from api.routers import stocks
+from frontend import proxy
+
+
+def test_etag_and_304(client):
+    first = client.get("/api/stocks/AAA", params={"limit": 50, "start": "2020-01-01"})
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert first.headers["last-modified"]
+
+    # A paraméterek sorrendje nem számít
+    reordered = client.get("/api/stocks/AAA?start=2020-01-01&limit=50")
+    assert reordered.headers["etag"] == etag
+
+    not_modified = client.get(
+        "/api/stocks/AAA?start=2020-01-01&limit=50", headers={"If-None-Match": f"W/{etag}"}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    other = client.get("/api/stocks/AAA", params={"limit": 51, "start": "2020-01-01"})
+    assert other.headers["etag"] != etag
+    identity = client.get(
+        "/api/stocks/AAA",
+        params={"limit": 50, "start": "2020-01-01"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert identity.headers["etag"] != etag  # a gzip és a tömörítetlen törzs ETag-je eltér
+
+
+def test_304_does_not_run_the_query(client, monkeypatch):
+    etag = client.get("/api/stocks/BBB", params={"limit": 10}).headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a lekérdezés nem futhat 304-nél")
+
+    monkeypatch.setattr(stocks, "_query_stocks", fail)
+    response = client.get("/api/stocks/BBB", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_health_and_errors_are_not_tagged(client):
+    health = client.get("/api/health")
+    assert health.headers["cache-control"] == "no-store"
+    assert "etag" not in health.headers
+    error = client.get("/api/stocks/AAA", params={"cursor": "%%%"})
+    assert "etag" not in error.headers
+
+
+@pytest.mark.parametrize("max_rows", [50_000, 10])  # cache-ből, illetve streamelve
+def test_proxy_weakens_etag_when_it_gzips(frontend, monkeypatch, max_rows):
+    monkeypatch.setattr(proxy, "PROXY_CACHE_MAX_ROWS", max_rows)
+    params = {"limit": 200, "start": "2020-01-01"}
+    identity = frontend.get("/api/stocks/AAA", params=params, headers={"Accept-Encoding": "identity"})
+    gzipped = frontend.get("/api/stocks/AAA", params=params, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.content == identity.content  # a kliens kicsomagolja
+    assert not identity.headers["etag"].startswith("W/")
+    assert gzipped.headers["etag"] == f"W/{identity.headers['etag']}"
+
+    # A gyenge tag érvényes validátor: 304 (szintén gyenge taggel), a tömörítetlen kérésnél is
+    validator = gzipped.headers["etag"]
+    again = frontend.get(
+        "/api/stocks/AAA", params=params, headers={"Accept-Encoding": "gzip", "If-None-Match": validator}
+    )
+    assert again.status_code == 304
+    assert again.headers["etag"] == validator
+    plain = frontend.get(
+        "/api/stocks/AAA", params=params, headers={"Accept-Encoding": "identity", "If-None-Match": validator}
+    )
+    assert plain.status_code == 304
+    assert plain.headers["etag"] == identity.headers["etag"]
@@ -0,0 +1,102 @@
+"""Technikai indikátorok: vektorizált számítás naiv (ciklusos) referenciával, endpoint bemelegedéssel."""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from api import indicators
+from api.indicators import bbands, ema, parse_indicators, rsi, sma, vwap
+
+
+@pytest.fixture(scope="module")
+def close() -> np.ndarray:
+    return 100 + np.cumsum(np.random.default_rng(7).normal(0, 0.3, 1_000))
+
+
+def _naive_ema(x, alpha):
+    out = [x[0]]
+    for value in x[1:]:
+        out.append(out[-1] + alpha * (value - out[-1]))
+    return np.array(out)
+
+
+def test_sma_and_bbands(close):
+    expected_mid = [np.nan] * 19 + [close[i - 19:i + 1].mean() for i in range(19, len(close))]
+    expected_std = [np.nan] * 19 + [close[i - 19:i + 1].std() for i in range(19, len(close))]
+    np.testing.assert_allclose(sma(close, 20), expected_mid, rtol=1e-10)
+    upper, mid, lower = bbands(close, 20)
+    np.testing.assert_allclose(mid, expected_mid, rtol=1e-10)
+    np.testing.assert_allclose(upper - mid, 2 * np.array(expected_std), rtol=1e-6)
+    np.testing.assert_allclose(mid - lower, 2 * np.array(expected_std), rtol=1e-6)
+
+
+@pytest.mark.parametrize("n", [1, 127, 128, 129, 1_000])  # blokkhatárok körül
+def test_ema_matches_recursion(close, n):
+    np.testing.assert_allclose(ema(close[:n], 2 / 21), _naive_ema(close[:n], 2 / 21), rtol=1e-10)
+
+
+def test_rsi_matches_wilder(close):
+    delta = np.diff(close)
+    gain = _naive_ema(np.maximum(delta, 0), 1 / 14)
+    loss = _naive_ema(np.maximum(-delta, 0), 1 / 14)
+    with np.errstate(divide="ignore"):
+        expected = 100 - 100 / (1 + gain / loss)
+    result = rsi(close, 14)
+    assert np.isnan(result[0])
+    np.testing.assert_allclose(result[1:], expected, rtol=1e-8)
+    assert rsi(np.arange(10.0), 5)[1:].tolist() == [100.0] * 9  # csak nyereség
+
+
+def test_vwap_restarts_each_day():
+    start = datetime(2020, 1, 1, 15, 28)
+    dates = np.array([start + timedelta(minutes=i) for i in range(4)], dtype="datetime64[us]")  # 2 + 2 perc
+    dates[2:] += np.timedelta64(1, "D")
+    high, low = np.array([11.0, 12, 21, 22]), np.array([9.0, 10, 19, 20])
+    close, volume = np.array([10.0, 11, 20, 21]), np.array([1.0, 3, 2, 2])
+    typical = (high + low + close) / 3
+    expected = [
+        typical[0],
+        (typical[0] + 3 * typical[1]) / 4,
+        typical[2],
+        (2 * typical[2] + 2 * typical[3]) / 4,
+    ]
+    np.testing.assert_allclose(vwap(dates, high, low, close, volume), expected)
+
+
+def test_parse_indicators():
+    assert parse_indicators("SMA, ema50,vwap,sma") == [
+        ("sma", "sma", indicators.DEFAULT_PERIODS["sma"]),
+        ("ema50", "ema", 50),
+        ("vwap", "vwap", 0),
+    ]
+    for bad in ("macd", "sma1", f"rsi{indicators.MAX_PERIOD + 1}", " , "):
+        with pytest.raises(ValueError):
+            parse_indicators(bad)
+    assert indicators.lookback_rows(parse_indicators("sma20,ema5,vwap")) == indicators.RECURSIVE_WARMUP * 5
+
+
+def test_endpoint_is_warmed_up_from_start(client):
+    names = "sma20,ema10,rsi14,bbands20"
+    full = client.get("/api/stocks/AAA/indicators", params={"names": names, "limit": 10_000}).json()
+    part = client.get(
+        "/api/stocks/AAA/indicators", params={"names": names, "start": "2020-01-02", "limit": 10_000}
+    ).json()
+
+    assert part["indicators"] == names.split(",")
+    assert part["warmup_rows"] == indicators.lookback_rows(parse_indicators(names))
+    offset = full["columns"]["date"].index(part["columns"]["date"][0])
+    assert part["columns"]["date"][0] == "2020-01-02T00:00:00"
+    assert list(part["columns"]) == list(full["columns"])
+    # A start utáni első sortól minden érték kész (nincs null), és egyezik a teljes előzményből számolttal;
+    # a rekurzív indikátoroknál a levágott előzmény súlya legfeljebb e^-RECURSIVE_WARMUP
+    tolerance = {"sma20": 1e-9, "bbands20_upper": 1e-9, "bbands20_lower": 1e-9, "ema10": 1e-4, "rsi14": 1e-4}
+    for name, rel in tolerance.items():
+        values = part["columns"][name]
+        assert None not in values
+        assert values == pytest.approx(full["columns"][name][offset:], rel=rel)
+
+
+def test_endpoint_rejects_unknown_indicator(client):
+    response = client.get("/api/stocks/AAA/indicators", params={"names": "macd"})
+    assert response.status_code == 400
+    assert "macd" in response.json()["detail"]
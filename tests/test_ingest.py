@@ -0,0 +1,75 @@
+"""Napi hozzáfűzés (append) és partíció tömörítés (compact), a futó API katalógus frissítésével."""
+import json
+
+import polars as pl
+
+from api import database
+from etl.export_to_parquet import rollup_path
+from etl.ingest import append_csv, compact_symbol
+
+from .conftest import MUTABLE, SYMBOLS, run_export, write_csv
+
+
+def _manifest(base) -> dict:
+    return json.loads((base / "_manifest.json").read_text(encoding="utf-8"))
+
+
+def test_append_csv_skips_existing_rows(etl_store, tmp_path):
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 300, seed=0)
+    run_export(csv_dir)
+    update = tmp_path / "update"
+    update.mkdir()
+    # Az első 300 perc már a store-ban van, csak az utolsó 50 új
+    path = write_csv(update, "AAA", 350, seed=0)
+
+    assert append_csv(path, "AAA") == 50
+    assert append_csv(path, "AAA") == 0
+
+    files = sorted((base / "symbol=AAA").rglob("*.parquet"))
+    assert len(files) == 2  # data.parquet + egy part fájl, a régi fájl érintetlen
+    dates = pl.read_parquet(files)["date"]
+    assert dates.len() == dates.n_unique() == 350
+    assert _manifest(base)["symbols"]["AAA"]["row_count"] == 350
+    hourly = pl.read_parquet(rollup_path(base, "1h") / "symbol=AAA" / "data.parquet")
+    assert hourly["volume"].sum() == pl.read_parquet(files)["volume"].sum()
+
+
+def test_compact_merges_part_files(etl_store, tmp_path):
+    base, csv_dir = etl_store
+    write_csv(csv_dir, "AAA", 300)
+    run_export(csv_dir)
+    update = tmp_path / "update"
+    update.mkdir()
+    for rows in (320, 340):
+        append_csv(write_csv(update, "AAA", rows), "AAA")
+    before = pl.read_parquet(sorted((base / "symbol=AAA").rglob("*.parquet"))).sort("date")
+
+    assert compact_symbol("AAA")
+    assert not compact_symbol("AAA")  # már egy fájl
+    files = list((base / "symbol=AAA").rglob("*.parquet"))
+    assert [f.name for f in files] == ["data.parquet"]
+    assert pl.read_parquet(files[0]).equals(before)
+    assert _manifest(base)["symbols"]["AAA"]["file_size"] == files[0].stat().st_size
+
+
+def test_running_api_sees_appended_rows(client, mutable_store):
+    """Az ingest új manifestje után a futó API újraregisztrál: új adat, új ETag."""
+    _, csv_dir = mutable_store
+    before = client.get(f"/api/stocks/{MUTABLE}/stats")
+    version = database.data_version()
+
+    extra = SYMBOLS[MUTABLE] + 100  # a többi szimbólum dátumtartományán belül marad
+    assert append_csv(write_csv(csv_dir, MUTABLE, extra, seed=2), MUTABLE) == 100
+
+    after = client.get(f"/api/stocks/{MUTABLE}/stats", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["row_count"] == extra
+    assert database.data_version() != version
+    assert database.get_manifest()["symbols"][MUTABLE]["row_count"] == extra
+
+    # Tömörítés után ugyanaz az adat, egy fájlból
+    assert compact_symbol(MUTABLE)
+    body = client.get(f"/api/stocks/{MUTABLE}", params={"limit": 10_000, "layout": "columns"}).json()
+    assert body["count"] == len(set(body["columns"]["date"])) == extra
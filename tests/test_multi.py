@@ -0,0 +1,54 @@
+"""/api/stocks?symbols=...: több szimbólum egy lekérdezésben (grouped és wide layout)."""
+import polars as pl
+import pytest
+from fastapi import HTTPException
+
+from api.routers import stocks
+
+from .conftest import SYMBOLS, read_csv
+
+
+@pytest.fixture(scope="module")
+def sources(api_store) -> dict[str, pl.DataFrame]:
+    return {symbol: read_csv(api_store[1] / f"{symbol}_minute.csv") for symbol in ("AAA", "BBB")}
+
+
+def test_grouped_matches_single_symbol_requests(client):
+    params = {"symbols": "bbb, AAA,BBB,NOPE", "start": "2020-01-01", "limit": 700}
+    body = client.get("/api/stocks", params=params).json()
+
+    assert body["symbols"] == ["BBB", "AAA", "NOPE"]  # egyedi, nagybetűs, a megadás sorrendjében
+    for symbol in ("AAA", "BBB"):
+        single = client.get(
+            f"/api/stocks/{symbol}", params={"start": "2020-01-01", "limit": 700, "layout": "columns"}
+        ).json()
+        assert body["data"][symbol]["count"] == 700
+        assert body["data"][symbol]["columns"] == single["columns"]
+    assert body["data"]["NOPE"]["count"] == 0
+
+
+def test_wide_aligns_symbols_by_date(client, sources):
+    body = client.get("/api/stocks", params={"symbols": "AAA,BBB", "limit": 10_000, "layout": "wide"}).json()
+    assert body["field"] == "close"
+    assert list(body["columns"]) == ["date", "AAA", "BBB"]
+    # AAA hosszabb: a BBB utáni percekben a BBB oszlop null
+    assert body["count"] == max(SYMBOLS["AAA"], SYMBOLS["BBB"])
+    columns = body["columns"]
+    assert columns["AAA"] == pytest.approx(sources["AAA"]["close"].to_list())
+    assert columns["BBB"][: SYMBOLS["BBB"]] == pytest.approx(sources["BBB"]["close"].to_list())
+    assert set(columns["BBB"][SYMBOLS["BBB"]:]) == {None}
+
+
+def test_wide_field_and_limit(client, sources):
+    params = {"symbols": "AAA,BBB", "limit": 5, "layout": "wide", "field": "volume"}
+    body = client.get("/api/stocks", params=params).json()
+    assert body["count"] == 5
+    assert body["columns"]["BBB"] == sources["BBB"]["volume"].head(5).to_list()
+
+
+def test_symbol_list_validation(client):
+    assert client.get("/api/stocks", params={"symbols": " , "}).status_code == 400
+    assert stocks._parse_symbols("a,b,a") == ["A", "B"]
+    with pytest.raises(HTTPException) as exc:
+        stocks._parse_symbols("a,b,c", max_symbols=2)
+    assert exc.value.status_code == 400
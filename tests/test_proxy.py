@@ -0,0 +1,69 @@
+"""Frontend proxy: válasz cache (X-Cache), újraellenőrzés, streamelt nagy válaszok, hibák továbbítása."""
+import pyarrow as pa
+
+from frontend import proxy
+from frontend.cache import ResponseCache
+
+
+def test_second_request_is_a_cache_hit(client, frontend):
+    params = {"limit": 20, "start": "2020-01-01"}
+    first = frontend.get("/api/stocks/AAA", params=params)
+    second = frontend.get("/api/stocks/AAA", params=params)
+
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("miss", "hit")
+    assert first.content == second.content == client.get("/api/stocks/AAA", params=params).content
+    assert second.headers["etag"] == first.headers["etag"]
+    stats = frontend.get("/api/proxy/cache").json()
+    assert (stats["entries"], stats["misses"], stats["hits"]) == (1, 1, 1)
+    assert stats["bytes"] == len(first.content)
+
+
+def test_accept_header_is_part_of_the_key(frontend):
+    accept = {"Accept": "application/vnd.apache.arrow.stream"}
+    json_body = frontend.get("/api/stocks/AAA", params={"limit": 10})
+    arrow = frontend.get("/api/stocks/AAA", params={"limit": 10}, headers=accept)
+
+    assert json_body.headers["content-type"].startswith("application/json")
+    assert arrow.headers["x-cache"] == "miss"
+    assert arrow.headers["content-type"].startswith("application/vnd.apache.arrow.stream")
+    assert pa.ipc.open_stream(arrow.content).read_all().num_rows == 10
+
+
+def test_client_validator_gets_304_from_the_cache(frontend):
+    etag = frontend.get("/api/stocks/AAA/stats").headers["etag"]
+    response = frontend.get("/api/stocks/AAA/stats", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["x-cache"] == "hit"
+    assert response.content == b""
+
+
+def test_expired_entry_is_revalidated_upstream(frontend, monkeypatch):
+    monkeypatch.setattr(proxy, "_cache", ResponseCache(2**20, 0, 2**19))  # azonnal lejár
+    first = frontend.get("/api/stocks/AAA", params={"limit": 5})
+    again = frontend.get("/api/stocks/AAA", params={"limit": 5})
+
+    assert first.headers["x-cache"] == "miss"
+    # Upstream 304: a tárolt törzs megy tovább, lekérdezés nélkül
+    assert again.headers["x-cache"] == "revalidated"
+    assert again.content == first.content
+    assert frontend.get("/api/proxy/cache").json()["revalidated"] == 1
+
+
+def test_large_limits_stream_past_the_cache(client, frontend, monkeypatch):
+    monkeypatch.setattr(proxy, "PROXY_CACHE_MAX_ROWS", 100)
+    params = {"limit": 500, "layout": "columns"}
+    response = frontend.get("/api/stocks/AAA", params=params)
+
+    assert response.status_code == 200
+    assert "x-cache" not in response.headers
+    assert response.json() == client.get("/api/stocks/AAA", params=params).json()
+    assert frontend.get("/api/proxy/cache").json()["entries"] == 0
+
+
+def test_upstream_errors_are_forwarded_and_not_cached(frontend):
+    for _ in range(2):
+        response = frontend.get("/api/stocks/AAA", params={"cursor": "%%%"})
+        assert response.status_code == 400
+        assert response.json()["detail"]
+    stats = frontend.get("/api/proxy/cache").json()
+    assert (stats["entries"], stats["misses"]) == (0, 2)
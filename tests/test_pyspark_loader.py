@@ -0,0 +1,65 @@
+"""PySpark betöltés: egyetlen olvasás explicit sémával vs. a régi unionByName, store írás/olvasás."""
+import pytest
+
+pytest.importorskip("pyspark")
+
+import polars as pl  # noqa: E402
+
+from etl import load_data_pyspark as loader  # noqa: E402
+
+from .conftest import read_csv, write_csv  # noqa: E402
+
+COLUMNS = ["date", "open", "high", "low", "close", "volume", "symbol"]
+
+
+@pytest.fixture(scope="module")
+def spark():
+    try:
+        session = loader.create_spark_session(shuffle_partitions=2)
+    except Exception as e:  # nincs Java
+        pytest.skip(f"Spark nem indul: {e}")
+    yield session
+    session.stop()
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for i, (symbol, rows) in enumerate((("AAA", 300), ("BB_B", 200))):
+        write_csv(tmp_path, symbol, rows, seed=i)
+    return tmp_path
+
+
+def _expected(csv_dir) -> pl.DataFrame:
+    frames = [
+        read_csv(path).with_columns(pl.lit(path.stem.replace("_minute", "")).alias("symbol"))
+        for path in sorted(csv_dir.glob("*_minute.csv"))
+    ]
+    return pl.concat(frames).sort("symbol", "date")
+
+
+def _collect(df) -> pl.DataFrame:
+    rows = [row.asDict() for row in df.select(*COLUMNS).collect()]
+    return pl.DataFrame(rows).with_columns(pl.col("date").cast(pl.Datetime("us"))).sort("symbol", "date")
+
+
+def test_single_scan_matches_union(spark, csv_dir):
+    single = loader.load_stock_data_single(spark, csv_dir)
+    assert [(f.name, f.dataType.simpleString()) for f in single.schema.fields] == [
+        ("date", "timestamp_ntz"),
+        ("open", "double"),
+        ("high", "double"),
+        ("low", "double"),
+        ("close", "double"),
+        ("volume", "bigint"),
+        ("symbol", "string"),
+    ]
+    expected = _expected(csv_dir)
+    assert _collect(single).equals(expected)
+    assert _collect(loader.load_stock_data(spark, csv_dir)).equals(expected)
+
+
+def test_write_and_read_parquet_store(spark, csv_dir, tmp_path):
+    out = tmp_path / "parquet_spark"
+    loader.write_parquet_store(loader.load_stock_data_single(spark, csv_dir), out)
+    assert sorted(p.name for p in out.glob("symbol=*")) == ["symbol=AAA", "symbol=BB_B"]
+    assert _collect(loader.load_parquet_store(spark, out)).equals(_expected(csv_dir))
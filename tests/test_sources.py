@@ -0,0 +1,95 @@
+"""CSV források: helyi mappa, HTTP (könyvtárlista / index.json), CLI forrás, pipeline export."""
+import functools
+import json
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import polars as pl
+import pytest
+
+import etl.export_to_parquet as export
+from etl.sources import HttpSource, KaggleSource, LocalDirSource, source_from_arg
+
+from .conftest import read_csv, write_csv
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_dir(tmp_path):
+    """Helyi http.server egy mappára. Returns: (mappa, base URL)"""
+    root = tmp_path / "served"
+    root.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_local_dir_lists_only_minute_csvs(tmp_path):
+    write_csv(tmp_path, "BBB", 10)
+    write_csv(tmp_path, "AAA", 10)
+    (tmp_path / "notes.csv").write_text("x", encoding="utf-8")
+    source = LocalDirSource(tmp_path)
+    assert [p.name for p in source.iter_csv()] == ["AAA_minute.csv", "BBB_minute.csv"]
+    assert not source.streaming and not source.complete
+    assert LocalDirSource(tmp_path, complete=True).complete
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_http_source_downloads_directory_listing(http_dir, tmp_path, streaming):
+    root, url = http_dir
+    for symbol in ("AAA", "BBB", "CCC"):
+        write_csv(root, symbol, 50)
+    (root / "readme.txt").write_text("x", encoding="utf-8")
+    dest = tmp_path / "download"
+
+    files = list(HttpSource(url, dest=dest, streaming=streaming).iter_csv())
+    names = [p.name for p in files]
+    assert sorted(names) == ["AAA_minute.csv", "BBB_minute.csv", "CCC_minute.csv"]
+    if not streaming:
+        assert names == sorted(names)
+    assert all(p.read_bytes() == (root / p.name).read_bytes() for p in files)
+    assert not list(dest.glob("*.part"))
+
+
+def test_http_source_prefers_index_json(http_dir, tmp_path):
+    root, url = http_dir
+    write_csv(root, "AAA", 20)
+    write_csv(root, "BBB", 20)
+    (root / "index.json").write_text(json.dumps(["BBB_minute.csv", "other.txt"]), encoding="utf-8")
+
+    files = list(HttpSource(url.rstrip("/"), dest=tmp_path / "download").iter_csv())
+    assert [p.name for p in files] == ["BBB_minute.csv"]
+
+
+def test_source_from_arg(tmp_path):
+    assert isinstance(source_from_arg("kaggle"), KaggleSource)
+    http = source_from_arg("https://example.com/data", streaming=False)
+    assert isinstance(http, HttpSource)
+    assert http.base_url == "https://example.com/data/" and not http.streaming
+    assert isinstance(source_from_arg(str(tmp_path)), LocalDirSource)
+    with pytest.raises(ValueError):
+        source_from_arg(str(tmp_path / "nincs"))
+
+
+def test_pipeline_export_from_http(etl_store, http_dir, tmp_path, capsys):
+    """Streaming forrásnál a konvertálás a letöltéssel párhuzamosan indul; az eredmény azonos."""
+    base, _ = etl_store
+    root, url = http_dir
+    for i, (symbol, rows) in enumerate((("AAA", 400), ("BBB", 300))):
+        write_csv(root, symbol, rows, seed=i)
+
+    export.main(workers=2, source=HttpSource(url, dest=tmp_path / "download", complete=True))
+    out = capsys.readouterr().out
+    assert "pipeline" in out
+    assert "Változatlan: 0, exportált: 2" in out
+    for symbol in ("AAA", "BBB"):
+        frame = pl.read_parquet(base / f"symbol={symbol}" / "data.parquet", hive_partitioning=False)
+        expected = read_csv(root / f"{symbol}_minute.csv")
+        assert frame.select(expected.columns).equals(expected)
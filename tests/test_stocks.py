@@ -0,0 +1,149 @@
+"""/api/stocks/{symbol}: soros és oszlopos JSON, NDJSON stream, Arrow / Parquet / CSV, keyset lapozás."""
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pytest
+from fastapi import HTTPException
+
+from api.formats import MEDIA_TYPES, negotiate_format
+from api.routers import stocks
+
+from .conftest import SYMBOLS, read_csv
+
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+
+@pytest.fixture(scope="module")
+def aaa(api_store) -> pl.DataFrame:
+    """Az AAA elvárt sorai (a forrás CSV)."""
+    return read_csv(api_store[1] / "AAA_minute.csv")
+
+
+def _iso(frame: pl.DataFrame) -> list[str]:
+    return frame["date"].dt.to_string("%Y-%m-%dT%H:%M:%S").to_list()
+
+
+def test_columns_layout_matches_rows(client, aaa):
+    params = {"start": "2020-01-01", "limit": 500}
+    rows = client.get("/api/stocks/AAA", params=params).json()
+    columns = client.get("/api/stocks/AAA", params={**params, "layout": "columns"}).json()
+
+    assert columns["symbol"] == "AAA"
+    assert columns["count"] == rows["count"] == 500
+    assert list(columns["columns"]) == list(COLUMNS)
+    for name in COLUMNS:
+        assert columns["columns"][name] == [row[name] for row in rows["data"]]
+    expected = aaa.head(500)
+    assert columns["columns"]["date"] == _iso(expected)
+    assert columns["columns"]["close"] == pytest.approx(expected["close"].to_list())
+    assert columns["columns"]["volume"] == expected["volume"].to_list()
+
+
+def test_date_filter_and_unknown_symbol(client, aaa):
+    params = {"start": "2020-01-02", "end": "2020-01-02", "layout": "columns", "limit": 10_000}
+    body = client.get("/api/stocks/aaa", params=params).json()
+    # end napja a nap eleje (date <= end), így csak az éjféli perc fér bele
+    day = aaa.filter(pl.col("date").dt.date() == pl.date(2020, 1, 2))
+    assert body["columns"]["date"] == _iso(day.head(1))
+    assert body["symbol"] == "AAA"
+
+    empty = client.get("/api/stocks/NOPE").json()
+    assert empty == {"symbol": "NOPE", "data": [], "count": 0, "next_cursor": None}
+
+
+def test_ndjson_stream_matches_rows(client, monkeypatch):
+    monkeypatch.setattr(stocks, "STREAM_BATCH_ROWS", 128)  # több batch
+    rows = client.get("/api/stocks/AAA", params={"limit": 1000}).json()["data"]
+    with client.stream("GET", "/api/stocks/AAA", params={"limit": 1000, "layout": "ndjson"}) as response:
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert len(lines) == 1000
+    assert lines == rows
+
+
+def test_cursor_with_offset_is_rejected(client):
+    first = client.get("/api/stocks/AAA", params={"limit": 10}).json()
+    params = {"limit": 10, "cursor": first["next_cursor"]}
+    assert client.get("/api/stocks/AAA", params={**params, "offset": 5}).status_code == 400
+    # offset=0 (a proxy alapértéke) a cursor mellett is rendben van
+    assert client.get("/api/stocks/AAA", params={**params, "offset": 0}).status_code == 200
+    # cursor nélkül az offset továbbra is működik
+    skipped = client.get("/api/stocks/AAA", params={"limit": 5, "offset": 5}).json()["data"]
+    assert skipped == first["data"][5:]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet", "csv"])
+def test_binary_formats_match_source(client, aaa, monkeypatch, fmt):
+    monkeypatch.setattr(stocks, "STREAM_BATCH_ROWS", 256)
+    response = client.get("/api/stocks/AAA", params={"limit": 1000, "format": fmt})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(MEDIA_TYPES[fmt])
+    assert response.headers["content-disposition"] == f'attachment; filename="AAA.{fmt}"'
+
+    if fmt == "arrow":
+        frame = pl.from_arrow(pa.ipc.open_stream(response.content).read_all())
+    elif fmt == "parquet":
+        frame = pl.read_parquet(io.BytesIO(response.content))
+    else:
+        frame = pl.read_csv(io.BytesIO(response.content), try_parse_dates=True)
+    assert frame.columns == list(COLUMNS)
+    expected = aaa.head(1000).select(COLUMNS)
+    assert frame["date"].cast(pl.Datetime("us")).to_list() == expected["date"].to_list()
+    assert frame["close"].to_list() == pytest.approx(expected["close"].to_list())
+    assert frame["volume"].to_list() == expected["volume"].to_list()
+
+
+def test_format_from_accept_header(client):
+    accept = "text/html, application/vnd.apache.arrow.stream"
+    response = client.get("/api/stocks/AAA", params={"limit": 10}, headers={"Accept": accept})
+    assert response.headers["content-type"].startswith(MEDIA_TYPES["arrow"])
+    assert pa.ipc.open_stream(response.content).read_all().num_rows == 10
+    # Explicit format paraméter az Accept fejléc előtt
+    assert negotiate_format("csv", "application/vnd.apache.parquet") == "csv"
+    assert negotiate_format(None, "text/html, */*") == "json"
+    assert client.get("/api/stocks/AAA", params={"format": "arrow", "max_points": 10}).status_code == 400
+
+
+def test_cursor_round_trip():
+    moment = datetime(2020, 1, 2, 9, 15, 30, 123456)
+    assert stocks._decode_cursor(stocks._encode_cursor(moment)) == moment
+    assert stocks._decode_cursor(stocks._encode_cursor(np.datetime64(moment, "us"))) == moment
+    with pytest.raises(HTTPException) as exc:
+        stocks._decode_cursor("nem-cursor!")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("layout", ["rows", "columns"])
+def test_cursor_pagination_matches_single_request(client, layout):
+    def dates_of(body: dict) -> list[str]:
+        if layout == "columns":
+            return body["columns"]["date"]
+        return [row["date"] for row in body["data"]]
+
+    full = client.get("/api/stocks/AAA", params={"limit": 10_000, "layout": layout}).json()
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 333, "layout": layout, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/stocks/AAA", params=params).json()
+        pages += dates_of(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(pages) == SYMBOLS["AAA"]
+    assert pages == dates_of(full)
+
+
+def test_after_equals_cursor(client):
+    first = client.get("/api/stocks/AAA", params={"limit": 100}).json()
+    by_cursor = client.get("/api/stocks/AAA", params={"limit": 100, "cursor": first["next_cursor"]}).json()
+    by_after = client.get("/api/stocks/AAA", params={"limit": 100, "after": first["data"][-1]["date"]}).json()
+    assert by_cursor["data"] == by_after["data"]
+    assert by_cursor["data"][0]["date"] > first["data"][-1]["date"]
+
+
+def test_bad_cursor_is_400(client):
+    assert client.get("/api/stocks/AAA", params={"cursor": "%%%"}).status_code == 400